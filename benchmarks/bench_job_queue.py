@@ -0,0 +1,101 @@
+"""
+Benchmark: check job throughput through the SQLite queue as worker processes are added
+
+Workers claim, "fetch" with a fixed simulated latency and complete jobs against a temporary
+database, while the main process collects results like the coordinator does.
+
+Usage: python benchmarks/bench_job_queue.py [jobs] [max_workers]
+"""
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from job_queue import SQLiteJobQueue
+
+FETCH_LATENCY = 0.05  # Seconds per simulated fetch
+CONCURRENCY = 10  # Jobs per worker at once
+
+def worker_main(db_path, worker_id, stop_at):
+    database.DATABASE_PATH = db_path
+
+    async def run():
+        job_queue = SQLiteJobQueue()
+        active = set()
+
+        async def run_job(job):
+            await asyncio.sleep(FETCH_LATENCY)
+            job_queue.complete(job, {'post_id': str(job['id']), 'content': '', 'url': job['url']})
+
+        while time.time() < stop_at:
+            jobs = job_queue.claim(worker_id, limit=CONCURRENCY - len(active))
+            for job in jobs:
+                task = asyncio.create_task(run_job(job))
+                active.add(task)
+                task.add_done_callback(active.discard)
+            if active:
+                await asyncio.wait(active, timeout=0.05, return_when=asyncio.FIRST_COMPLETED)
+            else:
+                await asyncio.sleep(0.02)
+
+    asyncio.run(run())
+
+def run_round(jobs, workers):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        database.close_connections()
+        database.DATABASE_PATH = db_path
+        database.init_database()
+        job_queue = SQLiteJobQueue()
+        targets = [('Bench', f'https://host{i % 50}.example/{i}') for i in range(jobs)]
+        job_queue.enqueue(targets)
+
+        ctx = multiprocessing.get_context('spawn')
+        stop_at = time.time() + 120
+        processes = [ctx.Process(target=worker_main, args=(db_path, f'w{n}', stop_at)) for n in range(workers)]
+        started = time.perf_counter()
+        for process in processes:
+            process.start()
+
+        collected = 0
+        seen = set()
+        duplicates = 0
+        while collected < jobs and time.perf_counter() - started < 120:
+            results = job_queue.collect_results(limit=500)
+            for result in results:
+                key = result['url']
+                duplicates += key in seen
+                seen.add(key)
+            collected += len(results)
+            if not results:
+                time.sleep(0.02)
+        elapsed = time.perf_counter() - started
+
+        for process in processes:
+            process.terminate()
+            process.join()
+        database.close_connections()
+        return collected / elapsed, duplicates
+
+def main():
+    jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    ideal = CONCURRENCY / FETCH_LATENCY
+    print(f"{jobs} jobs, {FETCH_LATENCY * 1000:.0f}ms simulated fetch, concurrency {CONCURRENCY} per worker "
+          f"(ideal {ideal:.0f} jobs/s per worker)")
+
+    workers = 1
+    baseline = None
+    while workers <= max_workers:
+        rate, duplicates = run_round(jobs, workers)
+        baseline = baseline or rate
+        print(f"{workers} workers  {rate:>8.1f} jobs/s   {rate / baseline:.2f}x   duplicate results: {duplicates}")
+        workers *= 2
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark: cost of metrics instrumentation per recording and per check, enabled vs disabled
+
+Checks run through the fetch tiers against a local page that answers after a simulated network
+latency, with the database write path included; runs alternate between metrics on and off so
+drift affects both equally. A latency of 0 shows the worst case.
+
+Usage: python benchmarks/bench_metrics_overhead.py [checks per run] [runs] [latency ms]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from metrics import metrics
+from scraper_backup import AsyncSimpleScraper
+from tiered_scraper import TieredScraper
+
+PORT = 5091
+PAGE = ('<html><head><title>Profile</title></head><body>'
+        + ''.join(f'<div class="post"><p>Post number {n} with some text</p></div>' for n in range(2000))
+        + '</body></html>')
+
+def time_recordings(count):
+    started = time.perf_counter()
+    for n in range(count):
+        metrics.observe('bench_seconds', 0.01, platform='X', target=f'https://x.com/account{n % 100}', stage='parse')
+    observe_us = (time.perf_counter() - started) / count * 1e6
+
+    started = time.perf_counter()
+    for n in range(count):
+        with metrics.timer('bench_seconds', platform='X', target=f'https://x.com/account{n % 100}', stage='parse'):
+            pass
+    timer_us = (time.perf_counter() - started) / count * 1e6
+    return observe_us, timer_us
+
+async def run_checks(enabled, checks, targets):
+    metrics.enabled = enabled
+    http_scraper = AsyncSimpleScraper(pool_size=8, pool_per_host=8)
+    fetcher = TieredScraper(http_scraper, platform_tiers={'TikTok': ['structured', 'html']})
+    durations = []
+    try:
+        for n in range(checks):
+            url = targets[n % len(targets)]
+            started = time.perf_counter()
+            post = await fetcher.scrape_platform('TikTok', url)
+            database.queue_post_status('TikTok', url, post)
+            durations.append(time.perf_counter() - started)
+        database.flush_status_updates()
+    finally:
+        await http_scraper.close()
+    return statistics.median(durations) * 1000
+
+async def main():
+    checks = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+    latency = float(sys.argv[3]) if len(sys.argv) > 3 else 50
+
+    async def page(request):
+        await asyncio.sleep(latency / 1000)
+        return web.Response(text=PAGE, content_type='text/html')
+
+    app = web.Application()
+    app.router.add_get('/{name}', page)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', PORT).start()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DATABASE_PATH = os.path.join(tmp, 'bench.db')
+        database.init_database()
+        targets = [f'http://127.0.0.1:{PORT}/account{n}' for n in range(50)]
+        database.register_targets([('TikTok', url) for url in targets])
+
+        observe_us, timer_us = time_recordings(100_000)
+        print(f"observe(): {observe_us:.2f}us, timer(): {timer_us:.2f}us per recording")
+
+        results = {True: [], False: []}
+        for run in range(runs):
+            for enabled in ((True, False) if run % 2 else (False, True)):
+                results[enabled].append(await run_checks(enabled, checks, targets))
+        on = statistics.median(results[True])
+        off = statistics.median(results[False])
+        print(f"Server latency {latency:.0f}ms. Median check: {off:.3f}ms without metrics, {on:.3f}ms with metrics "
+              f"({(on - off) / off * 100:+.2f}%)")
+        series = len(metrics.series)
+        started = time.perf_counter()
+        saved = database.save_metrics()
+        print(f"Saved {saved} of {series} series in {(time.perf_counter() - started) * 1000:.1f}ms")
+        database.close_connections()
+
+    await runner.cleanup()
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,396 @@
+"""
+Benchmark: check throughput, latency, CPU and memory against recorded pages, fully offline
+
+Targets are spread evenly across LinkedIn, TikTok, X and Facebook and served by the local
+stand-in server (fixture_server.py) with simulated latency and optional error injection. Modes:
+
+  simple   SimpleScraper (blocking calls) from --concurrency threads
+  browser  SocialMediaScraper (Playwright); skipped when no browser can be launched
+  cycle    DiscordBot.check_all_platforms on a temporary database: fetch tiers, post diffing
+           and the status write, under the check engine's concurrency limits
+
+Each mode makes --rounds passes over every target count. CPU and RSS are this process's only
+(the stand-in server, parse workers and browsers run in other processes); peak RSS is the
+process high-water mark so far. --save NAME stores results in benchmarks/baselines/NAME.json;
+--compare NAME prints the change against it and exits 1 on a regression beyond --tolerance.
+
+Usage: python benchmarks/bench_offline.py [--modes simple,cycle] [--targets 10,100,1000]
+           [--latency ms] [--error-rate 0.05] [--save NAME] [--compare NAME]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import aiohttp
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import fixture_server
+import database
+import scraper_backup
+import structured_sources
+from config import MAX_CONCURRENT_CHECKS, MAX_CONCURRENT_PER_PLATFORM
+
+BASELINES_DIR = os.path.join(BENCH_DIR, 'baselines')
+MODES = ['simple', 'browser', 'cycle']
+WARMUP_TARGETS = 8
+
+# Result fields compared against a baseline: (higher is better, multiple of --tolerance allowed);
+# the tail rests on a handful of samples, so it gets more room
+COMPARED = {
+    'checks_per_s': (True, 1),
+    'p50_ms': (False, 1),
+    'p99_ms': (False, 2),
+    'cpu_ms_per_check': (False, 1),
+    'rss_mb': (False, 1)
+}
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+def cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+def rss_mb():
+    """Current resident set size, falling back to the peak where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 1024
+
+async def measure(mode, targets, run):
+    """Run `run()` -> (check durations, failed count) and build the result row"""
+    cpu_before = cpu_seconds()
+    started = time.perf_counter()
+    durations, failed = await run()
+    wall = time.perf_counter() - started
+    cpu = cpu_seconds() - cpu_before
+    checks = len(durations)
+    return {
+        'mode': mode,
+        'targets': targets,
+        'checks': checks,
+        'failed': failed,
+        'wall_s': round(wall, 3),
+        'checks_per_s': round(checks / wall, 2) if wall else 0.0,
+        'p50_ms': round(percentile(durations, 0.5) * 1000, 1),
+        'p99_ms': round(percentile(durations, 0.99) * 1000, 1),
+        'cpu_s': round(cpu, 3),
+        'cpu_pct': round(cpu / wall * 100, 1) if wall else 0.0,
+        'cpu_ms_per_check': round(cpu / checks * 1000, 2) if checks else 0.0,
+        'rss_mb': round(rss_mb(), 1),
+        'peak_rss_mb': round(peak_rss_mb(), 1)
+    }
+
+async def run_simple(targets, args):
+    """SimpleScraper over a thread pool, as the sync fallback path runs"""
+    scraper = scraper_backup.SimpleScraper()
+    durations = []
+    failed = 0
+
+    def check(target):
+        started = time.perf_counter()
+        post = scraper.scrape_platform(*target)
+        return time.perf_counter() - started, post is not None
+
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        for _ in range(args.rounds):
+            results = await asyncio.gather(*(loop.run_in_executor(executor, check, target) for target in targets))
+            durations.extend(duration for duration, _ in results)
+            failed += sum(1 for _, ok in results if not ok)
+    scraper.close()
+    return durations, failed
+
+async def run_browser(targets, args):
+    """SocialMediaScraper with --concurrency pages in flight"""
+    from scraper import SocialMediaScraper
+    scraper = SocialMediaScraper()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    durations = []
+    failed = 0
+
+    async def check(platform, url):
+        async with semaphore:
+            started = time.perf_counter()
+            post = await scraper.scrape_platform(platform, url)
+            return time.perf_counter() - started, post is not None
+
+    try:
+        for _ in range(args.rounds):
+            results = await asyncio.gather(*(check(platform, url) for platform, url in targets))
+            durations.extend(duration for duration, _ in results)
+            failed += sum(1 for _, ok in results if not ok)
+    finally:
+        await scraper.close_browser()
+    return durations, failed
+
+async def run_cycle(targets, args):
+    """Full check cycles through DiscordBot, without Discord or the job queue"""
+    from bot import DiscordBot
+    from check_engine import CheckEngine
+    from circuit_breaker import breakers
+    from post_identity import seen_posts
+
+    # Each run starts with closed circuits and no seen posts; failures within the run still open circuits
+    breakers.breakers.clear()
+    seen_posts.targets.clear()
+    database.register_targets(targets)
+    bot = DiscordBot()
+    bot.job_queue = None
+    bot.check_engine = CheckEngine(max_concurrency=args.concurrency, per_platform_limit=args.per_platform,
+                                   host_delay=args.politeness)
+    if not args.with_browser:
+        bot.fetcher.platform_tiers = {
+            name: [tier for tier in tiers if tier != 'browser'] or tiers
+            for name, tiers in bot.fetcher.platform_tiers.items()
+        }
+
+    durations = []
+    failed = 0
+    check_platform = bot.check_platform
+
+    async def timed_check(platform, url):
+        started = time.perf_counter()
+        try:
+            return await check_platform(platform, url)
+        finally:
+            durations.append(time.perf_counter() - started)
+
+    bot.check_platform = timed_check
+    try:
+        for _ in range(args.rounds):
+            report = await bot.check_all_platforms(list(targets))
+            if report:
+                # Targets behind an open circuit are skipped without a check
+                failed += report['failed'] + len(targets) - report['targets']
+    finally:
+        await bot.fetcher.close()
+        if bot.parse_pool:
+            bot.parse_pool.shutdown()
+    return durations, failed
+
+async def on_temp_database(coro):
+    """Await `coro` against a fresh temporary database"""
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DATABASE_PATH = os.path.join(tmp, 'bench.db')
+        database.init_database()
+        try:
+            return await coro
+        finally:
+            database.close_connections()
+
+async def browser_available():
+    from playwright.async_api import async_playwright
+    try:
+        async with async_playwright() as playwright:
+            for browser_type in (playwright.firefox, playwright.chromium):
+                try:
+                    browser = await browser_type.launch(headless=True)
+                    await browser.close()
+                    return True
+                except Exception:
+                    continue
+    except Exception:
+        pass
+    return False
+
+async def wait_for_server(url):
+    async with aiohttp.ClientSession() as session:
+        for _ in range(100):
+            try:
+                async with session.get(url) as response:
+                    await response.read()
+                    return
+            except aiohttp.ClientError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError(f"Fixture server at {url} did not start")
+
+def environment(args):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=BENCH_DIR, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'machine': platform.platform(),
+        'cpus': os.cpu_count(),
+        'settings': settings(args)
+    }
+
+def settings(args):
+    """Options that change the numbers; baselines are only comparable when these match"""
+    return {
+        'latency': args.latency,
+        'jitter': args.jitter,
+        'error_rate': args.error_rate,
+        'errors': args.errors,
+        'page_scale': args.page_scale,
+        'concurrency': args.concurrency,
+        'per_platform': args.per_platform,
+        'politeness': args.politeness,
+        'rounds': args.rounds,
+        'with_browser': args.with_browser,
+        'keep_delays': args.keep_delays,
+        'seed': args.seed
+    }
+
+def print_results(results):
+    print(f"{'mode':<8}{'targets':>8}{'checks':>8}{'failed':>7}{'checks/s':>10}{'p50 ms':>9}{'p99 ms':>9}"
+          f"{'CPU s':>8}{'CPU %':>7}{'CPU ms/chk':>11}{'RSS MB':>8}{'peak MB':>9}")
+    for row in results:
+        if row.get('skipped'):
+            print(f"{row['mode']:<8}{row['targets']:>8}  skipped: {row['skipped']}")
+            continue
+        print(f"{row['mode']:<8}{row['targets']:>8}{row['checks']:>8}{row['failed']:>7}{row['checks_per_s']:>10}"
+              f"{row['p50_ms']:>9}{row['p99_ms']:>9}{row['cpu_s']:>8}{row['cpu_pct']:>7}"
+              f"{row['cpu_ms_per_check']:>11}{row['rss_mb']:>8}{row['peak_rss_mb']:>9}")
+
+def save_baseline(name, results, args):
+    os.makedirs(BASELINES_DIR, exist_ok=True)
+    path = os.path.join(BASELINES_DIR, f'{name}.json')
+    baseline = dict(environment(args), results={
+        f"{row['mode']}/{row['targets']}": row for row in results if not row.get('skipped')
+    })
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2)
+        f.write('\n')
+    print(f"Saved baseline to {path}")
+
+def compare_baseline(name, results, args):
+    """Print the change against a saved baseline and return the number of regressions"""
+    path = os.path.join(BASELINES_DIR, f'{name}.json')
+    with open(path) as f:
+        baseline = json.load(f)
+    print(f"Compared with {name} ({baseline.get('commit')}, {baseline.get('created_at')}, "
+          f"tolerance {args.tolerance:.0%}):")
+    differing = {key: value for key, value in settings(args).items() if baseline['settings'].get(key) != value}
+    if differing:
+        print(f"  Warning: settings differ from the baseline's: {differing}")
+
+    regressions = 0
+    for row in results:
+        old = baseline['results'].get(f"{row['mode']}/{row['targets']}")
+        if row.get('skipped') or not old:
+            continue
+        changes = []
+        for field, (higher_is_better, allowance) in COMPARED.items():
+            if not old.get(field):
+                continue
+            change = (row[field] - old[field]) / old[field]
+            regressed = (-change if higher_is_better else change) > args.tolerance * allowance
+            regressions += regressed
+            changes.append(f"{field} {old[field]} -> {row[field]} ({change:+.0%}){' REGRESSION' if regressed else ''}")
+        print(f"  {row['mode']}/{row['targets']}: " + ', '.join(changes))
+    return regressions
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Offline scraper and check cycle benchmark')
+    parser.add_argument('--modes', default='simple,browser,cycle', help=f'comma-separated, from {MODES}')
+    parser.add_argument('--targets', default='10,100,1000', help='comma-separated target counts')
+    parser.add_argument('--rounds', type=int, default=1, help='passes over the targets per run')
+    parser.add_argument('--latency', type=float, default=50, help='server latency in ms')
+    parser.add_argument('--jitter', type=float, default=10, help='+/- random latency in ms')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of responses that fail')
+    parser.add_argument('--errors', default=','.join(fixture_server.ERROR_KINDS),
+                        help=f'injected failure kinds, from {list(fixture_server.ERROR_KINDS)}')
+    parser.add_argument('--page-scale', type=float, default=1.0, help='multiplier for the padded page sizes')
+    parser.add_argument('--fixtures', default=fixture_server.FIXTURES_DIR,
+                        help='directory of recorded pages (missing ones fall back to the bundled fixtures)')
+    parser.add_argument('--concurrency', type=int, default=MAX_CONCURRENT_CHECKS)
+    parser.add_argument('--per-platform', type=int, default=MAX_CONCURRENT_PER_PLATFORM)
+    parser.add_argument('--politeness', type=float, default=0,
+                        help='seconds between request starts to one host in cycle mode (the bot uses HOST_POLITENESS_DELAY)')
+    parser.add_argument('--with-browser', action='store_true', help='keep the browser fetch tier in cycle mode')
+    parser.add_argument('--keep-delays', action='store_true', help='keep the fixed LinkedIn delay')
+    parser.add_argument('--port', type=int, default=fixture_server.PORT)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', metavar='NAME', help='save results as a baseline')
+    parser.add_argument('--compare', metavar='NAME', help='compare with a saved baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative regression')
+    parser.add_argument('--verbose', action='store_true', help='show the scrapers\' logs')
+    return parser.parse_args()
+
+async def main():
+    args = parse_args()
+    modes = [mode for mode in args.modes.split(',') if mode]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        sys.exit(f"Unknown modes: {sorted(unknown)}")
+    counts = [int(count) for count in args.targets.split(',') if count]
+    errors = tuple(kind for kind in args.errors.split(',') if kind)
+
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO)
+    else:
+        # Injected errors would otherwise log one line per failed check
+        logging.disable(logging.ERROR)
+    if not args.keep_delays:
+        scraper_backup.LINKEDIN_DELAY_SECONDS = 0
+    structured_sources.STRUCTURED_SOURCES['X']['url'] = fixture_server.syndication_template(args.port)
+
+    ctx = multiprocessing.get_context('spawn')
+    server = ctx.Process(
+        target=fixture_server.serve,
+        args=(args.port, args.latency, args.jitter, args.error_rate, errors, args.fixtures, args.page_scale, args.seed),
+        daemon=True
+    )
+    server.start()
+    results = []
+    try:
+        for name in fixture_server.PLATFORMS:
+            await wait_for_server(fixture_server.target_url(name, 'warmup', args.port))
+
+        runners = {'simple': run_simple, 'browser': run_browser, 'cycle': run_cycle}
+        has_browser = 'browser' not in modes or await browser_available()
+        for mode in modes:
+            if mode != 'browser' or has_browser:
+                # Imports, first connections and lazy setup stay out of the first measured run
+                await on_temp_database(runners[mode](fixture_server.make_targets(WARMUP_TARGETS, args.port), args))
+            for count in counts:
+                if mode == 'browser' and not has_browser:
+                    results.append({'mode': mode, 'targets': count, 'skipped': 'no Playwright browser could be launched'})
+                    continue
+                targets = fixture_server.make_targets(count, args.port)
+                results.append(await on_temp_database(measure(mode, count, lambda: runners[mode](targets, args))))
+                print(f"{mode} x {count}: {results[-1]['checks_per_s']} checks/s", flush=True)
+    finally:
+        server.terminate()
+        server.join()
+
+    print()
+    print(f"Server latency {args.latency:.0f}ms +/- {args.jitter:.0f}ms, error rate {args.error_rate:.0%}, "
+          f"concurrency {args.concurrency}")
+    print_results(results)
+    if args.save:
+        save_baseline(args.save, results, args)
+    if args.compare and compare_baseline(args.compare, results, args):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,57 @@
+"""
+Benchmark: parse throughput in the executor thread vs ParseWorkerPool at increasing process counts
+
+Usage: python benchmarks/bench_parse_workers.py [max_processes]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_text_extraction import synthetic_page
+from scraper_backup import parse_body
+from worker_pool import ParseWorkerPool
+
+# Large pages with little early text, so every parse walks the whole document
+PAGES = [synthetic_page(seed, script_kb=600, posts=0).encode() for seed in range(8)]
+JOBS = 200
+
+async def run_threaded():
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        loop.run_in_executor(None, parse_body, PAGES[i % len(PAGES)], 'utf-8')
+        for i in range(JOBS)
+    ))
+    return JOBS / (time.perf_counter() - start)
+
+async def run_pool(processes):
+    pool = ParseWorkerPool(processes=processes, max_pending=processes * 4)
+    await pool.warm_up()
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            pool.run(parse_body, PAGES[i % len(PAGES)], 'utf-8')
+            for i in range(JOBS)
+        ))
+        return JOBS / (time.perf_counter() - start)
+    finally:
+        pool.shutdown()
+
+async def main():
+    max_processes = int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 1)
+    print(f"{JOBS} parse jobs, {len(PAGES[0]) // 1024} KB pages, {os.cpu_count()} cores")
+
+    baseline = await run_threaded()
+    print(f"{'threads':<12} {baseline:>8.1f} pages/s")
+
+    processes = 1
+    while processes <= max_processes:
+        rate = await run_pool(processes)
+        print(f"{f'{processes} processes':<12} {rate:>8.1f} pages/s   {rate / baseline:.1f}x")
+        processes *= 2
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+"""
+Benchmark: posts history query latency at 1M+ rows, with and without indexes, plus retention/vacuum
+
+Usage: python benchmarks/bench_posts_table.py [rows]
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+
+PLATFORMS = ['LinkedIn', 'TikTok', 'Facebook', 'X']
+TARGETS_PER_PLATFORM = 250
+HISTORY_DAYS = 365
+
+QUERIES = {
+    'target history': '''
+        SELECT created_at FROM posts {hint}
+        WHERE platform = ? AND url = ? ORDER BY created_at DESC LIMIT 20
+    ''',
+    'platform timeline': '''
+        SELECT post_id, created_at FROM posts {hint}
+        WHERE platform = ? ORDER BY created_at DESC LIMIT 50
+    ''',
+    'dedup lookup': '''
+        SELECT 1 FROM posts {hint} WHERE platform = ? AND post_id = ? LIMIT 1
+    '''
+}
+
+def populate(conn, rows):
+    targets = [(platform, f'https://{platform.lower()}.example/account{i}')
+               for platform in PLATFORMS for i in range(TARGETS_PER_PLATFORM)]
+    database.register_targets(targets)
+
+    now = datetime.now(timezone.utc)
+    rng = random.Random(1)
+    batch = []
+    for n in range(rows):
+        platform, url = targets[n % len(targets)]
+        created = now - timedelta(seconds=rng.uniform(0, HISTORY_DAYS * 86400))
+        batch.append((platform, url, f'post{n}', 'content', url, True, created.strftime('%Y-%m-%d %H:%M:%S')))
+        if len(batch) == 50000:
+            conn.executemany('''
+                INSERT INTO posts (platform, url, post_id, post_content, post_url, is_new, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', batch)
+            conn.commit()
+            batch = []
+    if batch:
+        conn.executemany('''
+            INSERT INTO posts (platform, url, post_id, post_content, post_url, is_new, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', batch)
+        conn.commit()
+    return targets
+
+def time_query(conn, sql, make_params, runs):
+    samples = []
+    for _ in range(runs):
+        params = make_params()
+        started = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DATABASE_PATH = os.path.join(tmp, 'bench.db')
+        database.init_database()
+        conn = database.get_connection()
+
+        started = time.perf_counter()
+        targets = populate(conn, rows)
+        print(f"Inserted {rows} posts for {len(targets)} targets in {time.perf_counter() - started:.1f}s")
+
+        rng = random.Random(2)
+        params = {
+            'target history': lambda: targets[rng.randrange(len(targets))],
+            'platform timeline': lambda: (rng.choice(PLATFORMS),),
+            'dedup lookup': lambda: (rng.choice(PLATFORMS), f'post{rng.randrange(rows)}')
+        }
+
+        print(f"{'query':<18} {'indexed p50/p99 ms':>20} {'full scan p50/p99 ms':>22}")
+        for name, sql in QUERIES.items():
+            indexed = time_query(conn, sql.format(hint=''), params[name], 500)
+            scan = time_query(conn, sql.format(hint='NOT INDEXED'), params[name], 5)
+            print(f"{name:<18} {indexed[0]:>9.3f} / {indexed[1]:<8.3f} {scan[0]:>10.1f} / {scan[1]:<8.1f}")
+
+        size_before = os.path.getsize(database.DATABASE_PATH)
+        started = time.perf_counter()
+        deleted = database.rollup_old_posts(retention_days=90)
+        rollup_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        released = database.incremental_vacuum()
+        vacuum_seconds = time.perf_counter() - started
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        size_after = os.path.getsize(database.DATABASE_PATH)
+        daily_rows = conn.execute('SELECT COUNT(*), SUM(post_count) FROM posts_daily').fetchone()
+
+        print(f"Retention (90 days): rolled up {deleted} posts into {daily_rows[0]} daily rows "
+              f"(sum {daily_rows[1]}) in {rollup_seconds:.1f}s")
+        print(f"Incremental vacuum: released {released} pages in {vacuum_seconds:.1f}s, "
+              f"file {size_before / 2**20:.0f} MB -> {size_after / 2**20:.0f} MB")
+        database.close_connections()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Microbenchmark: BeautifulSoup full-tree text extraction vs the streaming extractor
+
+Usage: python benchmarks/bench_text_extraction.py [page.html ...]
+Without arguments it uses synthetic pages shaped like the social profiles we scrape.
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_extraction import extract_text_soup, extract_visible_text
+
+def synthetic_page(seed, script_kb=300, posts=200):
+    """Build a profile-like page: large inline JSON/scripts in the head, then many posts"""
+    rng = random.Random(seed)
+    words = ['launch', 'update', 'team', 'today', 'new', 'معرض', 'خبر', 'video', 'hiring', 'event']
+    state = '{"items": [%s]}' % ','.join('{"id": %d, "desc": "%s"}' % (i, ' '.join(rng.choices(words, k=8)))
+                                       for i in range(script_kb * 10))
+    parts = [
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>Profile</title>',
+        '<style>' + 'div.post{margin:0;padding:4px}' * 200 + '</style>',
+        f'<script id="__STATE__" type="application/json">{state[:script_kb * 1024]}</script>',
+        '</head><body><nav><a href="/">Home</a> <a href="/explore">Explore</a></nav><main>'
+    ]
+    for i in range(posts):
+        text = ' '.join(rng.choices(words, k=30))
+        parts.append(
+            f'<article class="post" data-id="{i}"><img src="/p/{i}.jpg">'
+            f'<p>{text} &amp; more&nbsp;&#8230;</p><!-- post {i} -->'
+            f'<script>track({i})</script></article>\n'
+        )
+    parts.append('</main></body></html>')
+    return ''.join(parts)
+
+def load_pages(paths):
+    if not paths:
+        return [synthetic_page(seed) for seed in range(5)]
+    pages = []
+    for path in paths:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            pages.append(f.read())
+    return pages
+
+def measure(name, extract, pages, min_seconds=2.0):
+    """Report pages/s over repeated runs and peak traced memory for one pass"""
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_seconds:
+        for page in pages:
+            extract(page)
+            count += 1
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for page in pages:
+        extract(page)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:<10} {count / elapsed:>10.1f} pages/s   peak {peak / 1024:>10.1f} KB")
+    return count / elapsed
+
+def main():
+    pages = load_pages(sys.argv[1:])
+    print(f"{len(pages)} pages, average {sum(map(len, pages)) // len(pages) // 1024} KB")
+
+    for page in pages:
+        if extract_text_soup(page) != extract_visible_text(page):
+            print("Mismatch between extractors, results are not comparable")
+            sys.exit(1)
+
+    soup_rate = measure('bs4', extract_text_soup, pages)
+    stream_rate = measure('streaming', extract_visible_text, pages)
+    print(f"speedup    {stream_rate / soup_rate:.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+Local stand-in for the monitored platforms: replays recorded pages from benchmarks/fixtures/
+
+Each platform is served on its own port (LinkedIn on the base port, then TikTok, X and
+Facebook), so per-host connection pools, politeness spacing and circuit breakers behave as they
+do against the real sites. `__HANDLE__` in a fixture is replaced with the requested account and
+`<!--PADDING-->` with inline scripts and styles up to the page's realistic size. Responses wait
+for the simulated latency; a seeded share of them fail with 503, 429, a truncated body or a
+login wall ('empty').
+
+Usage: python benchmarks/fixture_server.py [base port] [latency ms] [error rate]
+"""
+import asyncio
+import logging
+import os
+import random
+import sys
+
+from aiohttp import web
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+PLATFORMS = ['LinkedIn', 'TikTok', 'X', 'Facebook']
+PORT = 5092
+
+# Uncompressed sizes of the real pages (KB), padded up to with scripts and styles
+PAGE_KB = {
+    'linkedin': 300,
+    'tiktok': 700,
+    'x': 250,
+    'x_syndication': 150,
+    'facebook': 1000,
+    'empty': 0
+}
+
+ERROR_KINDS = ('503', '429', 'truncated', 'empty')
+
+def platform_port(platform, port=PORT):
+    return port + PLATFORMS.index(platform)
+
+def target_url(platform, handle, port=PORT):
+    """URL of an account on the stand-in server, shaped like the real profile URL"""
+    base = f'http://127.0.0.1:{platform_port(platform, port)}'
+    if platform == 'LinkedIn':
+        return f'{base}/company/{handle}'
+    if platform == 'TikTok':
+        return f'{base}/@{handle}'
+    return f'{base}/{handle}'
+
+def syndication_template(port=PORT):
+    """Replacement for the X timeline endpoint in structured_sources.STRUCTURED_SOURCES"""
+    return f'http://127.0.0.1:{platform_port("X", port)}/syndication/{{handle}}'
+
+def make_targets(count, port=PORT):
+    """`count` (platform, url) targets spread evenly across the platforms"""
+    return [
+        (PLATFORMS[n % len(PLATFORMS)], target_url(PLATFORMS[n % len(PLATFORMS)], f'account{n}', port))
+        for n in range(count)
+    ]
+
+def padding(size):
+    """About `size` bytes of bundle scripts and styles, which text extraction has to skip"""
+    blocks = []
+    total = 0
+    n = 0
+    while total < size:
+        if n % 5 == 4:
+            block = ('<style>' + ''.join(f'.c{n}-{i}{{margin:{i}px;color:#{i:06x}}}' for i in range(40))
+                     + '</style>\n')
+        else:
+            block = ('<script>' + ''.join(f'window.__m{n}_{i}=function(a,b){{return a.map(function(x){{'
+                                          f'return x*b+{i}}})}};' for i in range(20))
+                     + '</script>\n')
+        blocks.append(block)
+        total += len(block)
+        n += 1
+    return ''.join(blocks)
+
+def load_fixtures(fixtures_dir=FIXTURES_DIR, page_scale=1.0):
+    """Fixture name -> page split around `__HANDLE__`, padded to PAGE_KB x page_scale"""
+    fixtures = {}
+    for name in PAGE_KB:
+        path = os.path.join(fixtures_dir, f'{name}.html')
+        if not os.path.exists(path):
+            path = os.path.join(FIXTURES_DIR, f'{name}.html')
+        with open(path, encoding='utf-8') as f:
+            page = f.read()
+        size = int(PAGE_KB[name] * 1024 * page_scale) - len(page)
+        page = page.replace('<!--PADDING-->', padding(size) if size > 0 else '', 1)
+        fixtures[name] = [part.encode('utf-8') for part in page.split('__HANDLE__')]
+    return fixtures
+
+def render(parts, handle):
+    return handle.encode('utf-8').join(parts)
+
+def fixture_name(platform, path):
+    if platform == 'X' and path.startswith('/syndication/'):
+        return 'x_syndication'
+    return platform.lower()
+
+def create_app(platform, fixtures, latency=50, jitter=0, error_rate=0.0, errors=ERROR_KINDS, rng=None):
+    """aiohttp app answering every path with the platform's fixture"""
+    rng = rng or random.Random(0)
+
+    async def page(request):
+        delay = latency + (rng.uniform(-jitter, jitter) if jitter else 0)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        handle = request.path.rstrip('/').rsplit('/', 1)[-1].lstrip('@') or 'account'
+        error = rng.choice(errors) if error_rate and rng.random() < error_rate else None
+        if error == '503':
+            return web.Response(status=503, text='Service Unavailable')
+        if error == '429':
+            return web.Response(status=429, text='Too Many Requests', headers={'Retry-After': '60'})
+
+        body = render(fixtures['empty' if error == 'empty' else fixture_name(platform, request.path)], handle)
+        if error == 'truncated':
+            # Headers promise the full page, then the connection drops halfway through the body
+            response = web.StreamResponse(headers={'Content-Type': 'text/html; charset=utf-8',
+                                                   'Content-Length': str(len(body))})
+            await response.prepare(request)
+            await response.write(body[:len(body) // 2])
+            request.transport.close()
+            return response
+        return web.Response(body=body, content_type='text/html', charset='utf-8')
+
+    app = web.Application()
+    app.router.add_get('/{path:.*}', page)
+    return app
+
+async def run_server(port=PORT, latency=50, jitter=0, error_rate=0.0, errors=ERROR_KINDS,
+                     fixtures_dir=FIXTURES_DIR, page_scale=1.0, seed=0):
+    fixtures = load_fixtures(fixtures_dir, page_scale)
+    rng = random.Random(seed)
+    for platform in PLATFORMS:
+        app = create_app(platform, fixtures, latency, jitter, error_rate, errors, rng)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, '127.0.0.1', platform_port(platform, port)).start()
+    await asyncio.Event().wait()
+
+def serve(*args, **kwargs):
+    """Process entry point: serve until terminated"""
+    # Dropped connections from truncated responses are expected
+    logging.basicConfig(level=logging.CRITICAL)
+    asyncio.run(run_server(*args, **kwargs))
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else PORT
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 50
+    error_rate = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+    for platform in PLATFORMS:
+        print(f"{platform}: {target_url(platform, 'example', port)}")
+    serve(port, latency, error_rate=error_rate)
@@ -0,0 +1,124 @@
+"""
+Load test: dashboard requests per second and latency for /api/status and / per server
+
+Each server runs in its own process against a temporary database with the given number of
+targets; keep-alive clients request each path for a fixed duration with gzip/brotli accepted.
+
+Usage: python benchmarks/load_test_dashboard.py [targets] [clients] [seconds]
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+
+SERVERS = ['werkzeug', 'waitress']
+PATHS = ['/api/status', '/']
+PORT = 5090
+
+def serve(db_path, server, port):
+    logging.basicConfig(level=logging.WARNING)
+    # Queue depth warnings are expected when clients outnumber threads
+    logging.getLogger('waitress.queue').setLevel(logging.ERROR)
+    database.DATABASE_PATH = db_path
+    import dashboard
+    dashboard.DASHBOARD_SERVER = server
+    dashboard.serve_dashboard('127.0.0.1', port)
+
+def populate(targets):
+    rows = [('LinkedIn', f'https://www.linkedin.com/company/bench{i}') for i in range(targets)]
+    database.register_targets(rows)
+    with database.transaction() as cursor:
+        database.write_status_updates(cursor, [
+            database.make_status_update(
+                platform, url,
+                {'post_id': f'post{n}', 'content': f'Benchmark post {n} ' * 8, 'url': url},
+                None if n % 7 else 'Timed out', n % 3 == 0
+            )
+            for n, (platform, url) in enumerate(rows)
+        ])
+
+async def wait_for_server(url):
+    async with aiohttp.ClientSession() as session:
+        for _ in range(100):
+            try:
+                async with session.get(url) as response:
+                    await response.read()
+                    return
+            except aiohttp.ClientError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError(f"Server at {url} did not start")
+
+async def load(url, clients, seconds):
+    latencies = []
+    errors = 0
+    stop_at = time.perf_counter() + seconds
+    connector = aiohttp.TCPConnector(limit=clients)  # One keep-alive connection per client
+    headers = {'Accept-Encoding': 'gzip, br'}
+
+    async def client(session):
+        nonlocal errors
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            try:
+                async with session.get(url, headers=headers) as response:
+                    await response.read()
+                    if response.status != 200:
+                        errors += 1
+            except aiohttp.ClientError:
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    async with aiohttp.ClientSession(connector=connector) as session:
+        started = time.perf_counter()
+        await asyncio.gather(*(client(session) for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'rps': len(latencies) / elapsed,
+        'p50': statistics.median(latencies),
+        'p99': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        'errors': errors
+    }
+
+def main():
+    targets = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        database.DATABASE_PATH = db_path
+        database.init_database()
+        populate(targets)
+        database.close_connections()
+
+        print(f"{targets} targets, {clients} keep-alive clients, {seconds:.0f}s per run")
+        print(f"{'server':<10} {'path':<12} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        ctx = multiprocessing.get_context('spawn')
+        for server in SERVERS:
+            process = ctx.Process(target=serve, args=(db_path, server, PORT), daemon=True)
+            process.start()
+            try:
+                base = f"http://127.0.0.1:{PORT}"
+                asyncio.run(wait_for_server(base + '/api/health'))
+                for path in PATHS:
+                    result = asyncio.run(load(base + path, clients, seconds))
+                    print(f"{server:<10} {path:<12} {result['rps']:>9.1f} {result['p50']:>8.2f} "
+                          f"{result['p99']:>8.2f} {result['errors']:>7}")
+            finally:
+                process.terminate()
+                process.join()
+
+if __name__ == '__main__':
+    main()
@@ -2,16 +2,33 @@
 Discord bot for social media monitoring and notifications
 """
 import asyncio
+import functools
 import logging
 import discord
-from discord.ext import tasks
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from datetime import datetime
-from typing import Optional, Union
-from config import DISCORD_TOKEN, DISCORD_CHANNEL_ID, SOCIAL_MEDIA_URLS, SCRAPING_INTERVAL
+from typing import Optional
+from config import (
+    DISCORD_TOKEN, DISCORD_CHANNEL_ID, SOCIAL_MEDIA_URLS, POLL_TICK_INTERVAL,
+    SCRAPE_WORKER_PROCESSES, CHECK_MODE, JOB_POLL_INTERVAL, POSTS_MAINTENANCE_INTERVAL_HOURS,
+    DISCORD_MAX_RATELIMIT_WAIT, METRICS_SAVE_INTERVAL
+)
 from scraper import SocialMediaScraper
-from scraper_backup import SimpleScraper
-from database import get_last_post, update_post_status, reset_new_post_flags
+from scraper_backup import AsyncSimpleScraper
+from tiered_scraper import TieredScraper
+from check_engine import CheckEngine
+from worker_pool import ParseWorkerPool
+from job_queue import SQLiteJobQueue
+from polling import AdaptivePollScheduler
+from circuit_breaker import breakers
+from notifier import DiscordNotifier
+from post_identity import diff_new_posts
+from metrics import metrics, set_process_name
+from database import (
+    get_last_post, queue_post_status, flush_status_updates, status_buffer,
+    get_all_monitoring_status, get_enabled_targets, run_posts_maintenance,
+    save_metrics, save_breakers, load_breakers
+)
 
 logger = logging.getLogger(__name__)
 
@@ -22,11 +39,28 @@ class DiscordBot:
         intents.message_content = False  # Don't need message content for this bot
         intents.guilds = True  # Need to access guild channels
         
-        self.client = discord.Client(intents=intents)
+        # Long rate-limit waits raise instead of sleeping, so the notifier can requeue and move on
+        self.client = discord.Client(intents=intents, max_ratelimit_timeout=DISCORD_MAX_RATELIMIT_WAIT)
         self.scraper = SocialMediaScraper()
-        self.backup_scraper = SimpleScraper()  # Fallback scraper
+        # Parsing moves to worker processes when configured; DB writes and notifications stay here
+        self.parse_pool = ParseWorkerPool() if SCRAPE_WORKER_PROCESSES > 0 else None
+        self.backup_scraper = AsyncSimpleScraper(worker_pool=self.parse_pool)  # Fallback scraper (non-blocking)
+        # Structured sources first, then page text, then the browser (launched only when needed)
+        self.fetcher = TieredScraper(self.backup_scraper, self.scraper)
+        self.check_engine = CheckEngine()
+        self.poll_scheduler = AdaptivePollScheduler()
+        # Configured accounts seed the target registry; further targets live only in the database
+        self.poll_scheduler.register(SOCIAL_MEDIA_URLS.items())
+        # In coordinator mode checks run in worker.py processes; this process dedups and notifies
+        self.job_queue = SQLiteJobQueue() if CHECK_MODE == 'coordinator' else None
+        self.cycle_tasks = set()
+        # Failing hosts stay backed off across restarts
+        load_breakers()
         self.scheduler = AsyncIOScheduler()
         self.channel: Optional[discord.TextChannel] = None
+        # New post notifications are queued in the database and delivered off the check path
+        self.notifier = DiscordNotifier(self.build_new_post_embed)
+        set_process_name('bot')
         
         # Set up event handlers
         self.setup_events()
@@ -45,20 +79,46 @@ class DiscordBot:
                     self.channel = channel
                     logger.info(f'Connected to channel: {channel.name}')
                     await self.channel.send('🤖 Social Media Monitor Bot is now online and monitoring!')
+                    # Also delivers notifications left pending by a previous run
+                    self.notifier.start(channel)
                 else:
                     logger.error(f'Could not find text channel with ID: {DISCORD_CHANNEL_ID}')
             else:
                 logger.warning('No Discord channel ID configured')
             
-            # Start the monitoring scheduler
+            if self.parse_pool:
+                await self.parse_pool.warm_up()
+            
+            # Start the monitoring scheduler; each target has its own adaptive interval
             self.scheduler.add_job(
-                self.check_all_platforms,
+                self.check_due_platforms,
                 'interval',
-                seconds=SCRAPING_INTERVAL,
+                seconds=POLL_TICK_INTERVAL,
                 id='social_media_check'
             )
+            if self.job_queue:
+                self.scheduler.add_job(
+                    self.collect_job_results,
+                    'interval',
+                    seconds=JOB_POLL_INTERVAL,
+                    id='job_result_collection'
+                )
+            # Retention rollup and incremental vacuum run in a thread, away from the check loop
+            self.scheduler.add_job(
+                self.run_maintenance,
+                'interval',
+                hours=POSTS_MAINTENANCE_INTERVAL_HOURS,
+                id='posts_maintenance'
+            )
+            # Metrics and breaker states go to the database so the dashboard shows them in any mode
+            self.scheduler.add_job(
+                self.save_metrics,
+                'interval',
+                seconds=METRICS_SAVE_INTERVAL,
+                id='metrics_save'
+            )
             self.scheduler.start()
-            logger.info(f'Scheduler started - checking every {SCRAPING_INTERVAL} seconds')
+            logger.info(f'Scheduler started - looking for due targets every {POLL_TICK_INTERVAL} seconds')
             
             # Do an initial check
             await self.check_all_platforms()
@@ -77,117 +137,241 @@ class DiscordBot:
                 await self.check_all_platforms()
                 await message.channel.send('✅ Manual check completed!')
 
-    async def check_all_platforms(self):
-        """Check all social media platforms for new posts"""
-        logger.info("Starting platform check cycle...")
+    async def run_blocking(self, func, *args, **kwargs):
+        """Run a blocking (database) call in the default executor, off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+    async def check_due_platforms(self):
+        """Check only the targets whose adaptive poll interval has elapsed"""
+        targets = await self.run_blocking(self.poll_scheduler.due_targets)
+        if targets:
+            # Run in the background so a long cycle never delays targets that fall due later
+            task = asyncio.create_task(self.check_all_platforms(targets))
+            self.cycle_tasks.add(task)
+            task.add_done_callback(self.cycle_tasks.discard)
+
+    async def check_all_platforms(self, targets=None):
+        """Check social media platforms for new posts (all configured targets by default)"""
+        if targets is None:
+            targets = self.poll_scheduler.claim(await self.run_blocking(get_enabled_targets))
+        if self.job_queue:
+            return await self.dispatch_checks(targets)
+        logger.info(f"Starting platform check cycle for {len(targets)} targets...")
         
         try:
-            # Try to initialize main browser, but don't fail if it doesn't work
-            try:
-                if not self.scraper.browser:
-                    await self.scraper.init_browser()
-            except Exception as browser_error:
-                logger.warning(f"Main browser failed to initialize: {browser_error}")
-                logger.info("Will use backup scraper for all platforms")
-            
-            for platform, url in SOCIAL_MEDIA_URLS.items():
-                await self.check_platform(platform, url)
-                # Small delay between platform checks
-                await asyncio.sleep(2)
+            # Hosts with an open circuit are skipped without a fetch or a DB write
+            allowed = [(platform, url) for platform, url in targets if breakers.allow_request(url)]
+            if len(allowed) < len(targets):
+                logger.info(f"Skipping {len(targets) - len(allowed)} targets with open circuits")
+            
+            # Targets run concurrently; per-host spacing replaces the fixed delay
+            report = await self.check_engine.run(allowed, self.check_platform)
+            # Write the whole cycle's status updates in one transaction
+            await self.run_blocking(flush_status_updates)
+            await self.run_blocking(save_breakers)
+            logger.info(
+                f"Platform check cycle completed: {report['targets']} targets in "
+                f"{report['wall_time']:.1f}s wall time "
+                f"(sum of target times {report['target_time']:.1f}s, "
+                f"speedup {report['speedup']:.1f}x, {report['failed']} failed)"
+            )
+            cache_stats = self.backup_scraper.validator_cache.stats()
+            logger.info(
+                f"HTTP validator cache: {cache_stats['not_modified_hits']} not-modified, "
+                f"{cache_stats['body_hash_hits']} unchanged-body, {cache_stats['misses']} misses "
+                f"({cache_stats['hit_rate']}% hit rate)"
+            )
+            for platform, tiers in self.fetcher.stats().items():
+                logger.info(f"{platform} fetch tiers: " + ", ".join(
+                    f"{tier} served {counts['served']}, missed {counts['missed']} ({counts['avg_ms']}ms avg)"
+                    for tier, counts in tiers.items()
+                ))
+            write_stats = status_buffer.stats()
+            logger.info(
+                f"Status write buffer: {write_stats['flush_count']} flushes, "
+                f"last {write_stats['last_flush_ms']}ms, max {write_stats['max_flush_ms']}ms, "
+                f"{write_stats['pending']} pending"
+            )
+            if self.parse_pool:
+                pool_stats = self.parse_pool.stats()
+                logger.info(
+                    f"Parse workers: {pool_stats['processes']} processes, "
+                    f"{pool_stats['completed']} jobs done, {pool_stats['failed']} failed, "
+                    f"{pool_stats['restarts']} restarts, {pool_stats['backpressure_waits']} backpressure waits"
+                )
+            return report
                 
         except Exception as e:
             logger.error(f"Error during platform check cycle: {e}")
+        finally:
+            # Next poll times are learned from post history, including this cycle's flushed posts
+            await self.run_blocking(self.poll_scheduler.reschedule, targets)
+            poll_stats = self.poll_scheduler.stats()
+            logger.info(f"Adaptive polling: ~{poll_stats['checks_per_day']} checks/day projected")
         
         logger.info("Platform check cycle completed")
 
+    async def run_maintenance(self):
+        """Run posts retention and compaction without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, run_posts_maintenance)
+
+    async def save_metrics(self):
+        """Save this process's metrics and breaker states without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, save_metrics)
+        await loop.run_in_executor(None, save_breakers)
+
+    async def dispatch_checks(self, targets):
+        """Queue checks for worker processes; results come back through collect_job_results"""
+        dispatched = []
+        try:
+            loop = asyncio.get_running_loop()
+            # Workers record host failures; hosts with an open circuit are skipped without a job
+            await loop.run_in_executor(None, load_breakers)
+            allowed = [(platform, url) for platform, url in targets if breakers.allow_request(url)]
+            enqueued = await loop.run_in_executor(None, self.job_queue.enqueue, allowed)
+            dispatched = allowed
+            logger.info(
+                f"Queued {enqueued} check jobs ({len(allowed) - enqueued} already queued, "
+                f"{len(targets) - len(allowed)} skipped with open circuits)"
+            )
+        except Exception as e:
+            logger.error(f"Failed to queue check jobs: {e}")
+        finally:
+            # Dispatched targets are rescheduled when their result arrives
+            await self.run_blocking(
+                self.poll_scheduler.reschedule, [target for target in targets if target not in dispatched]
+            )
+
+    async def collect_job_results(self):
+        """Record and notify results that workers have finished (coordinator mode)"""
+        try:
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(None, self.job_queue.collect_results)
+            if not results:
+                return
+
+            for job in results:
+                await self.process_check_result(job['platform'], job['url'], job['post'], job['error'])
+            await self.run_blocking(flush_status_updates)
+
+            await self.run_blocking(self.poll_scheduler.reschedule, [(job['platform'], job['url']) for job in results])
+            queue_stats = await loop.run_in_executor(None, self.job_queue.stats)
+            logger.info(
+                f"Collected {len(results)} job results; queue has {queue_stats['queued']} queued, "
+                f"{queue_stats['leased']} leased across {queue_stats['busy_workers']} busy workers"
+            )
+        except Exception as e:
+            logger.error(f"Failed to collect job results: {e}")
+
     async def check_platform(self, platform, url):
-        """Check a specific platform for new posts"""
+        """Check a specific platform for new posts; returns False when the check failed"""
         try:
             logger.info(f"Checking {platform}...")
             
-            # Get the last known post
-            last_post = get_last_post(platform)
-            
-            # Use backup scraper only (main scraper has browser issues)
+            # Cheapest tier first; the browser is only launched when the others find nothing
             current_post = None
-            logger.info(f"Using backup scraper for {platform}")
             try:
-                current_post = self.backup_scraper.scrape_platform(platform, url)
+                with metrics.timer('check_stage_seconds', platform=platform, target=url, stage='fetch'):
+                    current_post = await self.fetcher.scrape_platform(platform, url)
                 if current_post:
-                    logger.info(f"Backup scraper succeeded for {platform}: {current_post['post_id']}")
+                    logger.info(f"{platform} check served by {current_post['tier']} tier: {current_post['post_id']}")
                 else:
-                    logger.warning(f"Backup scraper returned None for {platform}")
-            except Exception as backup_error:
-                logger.error(f"Backup scraper failed for {platform}: {backup_error}")
+                    logger.warning(f"No fetch tier found posts for {platform}")
+            except Exception as fetch_error:
+                logger.error(f"Fetching failed for {platform}: {fetch_error}")
                 current_post = None
             
-            if current_post is None:
-                # Scraping failed or no posts found
-                update_post_status(platform, url, error_message="No posts found or scraping failed")
-                logger.warning(f"No posts found for {platform}")
-                return
-            
-            # Check if this is a new post
-            is_new = False
-            if last_post is None:
-                # First time checking this platform
-                is_new = True
-                logger.info(f"First post detected for {platform}")
-            elif last_post['post_id'] != current_post['post_id']:
-                # Post ID changed, new post detected
-                is_new = True
-                logger.info(f"New post detected for {platform}")
-            
-            # Update database
-            update_post_status(platform, url, current_post, is_new=is_new)
-            
-            # Send Discord notification for new posts
-            if is_new and self.channel:
-                await self.send_new_post_notification(platform, current_post)
+            return await self.process_check_result(platform, url, current_post)
                 
         except Exception as e:
             logger.error(f"Error checking {platform}: {e}")
-            update_post_status(platform, url, error_message=str(e))
+            breakers.settle_probe(url, False)
+            await self.run_blocking(queue_post_status, platform, url, error_message=str(e))
+            return False
 
-    async def send_new_post_notification(self, platform, post_data):
-        """Send a Discord notification for a new post"""
+    async def process_check_result(self, platform, url, current_post, error_message=None):
+        """Compare a scraped post with the last known one, record the status and notify
+
+        Returns False when the check failed (no post, or the result could not be recorded).
+        """
+        # A half-open probe ends with the check even when no fetch recorded the target's host
+        breakers.settle_probe(url, current_post is not None)
         try:
-            if not self.channel:
-                logger.warning("No Discord channel configured for notifications")
-                return
-                
-            embed = discord.Embed(
-                title=f"🆕 New {platform} Post Detected!",
-                color=self.get_platform_color(platform),
-                timestamp=datetime.now()
-            )
-            
-            embed.add_field(
-                name="Content Preview",
-                value=post_data['content'][:500] + ('...' if len(post_data['content']) > 500 else ''),
-                inline=False
-            )
-            
-            embed.add_field(
-                name="Link",
-                value=post_data['url'],
-                inline=False
-            )
+            if current_post is None:
+                # Scraping failed or no posts found; the miss is this target's (host failures were
+                # recorded by the fetch tiers)
+                error_message = error_message or "No posts found or scraping failed"
+                metrics.inc('checks_total', platform=platform, target=url, result='error')
+                # A full buffer flushes inside queue_post_status, so it runs off the loop as well
+                await self.run_blocking(queue_post_status, platform, url, error_message=error_message)
+                logger.warning(f"No posts found for {platform}")
+                return False
             
-            embed.set_footer(text=f"Social Media Monitor Bot")
+            # Get the last known post
+            last_post = await self.run_blocking(get_last_post, platform, url)
             
-            await self.channel.send(embed=embed)
-            logger.info(f"Sent notification for new {platform} post")
+            # Diff the page's top posts against the last post and the target's seen set
+            last_post_id = last_post['post_id'] if last_post else None
+            # Page fingerprints and post ids from different fetch tiers do not compare
+            last_tier = last_post.get('tier') if last_post else None
+            tier_changed = bool(last_tier and current_post.get('tier') and last_tier != current_post['tier'])
+            # The seen set is loaded from the database on a target's first check
+            new_posts = await self.run_blocking(diff_new_posts, platform, url, current_post, last_post_id, tier_changed)
+            is_new = bool(new_posts)
+            metrics.inc('checks_total', platform=platform, target=url, result='ok')
+            if is_new:
+                metrics.inc('new_posts_total', len(new_posts), platform=platform, target=url)
+            if not last_post_id:
+                logger.info(f"First post detected for {platform}")
+            elif is_new:
+                logger.info(f"{len(new_posts)} new post(s) detected for {platform}")
+            elif current_post['post_id'] != last_post_id:
+                # An older post back on top (unpinned, reordered feed) or a legacy id upgrade
+                logger.info(f"Top post changed for {platform} ({url}) without new posts")
             
+            # Update database; each new post queues its Discord notification in the same write
+            await self.run_blocking(queue_post_status, platform, url, current_post, is_new=is_new,
+                                    notify=is_new and self.channel is not None, new_posts=new_posts)
+            return True
+                
         except Exception as e:
-            logger.error(f"Failed to send Discord notification: {e}")
+            logger.error(f"Error recording result for {platform}: {e}")
+            await self.run_blocking(queue_post_status, platform, url, error_message=str(e))
+            return False
+
+    def build_new_post_embed(self, notification):
+        """Build the Discord embed announcing a queued new post"""
+        platform = notification['platform']
+        content = notification['content']
+        embed = discord.Embed(
+            title=f"🆕 New {platform} Post Detected!",
+            color=self.get_platform_color(platform),
+            # Detection time, not send time, since the message may wait in the queue
+            timestamp=datetime.fromtimestamp(notification['detected_at']).astimezone()
+        )
+        
+        embed.add_field(
+            name="Content Preview",
+            value=(content[:500] + ('...' if len(content) > 500 else '')) or 'No preview available',
+            inline=False
+        )
+        
+        embed.add_field(
+            name="Link",
+            value=notification['post_url'] or notification['url'],
+            inline=False
+        )
+        
+        embed.set_footer(text=f"Social Media Monitor Bot")
+        return embed
 
     async def send_status_update(self, channel):
         """Send current monitoring status to Discord"""
         try:
-            from database import get_all_monitoring_status
-            
-            status_list = get_all_monitoring_status()
+            status_list = await self.run_blocking(get_all_monitoring_status)
             
             embed = discord.Embed(
                 title="📊 Social Media Monitoring Status",
@@ -195,7 +379,11 @@ class DiscordBot:
                 timestamp=datetime.now()
             )
             
-            for status in status_list:
+            # Discord embeds hold at most 25 fields
+            if len(status_list) > 25:
+                embed.description = f"Showing 25 of {len(status_list)} targets; see the dashboard for the rest"
+            
+            for status in status_list[:25]:
                 success_rate = f"{(status['success_count'] / max(status['check_count'], 1) * 100):.1f}%"
                 
                 field_value = f"**Last Check:** {status['last_checked'] or 'Never'}\n"
@@ -206,7 +394,7 @@ class DiscordBot:
                     field_value += f"**Error:** {status['error_message'][:100]}\n"
                 
                 embed.add_field(
-                    name=f"{status['platform']}",
+                    name=f"{status['platform']}: {status['url']}"[:256],
                     value=field_value,
                     inline=True
                 )
@@ -234,6 +422,12 @@ class DiscordBot:
             logger.error(f"Failed to start Discord bot: {e}")
             raise
         finally:
-            # Cleanup
+            # Cleanup; undelivered notifications stay queued for the next start
+            await self.notifier.stop()
             if self.scraper:
                 await self.scraper.close_browser()
+            await self.backup_scraper.close()
+            if self.parse_pool:
+                self.parse_pool.shutdown()
+            save_metrics()
+            save_breakers()
@@ -0,0 +1,192 @@
+"""
+Pool of Playwright browser contexts with warm, reusable pages
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from config import (
+    BROWSER_POOL_SIZE, BROWSER_PAGES_PER_CONTEXT,
+    BROWSER_CONTEXT_MAX_NAVIGATIONS, BROWSER_ISOLATE_PLATFORMS
+)
+
+logger = logging.getLogger(__name__)
+
+SHARED_KEY = 'shared'
+
+class PooledContext:
+    def __init__(self, context, key):
+        self.context = context
+        self.key = key
+        self.idle_pages = []
+        self.leased = 0
+        self.navigations = 0
+        self.retiring = False
+        self.crashed = False
+
+    def page_count(self):
+        """Pages currently owned by this context (idle and leased)"""
+        return len(self.idle_pages) + self.leased
+
+class BrowserContextPool:
+    """Leases pages from N contexts per key, recycling contexts after K navigations or a crash"""
+
+    def __init__(self, browser, context_options=None, size=BROWSER_POOL_SIZE,
+                 pages_per_context=BROWSER_PAGES_PER_CONTEXT,
+                 max_navigations=BROWSER_CONTEXT_MAX_NAVIGATIONS,
+                 isolate_platforms=BROWSER_ISOLATE_PLATFORMS,
+                 on_context_created=None, on_page_released=None):
+        self.browser = browser
+        self.context_options = context_options or {}
+        self.size = size
+        self.pages_per_context = pages_per_context
+        self.max_navigations = max_navigations
+        self.isolate_platforms = isolate_platforms
+        self.on_context_created = on_context_created  # async callback(context, key)
+        self.on_page_released = on_page_released  # callback(page, key)
+        self.contexts = {}
+        self.semaphores = {}
+        self.lock = asyncio.Lock()
+        self.closed = False
+
+    def get_key(self, platform):
+        """Contexts are per platform when isolated, so cookies never cross platforms"""
+        return platform.lower() if self.isolate_platforms else SHARED_KEY
+
+    def get_semaphore(self, key):
+        """Limit concurrent leases per key to the pool's page capacity"""
+        if key not in self.semaphores:
+            self.semaphores[key] = asyncio.Semaphore(self.size * self.pages_per_context)
+        return self.semaphores[key]
+
+    async def create_context(self, key):
+        """Open a new browser context for a key"""
+        context = await self.browser.new_context(**self.context_options)
+        if self.on_context_created:
+            await self.on_context_created(context, key)
+        pooled = PooledContext(context, key)
+        self.contexts.setdefault(key, []).append(pooled)
+        logger.info(f"Opened browser context for {key} ({len(self.contexts[key])}/{self.size})")
+        return pooled
+
+    async def acquire(self, key):
+        """Pick a context and page for a lease (caller holds the key semaphore)"""
+        async with self.lock:
+            if self.closed:
+                raise Exception("Browser context pool is closed")
+
+            candidates = [c for c in self.contexts.get(key, []) if not c.retiring]
+
+            # Prefer a warm page, then spare capacity in an existing context, then a new context
+            pooled = next((c for c in candidates if c.idle_pages), None)
+            if pooled is None:
+                pooled = next((c for c in candidates if c.page_count() < self.pages_per_context), None)
+            if pooled is None:
+                pooled = await self.create_context(key)
+
+            pooled.leased += 1
+            if pooled.idle_pages:
+                return pooled, pooled.idle_pages.pop()
+
+        try:
+            page = await pooled.context.new_page()
+        except Exception:
+            async with self.lock:
+                pooled.leased -= 1
+                pooled.crashed = True
+                pooled.retiring = True
+            await self.close_if_drained(pooled)
+            raise
+
+        def mark_crashed(_page):
+            pooled.crashed = True
+            pooled.retiring = True
+        page.on('crash', mark_crashed)
+        return pooled, page
+
+    async def release(self, pooled, page, failed):
+        """Return a page to its context, retiring the context when it is worn out or broken"""
+        async with self.lock:
+            pooled.leased -= 1
+            pooled.navigations += 1
+            if pooled.navigations >= self.max_navigations:
+                pooled.retiring = True
+
+            if page.is_closed() or pooled.crashed:
+                pooled.retiring = True
+            # A failed scrape may leave the page mid-navigation, so it is not reused
+            if not failed and not pooled.retiring:
+                pooled.idle_pages.append(page)
+                return
+
+        await self.close_page(page)
+        await self.close_if_drained(pooled)
+
+    async def close_page(self, page):
+        """Close a page, ignoring errors from already-dead pages"""
+        try:
+            if not page.is_closed():
+                await page.close()
+        except Exception as e:
+            logger.warning(f"Error closing pooled page: {e}")
+
+    async def close_if_drained(self, pooled):
+        """Close a retiring context once none of its pages are leased"""
+        async with self.lock:
+            if not pooled.retiring or pooled.leased > 0:
+                return
+            contexts = self.contexts.get(pooled.key, [])
+            if pooled not in contexts:
+                return
+            contexts.remove(pooled)
+            idle_pages, pooled.idle_pages = pooled.idle_pages, []
+
+        for page in idle_pages:
+            await self.close_page(page)
+        try:
+            await pooled.context.close()
+        except Exception as e:
+            logger.warning(f"Error closing browser context for {pooled.key}: {e}")
+        reason = 'crash' if pooled.crashed else f'{pooled.navigations} navigations'
+        logger.info(f"Recycled browser context for {pooled.key} after {reason}")
+
+    @asynccontextmanager
+    async def lease(self, platform):
+        """Lease a warm page for a platform; it returns to the pool when the block exits"""
+        key = self.get_key(platform)
+        async with self.get_semaphore(key):
+            pooled, page = await self.acquire(key)
+            failed = False
+            try:
+                yield page
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                if self.on_page_released:
+                    self.on_page_released(page, key)
+                await self.release(pooled, page, failed)
+
+    async def close(self):
+        """Close every context in the pool"""
+        async with self.lock:
+            self.closed = True
+            contexts = [c for key_contexts in self.contexts.values() for c in key_contexts]
+            self.contexts = {}
+
+        for pooled in contexts:
+            try:
+                await pooled.context.close()
+            except Exception as e:
+                logger.warning(f"Error closing browser context for {pooled.key}: {e}")
+
+    def stats(self):
+        """Get context and page counts per key"""
+        return {
+            key: {
+                'contexts': len(contexts),
+                'leased_pages': sum(c.leased for c in contexts),
+                'idle_pages': sum(len(c.idle_pages) for c in contexts),
+                'navigations': sum(c.navigations for c in contexts)
+            }
+            for key, contexts in self.contexts.items()
+        }
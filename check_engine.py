@@ -0,0 +1,76 @@
+"""
+Concurrent check engine for running platform checks with bounded parallelism
+"""
+import asyncio
+import logging
+import time
+from urllib.parse import urlparse
+from config import MAX_CONCURRENT_CHECKS, MAX_CONCURRENT_PER_PLATFORM, HOST_POLITENESS_DELAY
+
+logger = logging.getLogger(__name__)
+
+class CheckEngine:
+    def __init__(self, max_concurrency=MAX_CONCURRENT_CHECKS,
+                 per_platform_limit=MAX_CONCURRENT_PER_PLATFORM,
+                 host_delay=HOST_POLITENESS_DELAY):
+        self.max_concurrency = max_concurrency
+        self.per_platform_limit = per_platform_limit
+        self.host_delay = host_delay
+        self.global_semaphore = asyncio.Semaphore(max_concurrency)
+        self.platform_semaphores = {}
+        self.host_locks = {}
+        self.host_next_start = {}
+
+    def get_platform_semaphore(self, platform):
+        """Get (or create) the concurrency limiter for a platform"""
+        if platform not in self.platform_semaphores:
+            self.platform_semaphores[platform] = asyncio.Semaphore(self.per_platform_limit)
+        return self.platform_semaphores[platform]
+
+    async def wait_for_host(self, url):
+        """Space out request starts to the same host by the politeness delay"""
+        host = urlparse(url).netloc.lower()
+        if host not in self.host_locks:
+            self.host_locks[host] = asyncio.Lock()
+
+        async with self.host_locks[host]:
+            now = time.monotonic()
+            next_start = self.host_next_start.get(host, now)
+            if next_start > now:
+                await asyncio.sleep(next_start - now)
+            self.host_next_start[host] = time.monotonic() + self.host_delay
+
+    async def run_target(self, platform, url, check):
+        """Run a single check under the platform, host and global limits
+
+        A check that returns False (it recorded its own failure) or raises counts as failed.
+        """
+        async with self.get_platform_semaphore(platform):
+            await self.wait_for_host(url)
+            async with self.global_semaphore:
+                started = time.perf_counter()
+                try:
+                    ok = await check(platform, url)
+                    return time.perf_counter() - started, ok is not False
+                except Exception as e:
+                    logger.error(f"Check failed for {platform} ({url}): {e}")
+                    return time.perf_counter() - started, False
+
+    async def run(self, targets, check):
+        """Run check(platform, url) for every target and return a cycle report"""
+        targets = list(targets)
+        started = time.perf_counter()
+
+        results = await asyncio.gather(
+            *(self.run_target(platform, url, check) for platform, url in targets)
+        )
+
+        wall_time = time.perf_counter() - started
+        target_time = sum(duration for duration, _ in results)
+        return {
+            'targets': len(targets),
+            'failed': sum(1 for _, ok in results if not ok),
+            'wall_time': wall_time,
+            'target_time': target_time,
+            'speedup': target_time / wall_time if wall_time > 0 else 0.0
+        }
@@ -0,0 +1,235 @@
+"""
+Per-host circuit breakers with exponential backoff for failing targets
+"""
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+from config import BREAKER_FAILURE_THRESHOLD, BREAKER_BASE_BACKOFF, BREAKER_MAX_BACKOFF, BREAKER_JITTER
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Responses that mean the host is throttling or blocking us (LinkedIn answers 999), not that
+# one target is missing; every 5xx counts as well
+HOST_FAILURE_STATUSES = {429, 999}
+# Hosts that block with ordinary statuses: LinkedIn redirects to its login wall (302) or
+# answers 403 instead of serving a public page
+HOST_BLOCK_STATUSES = {
+    'linkedin.com': {302, 403}
+}
+
+def get_host(url):
+    """Breakers are shared by every target on the same host"""
+    return urlparse(url).netloc.lower()
+
+def is_host_failure(status_code, host=''):
+    """Whether an HTTP status from `host` counts against the host's breaker"""
+    if status_code in HOST_FAILURE_STATUSES or status_code >= 500:
+        return True
+    return any(
+        status_code in statuses
+        for domain, statuses in HOST_BLOCK_STATUSES.items()
+        if host == domain or host.endswith('.' + domain)
+    )
+
+class CircuitBreaker:
+    def __init__(self, host, failure_threshold=BREAKER_FAILURE_THRESHOLD,
+                 base_backoff=BREAKER_BASE_BACKOFF, max_backoff=BREAKER_MAX_BACKOFF,
+                 jitter=BREAKER_JITTER):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.times_opened = 0  # Consecutive openings; drives the exponential backoff
+        self.open_until = 0.0
+        self.probe_in_flight = False
+        self.last_error = None
+        self.changed_at = 0.0  # Wall-clock time of the last state change, for merging saved states
+
+    def allow_request(self):
+        """Whether a check may run now; an expired open circuit lets one probe through"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() >= self.open_until:
+            self.state = HALF_OPEN
+            self.probe_in_flight = False
+            logger.info(f"Circuit for {self.host} half-open, sending a probe")
+        if self.state == HALF_OPEN and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        """Close the circuit after a successful check"""
+        if self.state != CLOSED:
+            logger.info(f"Circuit for {self.host} closed after successful check")
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self.probe_in_flight = False
+        self.last_error = None
+
+    def record_failure(self, error_message=None):
+        """Count a failure, opening the circuit once the threshold is reached"""
+        self.consecutive_failures += 1
+        self.last_error = error_message
+        self.probe_in_flight = False
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.trip()
+
+    def trip(self):
+        """Open the circuit for an exponentially growing, jittered backoff"""
+        backoff = min(self.max_backoff, self.base_backoff * (2 ** self.times_opened))
+        backoff *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        self.times_opened += 1
+        self.state = OPEN
+        self.open_until = time.monotonic() + backoff
+        logger.warning(
+            f"Circuit for {self.host} opened for {backoff:.0f}s after "
+            f"{self.consecutive_failures} consecutive failures: {self.last_error}"
+        )
+
+    def snapshot(self):
+        """Get a JSON-friendly view of the breaker"""
+        retry_at = None
+        if self.state == OPEN:
+            remaining = max(0.0, self.open_until - time.monotonic())
+            retry_at = (datetime.now() + timedelta(seconds=remaining)).isoformat(timespec='seconds')
+        return {
+            'host': self.host,
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'retry_at': retry_at,
+            'last_error': self.last_error
+        }
+
+    def state_row(self):
+        """(host, state, consecutive_failures, times_opened, open_until, last_error, updated_at),
+        with open_until as wall-clock time so other processes can read it"""
+        open_until = time.time() + max(0.0, self.open_until - time.monotonic()) if self.state == OPEN else None
+        return (self.host, self.state, self.consecutive_failures, self.times_opened,
+                open_until, self.last_error, self.changed_at)
+
+    def restore(self, state, consecutive_failures, times_opened, open_until, last_error, updated_at):
+        """Adopt a state saved by another process (or before a restart)"""
+        self.state = state
+        self.consecutive_failures = consecutive_failures
+        self.times_opened = times_opened
+        self.open_until = time.monotonic() + max(0.0, open_until - time.time()) if open_until else 0.0
+        self.probe_in_flight = False
+        self.last_error = last_error
+        self.changed_at = updated_at
+
+class BreakerRegistry:
+    """Thread-safe collection of breakers keyed by host"""
+
+    def __init__(self):
+        self.breakers = {}
+        self.lock = threading.Lock()
+        self.version = 0  # Bumped on every state change so readers can cache snapshots
+        self.dirty = set()  # Hosts changed since the last save_breakers()
+
+    def get(self, url):
+        """Get (or create) the breaker for a URL's host"""
+        return self.get_host_breaker(get_host(url))
+
+    def get_host_breaker(self, host):
+        if host not in self.breakers:
+            self.breakers[host] = CircuitBreaker(host)
+        return self.breakers[host]
+
+    def changed(self, breaker):
+        """Mark a breaker's state as changed (call with the lock held)"""
+        breaker.changed_at = time.time()
+        self.dirty.add(breaker.host)
+        self.version += 1
+
+    def allow_request(self, url):
+        """Whether a target on this URL's host may be checked now"""
+        with self.lock:
+            breaker = self.get(url)
+            state = breaker.state
+            allowed = breaker.allow_request()
+            if breaker.state != state:
+                self.changed(breaker)
+            return allowed
+
+    def record_success(self, url):
+        """Record a successful request to a URL's host"""
+        with self.lock:
+            breaker = self.get(url)
+            changed = breaker.state != CLOSED or breaker.consecutive_failures
+            breaker.record_success()
+            if changed:
+                self.changed(breaker)
+
+    def record_failure(self, url, error_message=None):
+        """Record a failed request (timeout, connection error, throttling) to a URL's host"""
+        with self.lock:
+            breaker = self.get(url)
+            breaker.record_failure(error_message)
+            self.changed(breaker)
+
+    def record_response(self, url, status_code):
+        """Record an HTTP response: throttling, blocks and server errors fail the host, anything
+        else (including a 404 or a page without posts) shows the host is answering"""
+        if is_host_failure(status_code, get_host(url)):
+            self.record_failure(url, f"HTTP {status_code}")
+        else:
+            self.record_success(url)
+
+    def settle_probe(self, url, succeeded):
+        """End a half-open probe that no fetch recorded a result for
+
+        The check may have been served from another host (the X timeline endpoint) or never
+        reached the network; without this the probe would stay in flight and the host would be
+        skipped for good. A served check closes the circuit, anything else allows a new probe.
+        """
+        with self.lock:
+            breaker = self.get(url)
+            if breaker.state != HALF_OPEN or not breaker.probe_in_flight:
+                return
+            if succeeded:
+                breaker.record_success()
+            else:
+                breaker.probe_in_flight = False
+            self.changed(breaker)
+
+    def take_changes(self):
+        """State rows of the breakers changed since the last call"""
+        with self.lock:
+            rows = [self.breakers[host].state_row() for host in self.dirty if host in self.breakers]
+            self.dirty.clear()
+            return rows
+
+    def restore_changes(self, rows):
+        """Put back changes whose save failed so the next save retries them"""
+        with self.lock:
+            self.dirty.update(row[0] for row in rows)
+
+    def merge(self, rows):
+        """Adopt saved states that are newer than this process's own"""
+        with self.lock:
+            for host, state, failures, times_opened, open_until, last_error, updated_at in rows:
+                breaker = self.get_host_breaker(host)
+                if updated_at <= breaker.changed_at:
+                    continue
+                breaker.restore(state, failures, times_opened, open_until, last_error, updated_at)
+                self.dirty.discard(host)
+                self.version += 1
+
+    def snapshot(self):
+        """Get every breaker's state keyed by host"""
+        with self.lock:
+            return {host: breaker.snapshot() for host, breaker in self.breakers.items()}
+
+breakers = BreakerRegistry()
@@ -6,6 +6,17 @@ import os
 # Discord configuration
 DISCORD_TOKEN = os.getenv('DISCORD_TOKEN', 'YOUR_DISCORD_TOKEN_HERE')
 DISCORD_CHANNEL_ID = int(os.getenv('DISCORD_CHANNEL_ID', '1396655830690173029'))  # User's channel
+DISCORD_MAX_RATELIMIT_WAIT = 10  # Longer per-route rate limit waits raise instead of sleeping (notifier requeues)
+
+# Notification queue configuration (new post messages, persisted in the database)
+NOTIFY_BATCH_SIZE = 10  # Embeds per Discord message (Discord allows at most 10)
+NOTIFY_RATE_PER_SECOND = 1  # Sustained messages per second per channel (Discord allows about 5 per 5s)
+NOTIFY_BURST = 5  # Messages a channel may send back to back before pacing applies
+NOTIFY_MAX_ATTEMPTS = 5  # Failed sends before a notification is given up
+NOTIFY_RETRY_BASE_DELAY = 5  # Seconds before the first retry; doubles per attempt
+NOTIFY_RETRY_MAX_DELAY = 300  # Upper bound on the retry delay
+NOTIFY_POLL_INTERVAL = 1  # Seconds between checks for due notifications when the queue is idle
+NOTIFY_RETENTION_HOURS = 24  # Sent and failed notifications kept for delivery metrics
 
 # Social media URLs to monitor
 SOCIAL_MEDIA_URLS = {
@@ -15,12 +26,115 @@ SOCIAL_MEDIA_URLS = {
 }
 
 # Scraping configuration
-SCRAPING_INTERVAL = 300  # 5 minutes in seconds
+SCRAPING_INTERVAL = 300  # 5 minutes in seconds (default poll interval for targets without history)
+POLL_TICK_INTERVAL = 15  # Seconds between checks for due targets
+POLL_MIN_INTERVAL = 120  # Most frequent polling for very active accounts
+POLL_MAX_INTERVAL = 3600  # Least frequent polling for dormant accounts
+POLL_RATE_DIVISOR = 4  # Polls per expected gap between posts
+POLL_JITTER = 0.2  # +/- fraction of the interval added at random
+POLL_HISTORY_SIZE = 20  # Recent posts used to learn each account's posting rate
 REQUEST_TIMEOUT = 30000  # 30 seconds for Playwright
+BROWSER_POOL_SIZE = 2  # Browser contexts per platform (or shared, see below)
+BROWSER_PAGES_PER_CONTEXT = 2  # Warm pages kept per context; pool size x pages = parallel scrapes
+BROWSER_CONTEXT_MAX_NAVIGATIONS = 50  # Recycle a context after this many page loads
+BROWSER_ISOLATE_PLATFORMS = True  # Separate contexts (and cookies) per platform
+SCRAPE_POSTS_PER_PAGE = 5  # Top posts read per page in one navigation and diffed against the seen set
+
+# Playwright request blocking (we only read DOM text and links)
+RESOURCE_BLOCKING_ENABLED = True
+BLOCKED_RESOURCE_TYPES = ['image', 'media', 'font']
+BLOCKED_URL_PATTERNS = [
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net',
+    'connect.facebook.net', 'analytics.tiktok.com', 'mon.tiktokv.com',
+    'ads-twitter.com', 'analytics.twitter.com', 'px.ads.linkedin.com', 'snap.licdn.com'
+]
+# URL patterns per platform that must never be blocked by BLOCKED_URL_PATTERNS
+RESOURCE_ALLOWLIST = {
+    'Facebook': ['connect.facebook.net/en_US/sdk.js'],
+    'TikTok': [],
+    'LinkedIn': [],
+    'X': []
+}
 USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
 
+# Concurrent check configuration
+MAX_CONCURRENT_CHECKS = 10  # Checks running at once across all platforms
+MAX_CONCURRENT_PER_PLATFORM = 3  # Checks running at once against one platform
+HOST_POLITENESS_DELAY = 2  # Minimum seconds between request starts to the same host
+
+# Per-host circuit breaker configuration
+BREAKER_FAILURE_THRESHOLD = 3  # Consecutive failures before a host's circuit opens
+BREAKER_BASE_BACKOFF = 60  # Seconds the circuit stays open the first time
+BREAKER_MAX_BACKOFF = 3600  # Upper bound for the doubling backoff
+BREAKER_JITTER = 0.2  # +/- fraction of the backoff added at random
+
+# HTTP client pool configuration (async backup scraper)
+HTTP_POOL_SIZE = 20  # Total keep-alive connections
+HTTP_POOL_PER_HOST = 4  # Keep-alive connections per host
+HTTP_KEEPALIVE_TIMEOUT = 30  # Seconds an idle connection stays open
+HTTP_VALIDATOR_CACHE_ENABLED = True  # Send If-None-Match/If-Modified-Since and skip unchanged pages
+
+# Tiered fetching (cheapest source first; each check records the tier that served it)
+FETCH_TIERS = {
+    'LinkedIn': ['structured', 'html', 'browser'],
+    'TikTok': ['structured', 'html', 'browser'],
+    'Facebook': ['html', 'browser'],
+    'X': ['structured', 'html', 'browser']
+}  # structured = embedded JSON / timeline endpoint, html = page text over HTTP, browser = Playwright
+FETCH_TIER_RECHECK = 20  # Checks a target skips a tier that found nothing for it before retrying that tier
+STRUCTURED_MAX_BYTES = 4 * 1024 * 1024  # Stop streaming a page after this many bytes without its embedded JSON
+
+# Parse worker processes (HTML parsing and hashing off the bot's event loop)
+SCRAPE_WORKER_PROCESSES = 0  # 0 parses in a thread; set to the CPU core count to parse across cores
+SCRAPE_WORKER_MAX_PENDING = 32  # Parse jobs queued or running before new ones wait
+
+# Distributed check configuration (coordinator + worker.py processes sharing the database)
+CHECK_MODE = 'local'  # 'local' checks in the bot process; 'coordinator' queues checks for worker.py processes on the same machine (SQLite WAL does not work over network filesystems)
+JOB_QUEUE_SHARDS = 8  # Host shards workers can claim; all targets on one host share a shard
+JOB_LEASE_SECONDS = 120  # A claimed job returns to the queue if its worker stops renewing the lease
+JOB_MAX_ATTEMPTS = 3  # Claims before a job is reported back as failed
+JOB_RETRY_DELAY = 30  # Seconds a failed job stays invisible before another worker may claim it
+JOB_POLL_INTERVAL = 2  # Seconds between queue polls (idle workers and coordinator result collection)
+WORKER_CONCURRENCY = 10  # Jobs one worker process runs at once
+
 # Database configuration
 DATABASE_PATH = 'social_media_bot.db'
+DATABASE_CACHE_SIZE_KB = 8192  # SQLite page cache per connection
+DATABASE_STATEMENT_CACHE_SIZE = 128  # Prepared statements kept per connection
+DATABASE_BUSY_TIMEOUT = 5  # Seconds to wait for a lock before failing
+WRITE_BUFFER_MAX_SIZE = 50  # Buffered status updates before a forced flush
+WRITE_BUFFER_MAX_DELAY = 5  # Seconds a buffered status update may wait before flushing
+POSTS_RETENTION_DAYS = 90  # Older posts are rolled up into posts_daily and deleted (0 keeps everything)
+POSTS_RETENTION_KEEP_PER_TARGET = 20  # Newest posts per target always kept (adaptive polling history)
+POSTS_MAINTENANCE_INTERVAL_HOURS = 24  # How often the rollup and incremental vacuum job runs
+POSTS_MAINTENANCE_BATCH_SIZE = 5000  # Posts rolled up and deleted per transaction
+POSTS_VACUUM_PAGES = 1000  # Free pages released per incremental_vacuum step
+STATUS_EVENTS_RETAINED = 10000  # Newest status change events kept for dashboard stream resume
+SEEN_POSTS_PER_TARGET = 200  # Post identities remembered per target so re-surfaced posts are not re-announced
+SEEN_CACHE_TARGETS = 5000  # Targets whose seen sets are kept in memory (least recently checked are dropped)
+
+# Metrics (Prometheus text format at the dashboard's /metrics)
+METRICS_ENABLED = True  # Time check stages, database calls and Discord sends
+METRICS_PER_TARGET = True  # Label check metrics by target URL (one series per target; disable for very many targets)
+METRICS_SAVE_INTERVAL = 15  # Seconds between saving each process's metrics to the database for /metrics
+METRICS_SCRAPE_SAVE_INTERVAL = 5  # In 'thread' dashboard mode, a /metrics scrape saves the bot's latest series at most this often
+METRICS_RETENTION_HOURS = 24  # Metrics of processes that saved nothing for this long are dropped
 
 # Dashboard configuration
 DASHBOARD_REFRESH_INTERVAL = 10  # seconds
+DASHBOARD_MODE = 'thread'  # 'thread' serves inside the bot process, 'process' in a child process, 'off' to run dashboard.py separately
+DASHBOARD_SERVER = 'waitress'  # 'waitress' for production serving, 'werkzeug' for the Flask development server
+DASHBOARD_HOST = '0.0.0.0'
+DASHBOARD_PORT = 5000
+DASHBOARD_THREADS = 16  # Request threads (each open /api/stream holds one)
+DASHBOARD_CONNECTION_LIMIT = 200  # Open client connections before new ones wait
+DASHBOARD_CHANNEL_TIMEOUT = 120  # Seconds an idle keep-alive connection stays open
+DASHBOARD_COMPRESSION_MIN_SIZE = 500  # Smaller responses are sent uncompressed
+DASHBOARD_STATIC_MAX_AGE = 31536000  # Browser cache lifetime for static files (URLs are content-versioned)
+DASHBOARD_STREAM_MAX_CLIENTS = 8  # Concurrent /api/stream clients; others poll /api/status instead
+API_PAGE_DEFAULT_LIMIT = 100  # Rows per /api/posts and /api/targets page
+API_PAGE_MAX_LIMIT = 1000  # Largest page a client may request (NDJSON exports are not capped)
+API_EXPORT_CHUNK_SIZE = 500  # Rows fetched per query while streaming an NDJSON export
+DASHBOARD_STREAM_POLL_INTERVAL = 1  # Seconds between status change checks per /api/stream client
+DASHBOARD_STREAM_HEARTBEAT = 15  # Seconds between keep-alive comments on an idle stream
+DASHBOARD_STREAM_RETRY_MS = 3000  # Reconnect delay the browser uses after a dropped stream
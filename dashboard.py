@@ -1,62 +1,243 @@
 """
 Flask web dashboard for monitoring social media scraping status
 """
-from flask import Flask, render_template, jsonify
+from flask import Flask, Response, render_template, jsonify, request
+from datetime import datetime, timezone
+from functools import lru_cache
+import base64
+import gzip
+import hashlib
+import json
 import logging
-from database import get_all_monitoring_status
-from config import SOCIAL_MEDIA_URLS
+import os
+import threading
+import time
+from config import (
+    DASHBOARD_HOST, DASHBOARD_PORT, DASHBOARD_SERVER, DASHBOARD_THREADS, DASHBOARD_CONNECTION_LIMIT,
+    DASHBOARD_CHANNEL_TIMEOUT, DASHBOARD_COMPRESSION_MIN_SIZE, DASHBOARD_STATIC_MAX_AGE,
+    DASHBOARD_STREAM_MAX_CLIENTS, DASHBOARD_STREAM_POLL_INTERVAL, DASHBOARD_STREAM_HEARTBEAT,
+    DASHBOARD_STREAM_RETRY_MS, API_PAGE_DEFAULT_LIMIT, API_PAGE_MAX_LIMIT, API_EXPORT_CHUNK_SIZE,
+    DASHBOARD_MODE, METRICS_SCRAPE_SAVE_INTERVAL
+)
+from database import (
+    get_all_monitoring_status, get_status_version, get_last_status_event_id, get_status_events_since,
+    get_posts_page, get_targets_page, get_target, POST_FIELDS, TARGET_FIELDS,
+    save_metrics, get_metric_samples, load_breakers, get_circuits_version
+)
+from circuit_breaker import breakers, get_host
+from notifier import NotificationQueue
+from metrics import render_prometheus, set_process_name
+
+try:
+    import brotli
+except ImportError:  # Optional: without it responses are gzip-compressed only
+    brotli = None
 
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+# Static URLs carry a content hash (see static_url_version), so browsers may keep them for the max age
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = DASHBOARD_STATIC_MAX_AGE
+
+COMPRESSIBLE_MIMETYPES = {
+    'text/html', 'text/css', 'text/javascript', 'application/javascript', 'application/json'
+}
+
+@lru_cache(maxsize=None)
+def static_file_version(filename):
+    """Short content hash of a static file, computed once per process"""
+    try:
+        with open(os.path.join(app.static_folder, filename), 'rb') as f:
+            return hashlib.blake2b(f.read(), digest_size=6).hexdigest()
+    except OSError:
+        return None
+
+@app.url_defaults
+def static_url_version(endpoint, values):
+    """Add ?v=<content hash> to url_for('static', ...) so a changed file gets a new URL"""
+    if endpoint == 'static' and 'filename' in values:
+        version = static_file_version(values['filename'])
+        if version:
+            values.setdefault('v', version)
+
+def choose_encoding():
+    """Pick the best content coding the client accepts (brotli, then gzip)"""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+@lru_cache(maxsize=64)
+def compress_body(body, encoding):
+    """Compress a response body; repeated bodies (cached status, static files) are compressed once"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+@app.after_request
+def compress_response(response):
+    """Compress HTML, CSS, JS and JSON responses and mark versioned static files immutable"""
+    if request.endpoint == 'static' and request.args.get('v'):
+        response.cache_control.immutable = True
+    
+    # Streams (the SSE endpoint), partial and already-encoded responses are left alone
+    if (response.status_code != 200 or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding()
+    if encoding is None:
+        return response
+    
+    # send_file responses pass the file through; static assets are small, so read them in
+    response.direct_passthrough = False
+    body = response.get_data()
+    if len(body) < DASHBOARD_COMPRESSION_MIN_SIZE:
+        return response
+    response.set_data(compress_body(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        # The compressed bytes differ, so a strong validator may not be shared between codings
+        response.set_etag(etag, weak=True)
+    return response
 
 @app.route('/')
 def dashboard():
     """Main dashboard page"""
     return render_template('dashboard.html')
 
+def format_target_status(status, circuits):
+    """Shape one monitoring status row for the dashboard"""
+    checked = status['check_count'] > 0
+    success_rate = (status['success_count'] / max(status['check_count'], 1)) * 100
+    
+    return {
+        'target_id': status['target_id'],
+        'platform': status['platform'],
+        'url': status['url'],
+        'last_post': status['last_post'] if checked else 'Not checked yet',
+        'last_checked': status['last_checked'] or 'Never',
+        'has_new_post': status['has_new_post'],
+        'error_message': status['error_message'],
+        'check_count': status['check_count'],
+        'success_count': status['success_count'],
+        'success_rate': round(success_rate, 1),
+        'fetch_tier': status['fetch_tier'],
+        'circuit': circuits.get(get_host(status['url']))
+    }
+
+def circuit_snapshot():
+    """Breaker states keyed by host, as saved by the bot and workers (any dashboard mode)"""
+    load_breakers()
+    return breakers.snapshot()
+
+def build_status_payload():
+    """Build the /api/status document from the database"""
+    # Read first: the stream resumes after this id, so a change racing the snapshot is replayed, not lost
+    last_event_id = get_last_status_event_id()
+    status_list = get_all_monitoring_status()
+    circuits = circuit_snapshot()
+    
+    # Every enabled target is listed, including ones that have not been checked yet
+    return {
+        'status': 'success',
+        'data': [format_target_status(status, circuits) for status in status_list],
+        'circuits': list(circuits.values()),
+        'last_event_id': last_event_id
+    }
+
+class StatusSnapshotCache:
+    """Pre-serialized /api/status body, rebuilt only when the checker writes new status"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.build_lock = threading.Lock()
+        self.version = None
+        self.body = None
+        self.etag = None
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.last_build_ms = 0.0
+
+    def current_version(self):
+        """Status writes and breaker saves each bump a counter in the database"""
+        return (get_status_version(), get_circuits_version())
+
+    def get(self):
+        """Get (body bytes, strong ETag) for the current status, rebuilding on a version change"""
+        version = self.current_version()
+        with self.lock:
+            if version == self.version:
+                self.hits += 1
+                return self.body, self.etag
+
+        # One thread rebuilds; concurrent requests for the same version wait and reuse it
+        with self.build_lock:
+            with self.lock:
+                if version == self.version:
+                    self.hits += 1
+                    return self.body, self.etag
+
+            started = time.perf_counter()
+            body = app.json.dumps(build_status_payload()).encode('utf-8')
+            etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+            with self.lock:
+                # Stored under the version read before building, so a concurrent write forces a rebuild
+                self.version = version
+                self.body = body
+                self.etag = etag
+                self.misses += 1
+                self.last_build_ms = elapsed_ms
+            return body, etag
+
+    def record_not_modified(self):
+        with self.lock:
+            self.not_modified += 1
+
+    def stats(self):
+        """Get hit/miss counters and the last rebuild time"""
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified,
+                'hit_rate': round(self.hits / total * 100, 1) if total else 0.0,
+                'last_build_ms': round(self.last_build_ms, 2),
+                'body_bytes': len(self.body) if self.body else 0
+            }
+
+status_cache = StatusSnapshotCache()
+
 @app.route('/api/status')
 def api_status():
     """API endpoint to get current monitoring status"""
     try:
-        status_list = get_all_monitoring_status()
-        
-        # Ensure all configured platforms are represented
-        platform_status = {}
-        for platform, url in SOCIAL_MEDIA_URLS.items():
-            platform_status[platform] = {
-                'platform': platform,
-                'url': url,
-                'last_post': 'Not checked yet',
-                'last_checked': 'Never',
-                'has_new_post': False,
-                'error_message': None,
-                'check_count': 0,
-                'success_count': 0,
-                'success_rate': 0
-            }
-        
-        # Update with actual status data
-        for status in status_list:
-            platform = status['platform']
-            success_rate = (status['success_count'] / max(status['check_count'], 1)) * 100
-            
-            platform_status[platform] = {
-                'platform': platform,
-                'url': status['url'],
-                'last_post': status['last_post'],
-                'last_checked': status['last_checked'],
-                'has_new_post': status['has_new_post'],
-                'error_message': status['error_message'],
-                'check_count': status['check_count'],
-                'success_count': status['success_count'],
-                'success_rate': round(success_rate, 1)
-            }
+        body, etag = status_cache.get()
+        encoding = choose_encoding() if len(body) >= DASHBOARD_COMPRESSION_MIN_SIZE else None
+        if encoding:
+            # Each coding is its own representation and needs its own strong ETag
+            etag = f"{etag}-{encoding}"
         
-        return jsonify({
-            'status': 'success',
-            'data': list(platform_status.values())
-        })
+        if request.if_none_match.contains(etag):
+            status_cache.record_not_modified()
+            response = Response(status=304)
+        else:
+            response = Response(compress_body(body, encoding) if encoding else body,
+                                mimetype='application/json')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.set_etag(etag)
+        # Browsers must revalidate every poll, which costs a 304 while nothing changed
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
         
     except Exception as e:
         logger.error(f"Error getting status: {e}")
@@ -65,6 +246,312 @@ def api_status():
             'message': str(e)
         }), 500
 
+STREAM_EVENT_BATCH = 500  # Status events turned into one delta message
+
+stream_slots = threading.BoundedSemaphore(DASHBOARD_STREAM_MAX_CLIENTS)
+
+def format_event(event, data, event_id=None):
+    """Encode one server-sent event"""
+    message = f"event: {event}\ndata: {app.json.dumps(data)}\n\n"
+    return f"id: {event_id}\n{message}" if event_id is not None else message
+
+def status_event_stream(last_event_id):
+    """Yield status deltas for targets changed after `last_event_id`, with periodic heartbeats"""
+    yield f"retry: {DASHBOARD_STREAM_RETRY_MS}\n\n"
+    circuits_version = get_circuits_version()
+    status_version = None
+    last_sent = time.monotonic()
+    
+    try:
+        while True:
+            version = get_status_version()
+            if version != status_version:
+                status_version = version
+                while True:
+                    events, pruned = get_status_events_since(last_event_id, STREAM_EVENT_BATCH)
+                    if not events:
+                        break
+                    
+                    if pruned or any(target_id is None for _, target_id in events):
+                        # Missed or bulk changes: the client reloads /api/status and resumes from there
+                        last_event_id = get_last_status_event_id()
+                        yield format_event('reset', {'last_event_id': last_event_id}, last_event_id)
+                        last_sent = time.monotonic()
+                        break
+                    
+                    last_event_id = events[-1][0]
+                    target_ids = {target_id for _, target_id in events}
+                    circuits = circuit_snapshot()
+                    targets = [format_target_status(status, circuits)
+                               for status in get_all_monitoring_status(target_ids)]
+                    # Targets that are no longer listed (disabled) are dropped from the table
+                    removed = sorted(target_ids - {target['target_id'] for target in targets})
+                    yield format_event('status', {'targets': targets, 'removed': removed}, last_event_id)
+                    last_sent = time.monotonic()
+                    if len(events) < STREAM_EVENT_BATCH:
+                        break
+            
+            version = get_circuits_version()
+            if version != circuits_version:
+                circuits_version = version
+                yield format_event('circuits', list(circuit_snapshot().values()))
+                last_sent = time.monotonic()
+            
+            if time.monotonic() - last_sent >= DASHBOARD_STREAM_HEARTBEAT:
+                # Comment lines keep proxies from closing the connection and reveal dead clients
+                yield ": heartbeat\n\n"
+                last_sent = time.monotonic()
+            
+            time.sleep(DASHBOARD_STREAM_POLL_INTERVAL)
+        
+    except Exception as e:
+        # Ending the stream makes the browser reconnect with Last-Event-ID after the retry delay
+        logger.error(f"Status stream failed: {e}")
+
+@app.route('/api/stream')
+def api_stream():
+    """Server-sent status deltas; resumes from Last-Event-ID (or ?since= from /api/status)"""
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('since')
+    try:
+        last_event_id = int(last_event_id)
+    except (TypeError, ValueError):
+        last_event_id = get_last_status_event_id()
+    
+    # Every open stream holds a server thread; past the cap, clients fall back to polling /api/status
+    if not stream_slots.acquire(blocking=False):
+        response = jsonify({'status': 'error', 'message': 'Too many live dashboard streams'})
+        response.status_code = 503
+        return response
+    
+    response = Response(status_event_stream(last_event_id), mimetype='text/event-stream')
+    response.call_on_close(stream_slots.release)
+    response.headers['Cache-Control'] = 'no-cache'
+    # Stop reverse proxies from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+class BadRequest(ValueError):
+    """Invalid query parameter for a history API"""
+
+BOOLEAN_FIELDS = {'is_new', 'enabled', 'has_new_post'}
+
+def encode_cursor(key):
+    """Opaque cursor for the last row of a page"""
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip('=')
+
+def decode_cursor(value):
+    try:
+        return json.loads(base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)))
+    except ValueError:
+        raise BadRequest("Invalid cursor")
+
+def is_post_cursor(key):
+    """A posts keyset: [created_at timestamp string, post row id]"""
+    return (isinstance(key, list) and len(key) == 2 and isinstance(key[0], str)
+            and is_row_id(key[1]))
+
+def is_row_id(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def parse_fields(allowed, default):
+    """Parse ?fields=a,b into a validated column list"""
+    value = request.args.get('fields')
+    if not value:
+        return list(default)
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in allowed]
+    if unknown or not fields:
+        raise BadRequest(f"Unknown fields: {', '.join(unknown)}; choose from {', '.join(allowed)}")
+    return fields
+
+def parse_limit(default, maximum):
+    try:
+        limit = int(request.args.get('limit', default))
+    except (TypeError, ValueError):
+        raise BadRequest("limit must be an integer")
+    if limit < 1 or (maximum is not None and limit > maximum):
+        raise BadRequest(f"limit must be between 1 and {maximum}" if maximum else "limit must be positive")
+    return limit
+
+def parse_time(name):
+    """Parse an ISO 8601 time parameter into the posts table's UTC 'YYYY-MM-DD HH:MM:SS' format"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        raise BadRequest(f"{name} must be an ISO 8601 date or time")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc)
+    return parsed.strftime('%Y-%m-%d %H:%M:%S')
+
+def wants_ndjson():
+    return (request.args.get('format') == 'ndjson'
+            or request.accept_mimetypes.best == 'application/x-ndjson')
+
+def clean_row(row):
+    for field in BOOLEAN_FIELDS.intersection(row):
+        if row[field] is not None:
+            row[field] = bool(row[field])
+    return row
+
+def page_response(fetch_page, after, limit):
+    """JSON page with a next_cursor, or (for NDJSON) every matching row streamed in keyset chunks
+
+    `fetch_page(after, size)` returns (rows, last key). An export runs one short query per chunk
+    instead of holding a read transaction open, so memory stays at one chunk and slow clients do
+    not block WAL checkpoints.
+    """
+    if wants_ndjson():
+        def generate():
+            key = after
+            remaining = limit
+            try:
+                while remaining is None or remaining > 0:
+                    size = API_EXPORT_CHUNK_SIZE if remaining is None else min(API_EXPORT_CHUNK_SIZE, remaining)
+                    rows, key = fetch_page(key, size)
+                    for row in rows:
+                        yield app.json.dumps(clean_row(row)) + '\n'
+                    if len(rows) < size:
+                        break
+                    if remaining is not None:
+                        remaining -= len(rows)
+            except Exception as e:
+                # Headers are already sent; a truncated export is all that can be signalled
+                logger.error(f"NDJSON export failed: {e}")
+        
+        return Response(generate(), mimetype='application/x-ndjson')
+    
+    rows, last_key = fetch_page(after, limit)
+    # A full page may be followed by more rows; the page after the last one is empty
+    return jsonify({
+        'status': 'success',
+        'data': [clean_row(row) for row in rows],
+        'next_cursor': encode_cursor(last_key) if len(rows) == limit else None
+    })
+
+def error_response(status_code, message):
+    response = jsonify({'status': 'error', 'message': message})
+    response.status_code = status_code
+    return response
+
+def parse_page_args():
+    """limit (no default cap for NDJSON exports) and the decoded cursor"""
+    if wants_ndjson():
+        limit = parse_limit(None, None) if 'limit' in request.args else None
+    else:
+        limit = parse_limit(API_PAGE_DEFAULT_LIMIT, API_PAGE_MAX_LIMIT)
+    cursor = request.args.get('cursor')
+    return limit, decode_cursor(cursor) if cursor else None
+
+@app.route('/api/posts')
+def api_posts():
+    """Detected posts, newest first
+
+    Query: platform, target_id, since, until (ISO 8601), fields, limit, cursor, format=ndjson
+    """
+    try:
+        fields = parse_fields(POST_FIELDS, POST_FIELDS)
+        limit, after = parse_page_args()
+        if after is not None and not is_post_cursor(after):
+            raise BadRequest("Invalid cursor")
+        since = parse_time('since')
+        until = parse_time('until')
+        platform = request.args.get('platform')
+        url = None
+        
+        target_id = request.args.get('target_id')
+        if target_id is not None:
+            target = get_target(target_id)
+            if target is None:
+                return error_response(404, f"Unknown target {target_id}")
+            # Filtering on both columns lets SQLite use the (platform, url, created_at) index
+            platform, url = target
+        
+        def fetch_page(key, size):
+            return get_posts_page(fields, platform, url, since, until, key, size)
+        
+        return page_response(fetch_page, after, limit)
+        
+    except BadRequest as e:
+        return error_response(400, str(e))
+    except Exception as e:
+        logger.error(f"Error getting posts: {e}")
+        return error_response(500, str(e))
+
+@app.route('/api/targets')
+def api_targets():
+    """Monitored targets with their status, in id order
+
+    Query: platform, enabled (0/1), fields, limit, cursor, format=ndjson
+    """
+    try:
+        fields = parse_fields(TARGET_FIELDS, TARGET_FIELDS)
+        limit, after = parse_page_args()
+        if after is not None and not is_row_id(after):
+            raise BadRequest("Invalid cursor")
+        platform = request.args.get('platform')
+        enabled = request.args.get('enabled')
+        if enabled is not None:
+            if enabled not in ('0', '1'):
+                raise BadRequest("enabled must be 0 or 1")
+            enabled = enabled == '1'
+        
+        def fetch_page(key, size):
+            return get_targets_page(fields, platform, enabled, key, size)
+        
+        return page_response(fetch_page, after, limit)
+        
+    except BadRequest as e:
+        return error_response(400, str(e))
+    except Exception as e:
+        logger.error(f"Error getting targets: {e}")
+        return error_response(500, str(e))
+
+@app.route('/api/status/cache')
+def api_status_cache():
+    """Hit-rate metrics for the /api/status snapshot cache"""
+    return jsonify(status_cache.stats())
+
+notification_queue = NotificationQueue()
+
+@app.route('/api/notifications')
+def api_notifications():
+    """Outbound notification queue depth, failures and delivery latency"""
+    try:
+        return jsonify(notification_queue.stats())
+        
+    except Exception as e:
+        logger.error(f"Error getting notification stats: {e}")
+        return error_response(500, str(e))
+
+metrics_save_lock = threading.Lock()
+last_metrics_save = 0.0
+
+def save_bot_metrics():
+    """In thread mode, save the bot's latest series before a scrape, at most every few seconds"""
+    global last_metrics_save
+    if DASHBOARD_MODE != 'thread':
+        return
+    with metrics_save_lock:
+        if time.monotonic() - last_metrics_save < METRICS_SCRAPE_SAVE_INTERVAL:
+            return
+        last_metrics_save = time.monotonic()
+    save_metrics()
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Check stage, database and Discord latency histograms of every process, in Prometheus text format"""
+    try:
+        # Other modes read what the bot and workers save every METRICS_SAVE_INTERVAL
+        save_bot_metrics()
+        return Response(render_prometheus(get_metric_samples()), mimetype='text/plain; version=0.0.4')
+        
+    except Exception as e:
+        logger.error(f"Error rendering metrics: {e}")
+        return error_response(500, str(e))
+
 @app.route('/api/health')
 def health_check():
     """Health check endpoint"""
@@ -73,5 +560,35 @@ def health_check():
         'service': 'Social Media Monitor Dashboard'
     })
 
+def serve_dashboard(host=DASHBOARD_HOST, port=DASHBOARD_PORT):
+    """Serve the dashboard with waitress (or the Flask development server when configured)"""
+    if DASHBOARD_SERVER == 'waitress':
+        from waitress import serve
+        logger.info(f"Serving dashboard with waitress on {host}:{port} ({DASHBOARD_THREADS} threads)")
+        serve(
+            app,
+            host=host,
+            port=port,
+            threads=DASHBOARD_THREADS,
+            connection_limit=DASHBOARD_CONNECTION_LIMIT,
+            channel_timeout=DASHBOARD_CHANNEL_TIMEOUT,
+            ident='dashboard'
+        )
+    else:
+        logger.info(f"Serving dashboard with the Flask development server on {host}:{port}")
+        app.run(host=host, port=port, debug=False, use_reloader=False, threaded=True)
+
+def run_dashboard_process():
+    """Entry point for DASHBOARD_MODE = 'process': serve from a child process"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    set_process_name('dashboard')
+    try:
+        serve_dashboard()
+    except Exception as e:
+        logger.error(f"Dashboard failed to start: {e}")
+
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=False)
+    run_dashboard_process()
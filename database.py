@@ -4,156 +4,931 @@ Database operations for storing social media post data
 import sqlite3
 import json
 import logging
-from datetime import datetime
-from config import DATABASE_PATH
+import random
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from config import (
+    SOCIAL_MEDIA_URLS, DATABASE_PATH, DATABASE_CACHE_SIZE_KB, DATABASE_STATEMENT_CACHE_SIZE, DATABASE_BUSY_TIMEOUT,
+    WRITE_BUFFER_MAX_SIZE, WRITE_BUFFER_MAX_DELAY, POSTS_RETENTION_DAYS,
+    POSTS_RETENTION_KEEP_PER_TARGET, POSTS_MAINTENANCE_BATCH_SIZE, POSTS_VACUUM_PAGES,
+    STATUS_EVENTS_RETAINED, SEEN_POSTS_PER_TARGET, METRICS_RETENTION_HOURS
+)
+from metrics import metrics
+from circuit_breaker import breakers
 
 logger = logging.getLogger(__name__)
 
+# One persistent connection per thread (bot loop, executor threads, dashboard threads)
+_local = threading.local()
+_connections = set()
+_connections_lock = threading.Lock()
+_generation = 0
+
+class ThreadConnection:
+    """A thread's connection; dropped with the thread's locals when it exits, which closes it"""
+
+    def __init__(self, conn, generation):
+        self.conn = conn
+        self.generation = generation
+
+def release_connection(conn):
+    """Close a connection whose thread has exited (or that close_connections replaced)"""
+    with _connections_lock:
+        _connections.discard(conn)
+    try:
+        conn.close()
+    except Exception as e:
+        logger.error(f"Failed to close database connection: {e}")
+
+def get_connection():
+    """Get this thread's persistent database connection, opening it on first use
+
+    Threads that come and go (e.g. one per request under werkzeug) do not leak connections:
+    the connection is closed once its thread exits.
+    """
+    holder = getattr(_local, 'holder', None)
+    if holder is None or holder.generation != _generation:
+        conn = sqlite3.connect(
+            DATABASE_PATH,
+            timeout=DATABASE_BUSY_TIMEOUT,
+            cached_statements=DATABASE_STATEMENT_CACHE_SIZE,
+            check_same_thread=False  # Only the owning thread uses it; it is closed at thread exit or shutdown
+        )
+        # Must precede the WAL switch to apply to a new file; existing files are converted by incremental_vacuum
+        conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        # WAL lets dashboard readers run alongside checker writes
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA cache_size=-{DATABASE_CACHE_SIZE_KB}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        holder = ThreadConnection(conn, _generation)
+        weakref.finalize(holder, release_connection, conn)
+        _local.holder = holder
+        with _connections_lock:
+            _connections.add(conn)
+    return holder.conn
+
+@contextmanager
+def transaction():
+    """Run statements in a single transaction on this thread's connection"""
+    conn = get_connection()
+    with conn:  # Commits on success, rolls back on error
+        yield conn.cursor()
+
+def close_connections():
+    """Close every connection opened by get_connection"""
+    global _generation
+    with _connections_lock:
+        _generation += 1
+        for conn in _connections:
+            try:
+                conn.close()
+            except Exception as e:
+                logger.error(f"Failed to close database connection: {e}")
+        _connections.clear()
+
+def migrate_monitoring_status(cursor):
+    """Move a platform-keyed monitoring_status table aside so it can be rebuilt per target"""
+    columns = [row[1] for row in cursor.execute('PRAGMA table_info(monitoring_status)')]
+    if columns and 'target_id' not in columns:
+        cursor.execute('ALTER TABLE monitoring_status RENAME TO monitoring_status_legacy')
+        logger.info("Migrating monitoring_status to per-target rows")
+
+def add_missing_columns(cursor, table, columns):
+    """Add (name, definition) columns introduced after the table was first created"""
+    existing = {row[1] for row in cursor.execute(f'PRAGMA table_info({table})')}
+    for name, definition in columns:
+        if name not in existing:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {definition}')
+
+def copy_legacy_monitoring_status(cursor, configured=None):
+    """Register legacy rows as targets and copy their status into the per-target table
+
+    Only rows for accounts still in `configured` (SOCIAL_MEDIA_URLS by default) become
+    enabled targets; the others keep their history but are not checked.
+    """
+    cursor.execute('''
+        SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'monitoring_status_legacy'
+    ''')
+    if cursor.fetchone() is None:
+        return
+
+    configured = set(SOCIAL_MEDIA_URLS.items() if configured is None else configured)
+    legacy = cursor.execute('SELECT platform, url FROM monitoring_status_legacy').fetchall()
+    cursor.executemany('''
+        INSERT INTO targets (platform, url, enabled) VALUES (?, ?, ?)
+        ON CONFLICT(platform, url) DO NOTHING
+    ''', [(platform, url, (platform, url) in configured) for platform, url in legacy])
+    cursor.execute('''
+        INSERT OR IGNORE INTO monitoring_status
+        (target_id, platform, url, last_post_content, last_post_id, last_post_url,
+         last_checked, has_new_post, error_message, check_count, success_count)
+        SELECT t.id, m.platform, m.url, m.last_post_content, m.last_post_id, m.last_post_url,
+               m.last_checked, m.has_new_post, m.error_message, m.check_count, m.success_count
+        FROM monitoring_status_legacy m
+        JOIN targets t ON t.platform = m.platform AND t.url = m.url
+    ''')
+    cursor.execute('DROP TABLE monitoring_status_legacy')
+
 def init_database():
     """Initialize the SQLite database with required tables"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
+        with transaction() as cursor:
+            # Create posts table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS posts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    platform TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    post_id TEXT,
+                    post_content TEXT,
+                    post_url TEXT,
+                    last_checked TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    is_new BOOLEAN DEFAULT 0,
+                    error_message TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            # Platform timelines, dedup lookups and per-target history (adaptive polling, retention)
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_posts_platform_created ON posts(platform, created_at)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_posts_platform_post_id ON posts(platform, post_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_posts_target_created ON posts(platform, url, created_at)')
+            # Unfiltered history pages (/api/posts) walk this newest first
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_posts_created ON posts(created_at)')
+
+            # Create daily rollup of posts removed by retention
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS posts_daily (
+                    platform TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    post_count INTEGER NOT NULL,
+                    first_post_at TIMESTAMP,
+                    last_post_at TIMESTAMP,
+                    PRIMARY KEY (platform, url, day)
+                )
+            ''')
         
-        # Create posts table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS posts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                platform TEXT NOT NULL,
-                url TEXT NOT NULL,
-                post_id TEXT,
-                post_content TEXT,
-                post_url TEXT,
-                last_checked TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                is_new BOOLEAN DEFAULT 0,
-                error_message TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+            # Create target registry (one row per monitored account)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS targets (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    platform TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    enabled BOOLEAN NOT NULL DEFAULT 1,
+                    poll_interval INTEGER,
+                    next_check_at REAL NOT NULL DEFAULT 0,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(platform, url)
+                )
+            ''')
+            # Target pages filtered by platform, in id order (/api/targets)
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_targets_platform ON targets(platform)')
+            # Due-for-check selection scans only enabled targets in next_check_at order
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_targets_due
+                ON targets(next_check_at) WHERE enabled = 1
+            ''')
+
+            migrate_monitoring_status(cursor)
         
-        # Create monitoring status table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS monitoring_status (
-                platform TEXT PRIMARY KEY,
-                url TEXT NOT NULL,
-                last_post_content TEXT,
-                last_post_id TEXT,
-                last_post_url TEXT,
-                last_checked TIMESTAMP,
-                has_new_post BOOLEAN DEFAULT 0,
-                error_message TEXT,
-                check_count INTEGER DEFAULT 0,
-                success_count INTEGER DEFAULT 0
-            )
-        ''')
+            # Create monitoring status table (one row per target)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS monitoring_status (
+                    target_id INTEGER PRIMARY KEY REFERENCES targets(id) ON DELETE CASCADE,
+                    platform TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    last_post_content TEXT,
+                    last_post_id TEXT,
+                    last_post_url TEXT,
+                    last_checked TIMESTAMP,
+                    has_new_post BOOLEAN DEFAULT 0,
+                    error_message TEXT,
+                    check_count INTEGER DEFAULT 0,
+                    success_count INTEGER DEFAULT 0,
+                    fetch_tier TEXT
+                )
+            ''')
+            # Tier that served the last successful check (see tiered_scraper.py)
+            add_missing_columns(cursor, 'monitoring_status', [('fetch_tier', 'TEXT')])
         
-        conn.commit()
-        conn.close()
+            copy_legacy_monitoring_status(cursor)
+        
+            # Create HTTP validator cache table (conditional GET support)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS http_cache (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    body_hash TEXT,
+                    page_text TEXT,
+                    updated_at TIMESTAMP
+                )
+            ''')
+
+            # Create change counters readers use to cache derived views (e.g. /api/status)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS data_versions (
+                    name TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL
+                )
+            ''')
+
+            # Create status change feed for the dashboard stream; a NULL target means "reload everything"
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS status_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    target_id INTEGER,
+                    created_at REAL NOT NULL
+                )
+            ''')
+
+            # Create per-target set of post identities already observed (see post_identity.py)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS seen_posts (
+                    target_id INTEGER NOT NULL,
+                    post_id TEXT NOT NULL,
+                    first_seen_at REAL NOT NULL,
+                    PRIMARY KEY (target_id, post_id)
+                ) WITHOUT ROWID
+            ''')
+
+            # Create outbound Discord notification queue (written with the status update that detects a post)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS notifications (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    platform TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    post_id TEXT,
+                    content TEXT,
+                    post_url TEXT,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL,
+                    last_error TEXT,
+                    detected_at REAL NOT NULL,
+                    sent_at REAL
+                )
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_notifications_pending
+                ON notifications(next_attempt_at) WHERE status = 'pending'
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_notifications_sent
+                ON notifications(sent_at) WHERE status = 'sent'
+            ''')
+
+            # Create per-process metric snapshots summed by the dashboard's /metrics (see metrics.py)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS metric_samples (
+                    process TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    labels TEXT NOT NULL,
+                    series TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (process, name, labels)
+                ) WITHOUT ROWID
+            ''')
+
+            # Create per-host circuit breaker states shared by the bot, workers and dashboard
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS circuit_breakers (
+                    host TEXT PRIMARY KEY,
+                    state TEXT NOT NULL,
+                    consecutive_failures INTEGER NOT NULL,
+                    times_opened INTEGER NOT NULL,
+                    open_until REAL,
+                    last_error TEXT,
+                    updated_at REAL NOT NULL
+                ) WITHOUT ROWID
+            ''')
+
+            # Create check job queue table (coordinator/worker mode)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS check_jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    platform TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    shard INTEGER NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    visible_at REAL NOT NULL,
+                    worker_id TEXT,
+                    lease_token TEXT,
+                    lease_expires_at REAL,
+                    result TEXT,
+                    error_message TEXT,
+                    created_at REAL NOT NULL,
+                    finished_at REAL
+                )
+            ''')
+            # At most one queued or leased job per target, so two workers never check it at once
+            cursor.execute('''
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_check_jobs_active_target
+                ON check_jobs(platform, url) WHERE status IN ('queued', 'leased')
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_check_jobs_claim
+                ON check_jobs(status, shard, visible_at)
+            ''')
+
         logger.info("Database initialized successfully")
         
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
         raise
 
-def get_last_post(platform):
-    """Get the last known post for a platform"""
+@metrics.timed('db_operation_seconds', operation='get_last_post')
+def get_last_post(platform, url):
+    """Get the last known post for a target"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        # Buffered updates are newer than anything on disk
+        pending = status_buffer.last_post(platform, url)
+        if pending is not None:
+            return pending
+        
+        conn = get_connection()
         cursor = conn.cursor()
         
         cursor.execute('''
-            SELECT last_post_id, last_post_content, last_post_url 
+            SELECT last_post_id, last_post_content, last_post_url, fetch_tier
             FROM monitoring_status 
-            WHERE platform = ?
-        ''', (platform,))
+            WHERE target_id = (SELECT id FROM targets WHERE platform = ? AND url = ?)
+        ''', (platform, url))
         
         result = cursor.fetchone()
-        conn.close()
         
         if result:
             return {
                 'post_id': result[0],
                 'content': result[1],
-                'url': result[2]
+                'url': result[2],
+                'tier': result[3]
             }
         return None
         
     except Exception as e:
-        logger.error(f"Failed to get last post for {platform}: {e}")
+        logger.error(f"Failed to get last post for {platform} ({url}): {e}")
         return None
 
-def update_post_status(platform, url, post_data=None, error_message=None, is_new=False):
-    """Update the monitoring status for a platform"""
-    try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        
-        # Insert or update monitoring status
-        cursor.execute('''
-            INSERT OR REPLACE INTO monitoring_status 
-            (platform, url, last_post_content, last_post_id, last_post_url, 
-             last_checked, has_new_post, error_message, check_count, success_count)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 
-                    COALESCE((SELECT check_count FROM monitoring_status WHERE platform = ?), 0) + 1,
-                    COALESCE((SELECT success_count FROM monitoring_status WHERE platform = ?), 0) + ?)
-        ''', (
-            platform, url,
-            post_data.get('content', '') if post_data else '',
-            post_data.get('post_id', '') if post_data else '',
-            post_data.get('url', '') if post_data else '',
-            datetime.now(),
-            is_new,
-            error_message,
-            platform, platform,
-            1 if error_message is None else 0
+ENSURE_TARGET_SQL = '''
+    INSERT INTO targets (platform, url) VALUES (?, ?)
+    ON CONFLICT(platform, url) DO NOTHING
+'''
+
+UPSERT_STATUS_SQL = '''
+    INSERT INTO monitoring_status
+    (target_id, platform, url, last_post_content, last_post_id, last_post_url,
+     last_checked, has_new_post, error_message, check_count, success_count, fetch_tier)
+    VALUES ((SELECT id FROM targets WHERE platform = ? AND url = ?), ?, ?, ?, ?, ?, ?, ?, ?, 1, ?, ?)
+    ON CONFLICT(target_id) DO UPDATE SET
+        last_post_content = COALESCE(excluded.last_post_content, last_post_content),
+        last_post_id = COALESCE(excluded.last_post_id, last_post_id),
+        last_post_url = COALESCE(excluded.last_post_url, last_post_url),
+        last_checked = excluded.last_checked,
+        has_new_post = excluded.has_new_post,
+        error_message = excluded.error_message,
+        check_count = COALESCE(check_count, 0) + 1,
+        success_count = COALESCE(success_count, 0) + excluded.success_count,
+        fetch_tier = COALESCE(excluded.fetch_tier, fetch_tier)
+'''
+
+INSERT_POST_SQL = '''
+    INSERT INTO posts (platform, url, post_id, post_content, post_url, is_new)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+INSERT_SEEN_POST_SQL = '''
+    INSERT INTO seen_posts (target_id, post_id, first_seen_at)
+    VALUES ((SELECT id FROM targets WHERE platform = ? AND url = ?), ?, ?)
+    ON CONFLICT DO NOTHING
+'''
+
+INSERT_NOTIFICATION_SQL = '''
+    INSERT INTO notifications (platform, url, post_id, content, post_url, next_attempt_at, detected_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+def make_status_update(platform, url, post_data=None, error_message=None, is_new=False, notify=False,
+                       new_posts=None):
+    """Build a status update record for write_status_updates
+
+    `new_posts` lists every post to record as new, oldest first; by default that is `post_data`
+    alone when `is_new`.
+    """
+    if new_posts is None:
+        new_posts = [post_data] if is_new and post_data else []
+    return {
+        'platform': platform,
+        'url': url,
+        'post_data': post_data,
+        'error_message': error_message,
+        'is_new': is_new,
+        'notify': notify,
+        'new_posts': new_posts,
+        'checked_at': datetime.now()
+    }
+
+BUMP_STATUS_VERSION_SQL = '''
+    INSERT INTO data_versions (name, version) VALUES ('status', 1)
+    ON CONFLICT(name) DO UPDATE SET version = version + 1
+'''
+
+INSERT_TARGET_EVENT_SQL = '''
+    INSERT INTO status_events (target_id, created_at)
+    VALUES ((SELECT id FROM targets WHERE platform = ? AND url = ?), ?)
+'''
+
+def bump_status_version(cursor, targets=None):
+    """Mark monitoring status as changed, in the caller's transaction
+
+    Changed (platform, url) targets go to the status event feed; without them a single
+    "everything changed" event is written instead.
+    """
+    cursor.execute(BUMP_STATUS_VERSION_SQL)
+    now = time.time()
+    if targets is None:
+        cursor.execute('INSERT INTO status_events (target_id, created_at) VALUES (NULL, ?)', (now,))
+    else:
+        cursor.executemany(INSERT_TARGET_EVENT_SQL, [(platform, url, now) for platform, url in targets])
+    # Ids only grow, so trimming by id keeps the newest events with a primary key range delete
+    cursor.execute(
+        'DELETE FROM status_events WHERE id <= (SELECT MAX(id) FROM status_events) - ?',
+        (STATUS_EVENTS_RETAINED,)
+    )
+
+def get_data_version(name):
+    """Get a change counter from data_versions (visible across processes)"""
+    cursor = get_connection().cursor()
+    cursor.execute('SELECT version FROM data_versions WHERE name = ?', (name,))
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+def get_status_version():
+    """Get the monitoring status change counter (visible across processes)"""
+    return get_data_version('status')
+
+def get_last_status_event_id():
+    """Get the id of the newest status event (0 if there are none)"""
+    cursor = get_connection().cursor()
+    cursor.execute('SELECT MAX(id) FROM status_events')
+    return cursor.fetchone()[0] or 0
+
+@metrics.timed('db_operation_seconds', operation='get_status_events_since')
+def get_status_events_since(last_id, limit=1000):
+    """Get (event id, target id) rows after `last_id` and whether some were already pruned
+
+    A reader that fell behind the retained window has missed changes and must reload everything.
+    """
+    cursor = get_connection().cursor()
+    cursor.execute('SELECT id, target_id FROM status_events WHERE id > ? ORDER BY id LIMIT ?', (last_id, limit))
+    events = cursor.fetchall()
+    cursor.execute('SELECT MIN(id) FROM status_events')
+    oldest = cursor.fetchone()[0]
+    return events, oldest is not None and last_id + 1 < oldest
+
+@metrics.timed('db_operation_seconds', operation='write_status_updates')
+def write_status_updates(cursor, updates):
+    """Write status updates (and any new posts) with one statement batch each"""
+    status_rows = []
+    post_rows = []
+    seen_rows = []
+    notification_rows = []
+    for update in updates:
+        post_data = update['post_data']
+        if post_data:
+            # Every post on the page; already-seen identities hit the primary key and write nothing
+            seen_rows.extend(
+                (update['platform'], update['url'], post['post_id'], update['checked_at'].timestamp())
+                for post in post_data.get('posts') or [post_data] if post.get('post_id')
+            )
+        # A failed check writes NULL post fields, which keep the last post as the next check's baseline
+        status_rows.append((
+            update['platform'], update['url'], update['platform'], update['url'],
+            post_data.get('content', '') if post_data else None,
+            post_data.get('post_id', '') if post_data else None,
+            post_data.get('url', '') if post_data else None,
+            update['checked_at'],
+            update['is_new'],
+            update['error_message'],
+            1 if update['error_message'] is None else 0,
+            post_data.get('tier') if post_data else None
         ))
-        
-        # If there's a new post, also log it in the posts table
-        if is_new and post_data:
-            cursor.execute('''
-                INSERT INTO posts (platform, url, post_id, post_content, post_url, is_new)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                platform, url,
-                post_data.get('post_id', ''),
-                post_data.get('content', ''),
-                post_data.get('url', ''),
+
+        # Log each new post in the posts table, oldest first
+        for post in update['new_posts']:
+            post_rows.append((
+                update['platform'], update['url'],
+                post.get('post_id', ''),
+                post.get('content', ''),
+                post.get('url', ''),
                 True
             ))
+            # Queued in the same transaction, so a detected post is never recorded without its notification
+            if update.get('notify'):
+                detected_at = update['checked_at'].timestamp()
+                notification_rows.append((
+                    update['platform'], update['url'],
+                    post.get('post_id', ''),
+                    post.get('content', ''),
+                    post.get('url', ''),
+                    detected_at, detected_at
+                ))
+
+    # Status rows hang off the target registry, so unknown targets are registered first
+    cursor.executemany(ENSURE_TARGET_SQL, {(update['platform'], update['url']) for update in updates})
+    cursor.executemany(UPSERT_STATUS_SQL, status_rows)
+    if post_rows:
+        cursor.executemany(INSERT_POST_SQL, post_rows)
+    if seen_rows:
+        cursor.executemany(INSERT_SEEN_POST_SQL, seen_rows)
+    if notification_rows:
+        cursor.executemany(INSERT_NOTIFICATION_SQL, notification_rows)
+    bump_status_version(cursor, [(update['platform'], update['url']) for update in updates])
+
+def update_post_status(platform, url, post_data=None, error_message=None, is_new=False, notify=False,
+                       new_posts=None):
+    """Update the monitoring status for a platform"""
+    try:
+        with transaction() as cursor:
+            write_status_updates(cursor, [
+                make_status_update(platform, url, post_data, error_message, is_new, notify, new_posts)
+            ])
         
-        conn.commit()
-        conn.close()
         logger.info(f"Updated status for {platform}: new_post={is_new}, error={error_message is not None}")
         
     except Exception as e:
         logger.error(f"Failed to update post status for {platform}: {e}")
 
-def get_all_monitoring_status():
-    """Get current monitoring status for all platforms"""
+class StatusWriteBuffer:
+    """Write-behind buffer that flushes status updates in one transaction by size or age
+
+    Age-triggered flushes run on one long-lived writer thread, so they reuse its connection.
+    """
+
+    def __init__(self, max_size=WRITE_BUFFER_MAX_SIZE, max_delay=WRITE_BUFFER_MAX_DELAY):
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self.pending = []
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        self.deadline = None  # Monotonic time by which the oldest pending update must be written
+        self.writer = None
+        self.flush_count = 0
+        self.flushed_updates = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    def add(self, platform, url, post_data=None, error_message=None, is_new=False, notify=False,
+            new_posts=None):
+        """Queue a status update, flushing when the buffer is full"""
+        update = make_status_update(platform, url, post_data, error_message, is_new, notify, new_posts)
+        with self.lock:
+            self.pending.append(update)
+            full = len(self.pending) >= self.max_size
+            if not full and self.deadline is None:
+                # Time threshold: flush whatever is pending once the oldest update ages out
+                self.deadline = time.monotonic() + self.max_delay
+                if self.writer is None:
+                    self.writer = threading.Thread(target=self.run_writer, name='status-writer', daemon=True)
+                    self.writer.start()
+                self.wakeup.notify()
+        if full:
+            self.flush()
+
+    def run_writer(self):
+        """Writer thread: flush each time the oldest pending update reaches max_delay"""
+        while True:
+            with self.lock:
+                while self.deadline is None or self.deadline > time.monotonic():
+                    self.wakeup.wait(None if self.deadline is None else self.deadline - time.monotonic())
+            self.flush()
+            with self.lock:
+                if self.pending and self.deadline is None:
+                    # The flush failed and put its updates back; retry after another delay
+                    self.deadline = time.monotonic() + self.max_delay
+
+    def last_post(self, platform, url):
+        """Get the newest pending post data for a target, if any is buffered
+
+        Failed checks are skipped: they leave the stored last post in place.
+        """
+        with self.lock:
+            for update in reversed(self.pending):
+                post_data = update['post_data']
+                if update['platform'] == platform and update['url'] == url and post_data:
+                    return {
+                        'post_id': post_data.get('post_id', ''),
+                        'content': post_data.get('content', ''),
+                        'url': post_data.get('url', ''),
+                        'tier': post_data.get('tier')
+                    }
+        return None
+
+    def flush(self):
+        """Write all pending updates in a single transaction"""
+        with self.flush_lock:
+            with self.lock:
+                updates = self.pending
+                self.pending = []
+                self.deadline = None
+            if not updates:
+                return 0
+
+            started = time.perf_counter()
+            try:
+                with transaction() as cursor:
+                    write_status_updates(cursor, updates)
+            except Exception as e:
+                logger.error(f"Failed to flush {len(updates)} status updates: {e}")
+                with self.lock:
+                    # Keep failed updates ahead of newer ones so nothing is lost
+                    self.pending = updates + self.pending
+                return 0
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            metrics.observe('db_operation_seconds', elapsed_ms / 1000, operation='flush_status_updates')
+            with self.lock:
+                self.flush_count += 1
+                self.flushed_updates += len(updates)
+                self.last_flush_ms = elapsed_ms
+                self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+                self.total_flush_ms += elapsed_ms
+            logger.info(f"Flushed {len(updates)} status updates in {elapsed_ms:.1f}ms")
+            return len(updates)
+
+    def stats(self):
+        """Get queue depth and flush latency metrics"""
+        with self.lock:
+            return {
+                'pending': len(self.pending),
+                'flush_count': self.flush_count,
+                'flushed_updates': self.flushed_updates,
+                'last_flush_ms': round(self.last_flush_ms, 2),
+                'max_flush_ms': round(self.max_flush_ms, 2),
+                'avg_flush_ms': round(self.total_flush_ms / self.flush_count, 2) if self.flush_count else 0.0
+            }
+
+status_buffer = StatusWriteBuffer()
+
+def queue_post_status(platform, url, post_data=None, error_message=None, is_new=False, notify=False,
+                      new_posts=None):
+    """Buffer a status update; it is written with the next batch flush
+
+    With `notify`, each new post also queues a Discord notification (see notifier.py).
+    """
+    status_buffer.add(platform, url, post_data, error_message, is_new, notify, new_posts)
+
+def flush_status_updates():
+    """Write all buffered status updates now"""
+    return status_buffer.flush()
+
+@metrics.timed('db_operation_seconds', operation='get_seen_post_ids')
+def get_seen_post_ids(platform, url, limit=SEEN_POSTS_PER_TARGET):
+    """Get the identities of a target's most recently first-seen posts, newest first"""
+    try:
+        cursor = get_connection().cursor()
+        cursor.execute('''
+            SELECT post_id FROM seen_posts
+            WHERE target_id = (SELECT id FROM targets WHERE platform = ? AND url = ?)
+            ORDER BY first_seen_at DESC
+            LIMIT ?
+        ''', (platform, url, limit))
+        return [row[0] for row in cursor.fetchall()]
+        
+    except Exception as e:
+        logger.error(f"Failed to get seen posts for {platform} ({url}): {e}")
+        return []
+
+def prune_seen_posts(keep_per_target=SEEN_POSTS_PER_TARGET):
+    """Trim each target's seen set to its newest `keep_per_target` identities"""
+    with transaction() as cursor:
+        cursor.execute('''
+            DELETE FROM seen_posts
+            WHERE (target_id, post_id) IN (
+                SELECT target_id, post_id FROM (
+                    SELECT target_id, post_id,
+                           ROW_NUMBER() OVER (PARTITION BY target_id ORDER BY first_seen_at DESC) AS rank
+                    FROM seen_posts
+                )
+                WHERE rank > ?
+            )
+        ''', (keep_per_target,))
+        return cursor.rowcount
+
+@metrics.timed('db_operation_seconds', operation='get_recent_post_times')
+def get_recent_post_times(platform, url, limit=20):
+    """Get creation times of the most recent detected posts for a target"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = get_connection()
         cursor = conn.cursor()
         
         cursor.execute('''
-            SELECT platform, url, last_post_content, last_checked, 
-                   has_new_post, error_message, check_count, success_count
-            FROM monitoring_status
-        ''')
+            SELECT created_at
+            FROM posts
+            WHERE platform = ? AND url = ?
+            ORDER BY created_at DESC
+            LIMIT ?
+        ''', (platform, url, limit))
+        
+        return [row[0] for row in cursor.fetchall()]
+        
+    except Exception as e:
+        logger.error(f"Failed to get post history for {platform}: {e}")
+        return []
+
+RECENT_POST_TIMES_BATCH = 400  # Targets per query (two bound parameters each)
+
+@metrics.timed('db_operation_seconds', operation='get_recent_post_times_by_target')
+def get_recent_post_times_by_target(targets, limit=20):
+    """Get the most recent detected post times of many targets, a batch of targets per query
+
+    Returns {(platform, url): [created_at, ...]} newest first; targets without posts are left out.
+    """
+    targets = list(targets)
+    history = {}
+    try:
+        cursor = get_connection().cursor()
+        for start in range(0, len(targets), RECENT_POST_TIMES_BATCH):
+            batch = targets[start:start + RECENT_POST_TIMES_BATCH]
+            values = ', '.join('(?, ?)' for _ in batch)
+            cursor.execute(f'''
+                WITH wanted(platform, url) AS (VALUES {values})
+                SELECT platform, url, created_at FROM (
+                    SELECT p.platform, p.url, p.created_at,
+                           ROW_NUMBER() OVER (PARTITION BY p.platform, p.url ORDER BY p.created_at DESC) AS n
+                    FROM wanted w
+                    JOIN posts p ON p.platform = w.platform AND p.url = w.url
+                )
+                WHERE n <= ?
+                ORDER BY platform, url, created_at DESC
+            ''', [value for target in batch for value in target] + [limit])
+            for platform, url, created_at in cursor.fetchall():
+                history.setdefault((platform, url), []).append(created_at)
+        return history
+
+    except Exception as e:
+        logger.error(f"Failed to get post history for {len(targets)} targets: {e}")
+        return history
+
+ROLLUP_POSTS_SQL = '''
+    WITH batch AS (
+        SELECT id FROM posts
+        WHERE platform = ? AND url = ? AND created_at < ?
+        ORDER BY created_at
+        LIMIT ?
+    )
+    INSERT INTO posts_daily (platform, url, day, post_count, first_post_at, last_post_at)
+    SELECT platform, url, date(created_at), COUNT(*), MIN(created_at), MAX(created_at)
+    FROM posts
+    WHERE id IN batch
+    GROUP BY platform, url, date(created_at)
+    ON CONFLICT(platform, url, day) DO UPDATE SET
+        post_count = post_count + excluded.post_count,
+        first_post_at = MIN(first_post_at, excluded.first_post_at),
+        last_post_at = MAX(last_post_at, excluded.last_post_at)
+'''
+
+DELETE_ROLLED_UP_POSTS_SQL = '''
+    DELETE FROM posts
+    WHERE id IN (
+        SELECT id FROM posts
+        WHERE platform = ? AND url = ? AND created_at < ?
+        ORDER BY created_at
+        LIMIT ?
+    )
+'''
+
+def rollup_old_posts(retention_days=POSTS_RETENTION_DAYS, keep_per_target=POSTS_RETENTION_KEEP_PER_TARGET,
+                     batch_size=POSTS_MAINTENANCE_BATCH_SIZE):
+    """Fold posts older than the retention window into posts_daily and delete them, in short batches"""
+    if not retention_days:
+        return 0
+
+    retention_cutoff = (datetime.now(timezone.utc) - timedelta(days=retention_days)).strftime('%Y-%m-%d %H:%M:%S')
+    conn = get_connection()
+    targets = conn.execute('SELECT DISTINCT platform, url FROM posts').fetchall()
+    deleted = 0
+    pending = list(targets)
+    while pending:
+        # Each transaction covers about batch_size posts so checker writes are never blocked for long
+        with transaction() as cursor:
+            batch_deleted = 0
+            while pending and batch_deleted < batch_size:
+                platform, url = pending[-1]
+                cutoff = retention_cutoff
+                if keep_per_target > 0:
+                    # The newest posts of every target survive so adaptive polling keeps its history
+                    boundary = cursor.execute('''
+                        SELECT created_at FROM posts
+                        WHERE platform = ? AND url = ?
+                        ORDER BY created_at DESC
+                        LIMIT 1 OFFSET ?
+                    ''', (platform, url, keep_per_target - 1)).fetchone()
+                    if boundary is None:
+                        pending.pop()
+                        continue
+                    cutoff = min(retention_cutoff, boundary[0])
+
+                limit = batch_size - batch_deleted
+                params = (platform, url, cutoff, limit)
+                cursor.execute(ROLLUP_POSTS_SQL, params)
+                cursor.execute(DELETE_ROLLED_UP_POSTS_SQL, params)
+                batch_deleted += cursor.rowcount
+                if cursor.rowcount < limit:
+                    pending.pop()  # Target fully compacted
+        deleted += batch_deleted
+    return deleted
+
+def incremental_vacuum(pages=POSTS_VACUUM_PAGES):
+    """Return free pages to the filesystem a step at a time; returns the number released"""
+    conn = get_connection()
+    if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+        # Databases created before incremental auto-vacuum need one full VACUUM to switch modes
+        logger.info("Converting database to incremental auto-vacuum (one-time full VACUUM)")
+        conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        conn.execute('VACUUM')
+        return 0
+
+    initial_free = conn.execute('PRAGMA freelist_count').fetchone()[0]
+    free_pages = initial_free
+    while free_pages:
+        # Short steps keep each write lock brief; executescript steps the pragma to completion,
+        # a plain execute() frees only a single page
+        conn.executescript(f'PRAGMA incremental_vacuum({int(pages)});')
+        remaining = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        if remaining >= free_pages:
+            break
+        free_pages = remaining
+        time.sleep(0.01)
+    return initial_free - free_pages
+
+@metrics.timed('db_operation_seconds', operation='run_posts_maintenance')
+def run_posts_maintenance():
+    """Retention rollup and seen-set trimming followed by incremental vacuum (runs off the event loop)"""
+    try:
+        started = time.perf_counter()
+        deleted = rollup_old_posts()
+        seen_pruned = prune_seen_posts()
+        prune_metric_samples()
+        released = incremental_vacuum()
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"Posts maintenance: rolled up {deleted} posts older than {POSTS_RETENTION_DAYS} days, "
+            f"pruned {seen_pruned} seen post ids, released {released} free pages in {elapsed:.1f}s"
+        )
+        return {
+            'deleted': deleted,
+            'seen_pruned': seen_pruned,
+            'released_pages': released,
+            'seconds': round(elapsed, 2)
+        }
+        
+    except Exception as e:
+        logger.error(f"Posts maintenance failed: {e}")
+        return None
+
+@metrics.timed('db_operation_seconds', operation='get_all_monitoring_status')
+def get_all_monitoring_status(target_ids=None):
+    """Get current monitoring status for every enabled target (unchecked targets included)
+
+    Pass `target_ids` to fetch only those targets, e.g. the ones named by new status events.
+    """
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute(f'''
+            SELECT t.id, t.platform, t.url, m.last_post_content, m.last_checked,
+                   m.has_new_post, m.error_message, m.check_count, m.success_count, m.fetch_tier
+            FROM targets t
+            LEFT JOIN monitoring_status m ON m.target_id = t.id
+            WHERE t.enabled = 1
+            {'AND t.id IN (SELECT value FROM json_each(?))' if target_ids is not None else ''}
+            ORDER BY t.platform, t.id
+        ''', () if target_ids is None else (json.dumps(list(target_ids)),))
         
         results = cursor.fetchall()
-        conn.close()
         
         status_list = []
         for row in results:
             status_list.append({
-                'platform': row[0],
-                'url': row[1],
-                'last_post': row[2][:100] + '...' if row[2] and len(row[2]) > 100 else row[2] or 'No posts found',
-                'last_checked': row[3],
-                'has_new_post': bool(row[4]),
-                'error_message': row[5],
-                'check_count': row[6] or 0,
-                'success_count': row[7] or 0
+                'target_id': row[0],
+                'platform': row[1],
+                'url': row[2],
+                'last_post': row[3][:100] + '...' if row[3] and len(row[3]) > 100 else row[3] or 'No posts found',
+                'last_checked': row[4],
+                'has_new_post': bool(row[5]),
+                'error_message': row[6],
+                'check_count': row[7] or 0,
+                'success_count': row[8] or 0,
+                'fetch_tier': row[9]
             })
         
         return status_list
@@ -162,17 +937,352 @@ def get_all_monitoring_status():
         logger.error(f"Failed to get monitoring status: {e}")
         return []
 
-def reset_new_post_flags():
-    """Reset all new post flags to False"""
+def register_targets(targets, first_check_spread=0):
+    """Add (platform, url) targets to the registry, spreading first checks over a window"""
+    now = time.time()
+    rows = [(platform, url, now + random.uniform(0, first_check_spread)) for platform, url in targets]
+    try:
+        with transaction() as cursor:
+            cursor.executemany('''
+                INSERT INTO targets (platform, url, next_check_at) VALUES (?, ?, ?)
+                ON CONFLICT(platform, url) DO NOTHING
+            ''', rows)
+            added = cursor.rowcount
+            if added:
+                bump_status_version(cursor)
+        if added:
+            logger.info(f"Registered {added} new targets")
+        return added
+        
+    except Exception as e:
+        logger.error(f"Failed to register targets: {e}")
+        return 0
+
+def update_target_settings(platform, url, enabled=None, poll_interval=None):
+    """Enable/disable a target or set its fixed poll interval (0 restores adaptive polling)"""
+    try:
+        with transaction() as cursor:
+            if enabled is not None:
+                cursor.execute(
+                    'UPDATE targets SET enabled = ? WHERE platform = ? AND url = ?',
+                    (bool(enabled), platform, url)
+                )
+            if poll_interval is not None:
+                cursor.execute(
+                    'UPDATE targets SET poll_interval = ? WHERE platform = ? AND url = ?',
+                    (poll_interval or None, platform, url)
+                )
+            bump_status_version(cursor)
+        
+    except Exception as e:
+        logger.error(f"Failed to update target settings for {platform} ({url}): {e}")
+
+POST_FIELDS = {
+    'id': 'id',
+    'platform': 'platform',
+    'url': 'url',
+    'post_id': 'post_id',
+    'content': 'post_content',
+    'post_url': 'post_url',
+    'is_new': 'is_new',
+    'created_at': 'created_at'
+}
+
+TARGET_FIELDS = {
+    'id': 't.id',
+    'platform': 't.platform',
+    'url': 't.url',
+    'enabled': 't.enabled',
+    'poll_interval': 't.poll_interval',
+    'next_check_at': 't.next_check_at',
+    'created_at': 't.created_at',
+    'last_post_id': 'm.last_post_id',
+    'last_post': 'm.last_post_content',
+    'last_checked': 'm.last_checked',
+    'has_new_post': 'm.has_new_post',
+    'error_message': 'm.error_message',
+    'check_count': 'm.check_count',
+    'success_count': 'm.success_count',
+    'fetch_tier': 'm.fetch_tier'
+}
+
+@metrics.timed('db_operation_seconds', operation='get_posts_page')
+def get_posts_page(fields, platform=None, url=None, since=None, until=None, after=None, limit=100):
+    """Get up to `limit` posts newest first, continuing after the (created_at, id) keyset `after`
+
+    Returns (rows, last key). Each page is an index range scan, however deep into the history it is.
+    """
+    conditions = []
+    params = []
+    if platform is not None:
+        conditions.append('platform = ?')
+        params.append(platform)
+    if url is not None:
+        conditions.append('url = ?')
+        params.append(url)
+    if since is not None:
+        conditions.append('created_at >= ?')
+        params.append(since)
+    if until is not None:
+        conditions.append('created_at < ?')
+        params.append(until)
+    if after is not None:
+        conditions.append('(created_at, id) < (?, ?)')
+        params.extend(after)
+    
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    columns = ', '.join(POST_FIELDS[field] for field in fields)
+    cursor = get_connection().cursor()
+    cursor.execute(f'''
+        SELECT {columns}, created_at, id FROM posts
+        {where}
+        ORDER BY created_at DESC, id DESC
+        LIMIT ?
+    ''', (*params, limit))
+    rows = cursor.fetchall()
+    if not rows:
+        return [], None
+    return [dict(zip(fields, row)) for row in rows], tuple(rows[-1][-2:])
+
+@metrics.timed('db_operation_seconds', operation='get_targets_page')
+def get_targets_page(fields, platform=None, enabled=None, after=None, limit=100):
+    """Get up to `limit` targets (with their monitoring status) in id order, after target id `after`"""
+    conditions = []
+    params = []
+    if platform is not None:
+        conditions.append('t.platform = ?')
+        params.append(platform)
+    if enabled is not None:
+        conditions.append('t.enabled = ?')
+        params.append(bool(enabled))
+    if after is not None:
+        conditions.append('t.id > ?')
+        params.append(after)
+    
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    columns = ', '.join(TARGET_FIELDS[field] for field in fields)
+    cursor = get_connection().cursor()
+    cursor.execute(f'''
+        SELECT {columns}, t.id FROM targets t
+        LEFT JOIN monitoring_status m ON m.target_id = t.id
+        {where}
+        ORDER BY t.id
+        LIMIT ?
+    ''', (*params, limit))
+    rows = cursor.fetchall()
+    if not rows:
+        return [], None
+    return [dict(zip(fields, row)) for row in rows], rows[-1][-1]
+
+def get_target(target_id):
+    """Get a target's (platform, url) by id, or None"""
+    cursor = get_connection().cursor()
+    cursor.execute('SELECT platform, url FROM targets WHERE id = ?', (target_id,))
+    row = cursor.fetchone()
+    return (row[0], row[1]) if row else None
+
+def get_enabled_targets():
+    """Get every enabled target as (platform, url)"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = get_connection()
         cursor = conn.cursor()
+        cursor.execute('SELECT platform, url FROM targets WHERE enabled = 1 ORDER BY id')
+        return [(row[0], row[1]) for row in cursor.fetchall()]
         
-        cursor.execute('UPDATE monitoring_status SET has_new_post = 0')
+    except Exception as e:
+        logger.error(f"Failed to get targets: {e}")
+        return []
+
+@metrics.timed('db_operation_seconds', operation='claim_due_targets')
+def claim_due_targets(now, hold_until, limit=None):
+    """Get enabled targets due by `now`, pushing their next check to `hold_until` while they run"""
+    try:
+        with transaction() as cursor:
+            cursor.execute('''
+                UPDATE targets SET next_check_at = ?
+                WHERE id IN (
+                    SELECT id FROM targets
+                    WHERE enabled = 1 AND next_check_at <= ?
+                    ORDER BY next_check_at
+                    LIMIT ?
+                )
+                RETURNING platform, url
+            ''', (hold_until, now, -1 if limit is None else limit))
+            return [(row[0], row[1]) for row in cursor.fetchall()]
+        
+    except Exception as e:
+        logger.error(f"Failed to get due targets: {e}")
+        return []
+
+@metrics.timed('db_operation_seconds', operation='set_next_check_times')
+def set_next_check_times(schedule):
+    """Store next check times from (next_check_at, platform, url) rows"""
+    try:
+        with transaction() as cursor:
+            cursor.executemany(
+                'UPDATE targets SET next_check_at = ? WHERE platform = ? AND url = ?',
+                schedule
+            )
+        
+    except Exception as e:
+        logger.error(f"Failed to store next check times: {e}")
+
+def get_poll_interval_overrides():
+    """Get fixed poll intervals keyed by (platform, url) for targets that set one"""
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT platform, url, poll_interval FROM targets WHERE poll_interval IS NOT NULL')
+        return {(row[0], row[1]): row[2] for row in cursor.fetchall()}
+        
+    except Exception as e:
+        logger.error(f"Failed to get poll interval overrides: {e}")
+        return {}
+
+def reset_new_post_flags():
+    """Reset all new post flags to False"""
+    try:
+        with transaction() as cursor:
+            cursor.execute('UPDATE monitoring_status SET has_new_post = 0')
+            bump_status_version(cursor)
         
-        conn.commit()
-        conn.close()
         logger.info("Reset all new post flags")
         
     except Exception as e:
         logger.error(f"Failed to reset new post flags: {e}")
+
+@metrics.timed('db_operation_seconds', operation='get_http_cache_entry')
+def get_http_cache_entry(url):
+    """Get the stored HTTP validators and page text for a URL"""
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT etag, last_modified, body_hash, page_text
+            FROM http_cache
+            WHERE url = ?
+        ''', (url,))
+        
+        result = cursor.fetchone()
+        
+        if result:
+            return {
+                'etag': result[0],
+                'last_modified': result[1],
+                'body_hash': result[2],
+                'page_text': result[3]
+            }
+        return None
+        
+    except Exception as e:
+        logger.error(f"Failed to get HTTP cache entry for {url}: {e}")
+        return None
+
+@metrics.timed('db_operation_seconds', operation='save_http_cache_entry')
+def save_http_cache_entry(url, etag, last_modified, body_hash, page_text):
+    """Store HTTP validators and page text for a URL"""
+    try:
+        with transaction() as cursor:
+            cursor.execute('''
+                INSERT OR REPLACE INTO http_cache
+                (url, etag, last_modified, body_hash, page_text, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (url, etag, last_modified, body_hash, page_text, datetime.now()))
+        
+    except Exception as e:
+        logger.error(f"Failed to save HTTP cache entry for {url}: {e}")
+
+UPSERT_METRIC_SQL = '''
+    INSERT INTO metric_samples (process, name, labels, series, updated_at)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(process, name, labels) DO UPDATE SET
+        series = excluded.series,
+        updated_at = excluded.updated_at
+'''
+
+def save_metrics(registry=metrics):
+    """Write this process's metric series that changed since the last save"""
+    rows = registry.take_changes()
+    if not rows:
+        return 0
+    try:
+        now = time.time()
+        with transaction() as cursor:
+            cursor.executemany(UPSERT_METRIC_SQL, [
+                (registry.process, name, labels, series, now) for name, labels, series in rows
+            ])
+        return len(rows)
+
+    except Exception as e:
+        logger.error(f"Failed to save {len(rows)} metric series: {e}")
+        registry.restore_changes(rows)
+        return 0
+
+def get_metric_samples():
+    """Get (name, labels JSON, series JSON) rows saved by every process"""
+    cursor = get_connection().cursor()
+    cursor.execute('SELECT name, labels, series FROM metric_samples')
+    return cursor.fetchall()
+
+def prune_metric_samples(retention_hours=METRICS_RETENTION_HOURS):
+    """Drop the metrics of processes that have saved nothing within the retention window"""
+    with transaction() as cursor:
+        cursor.execute('''
+            DELETE FROM metric_samples WHERE process IN (
+                SELECT process FROM metric_samples GROUP BY process HAVING MAX(updated_at) < ?
+            )
+        ''', (time.time() - retention_hours * 3600,))
+        return cursor.rowcount
+
+UPSERT_BREAKER_SQL = '''
+    INSERT INTO circuit_breakers
+    (host, state, consecutive_failures, times_opened, open_until, last_error, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(host) DO UPDATE SET
+        state = excluded.state,
+        consecutive_failures = excluded.consecutive_failures,
+        times_opened = excluded.times_opened,
+        open_until = excluded.open_until,
+        last_error = excluded.last_error,
+        updated_at = excluded.updated_at
+    WHERE excluded.updated_at >= circuit_breakers.updated_at
+'''
+
+BUMP_CIRCUITS_VERSION_SQL = '''
+    INSERT INTO data_versions (name, version) VALUES ('circuits', 1)
+    ON CONFLICT(name) DO UPDATE SET version = version + 1
+'''
+
+def save_breakers(registry=breakers):
+    """Write this process's circuit breaker changes; the newest state per host wins"""
+    rows = registry.take_changes()
+    if not rows:
+        return 0
+    try:
+        with transaction() as cursor:
+            cursor.executemany(UPSERT_BREAKER_SQL, rows)
+            cursor.execute(BUMP_CIRCUITS_VERSION_SQL)
+        return len(rows)
+
+    except Exception as e:
+        logger.error(f"Failed to save {len(rows)} circuit breaker states: {e}")
+        registry.restore_changes(rows)
+        return 0
+
+def load_breakers(registry=breakers):
+    """Adopt circuit breaker states saved by other processes (or before a restart)"""
+    try:
+        cursor = get_connection().cursor()
+        cursor.execute('''
+            SELECT host, state, consecutive_failures, times_opened, open_until, last_error, updated_at
+            FROM circuit_breakers
+        ''')
+        registry.merge(cursor.fetchall())
+
+    except Exception as e:
+        logger.error(f"Failed to load circuit breaker states: {e}")
+
+def get_circuits_version():
+    """Get the circuit breaker change counter (visible across processes)"""
+    return get_data_version('circuits')
@@ -0,0 +1,113 @@
+"""
+Persistent HTTP validator cache for conditional GET revalidation
+"""
+import hashlib
+import logging
+import threading
+from database import get_http_cache_entry, save_http_cache_entry
+
+logger = logging.getLogger(__name__)
+
+def hash_body(body):
+    """Cheap hash of the raw response body"""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+class ValidatorCache:
+    """Stores ETag, Last-Modified and body hash per URL so unchanged pages skip parsing"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.not_modified_hits = 0
+        self.body_hash_hits = 0
+        self.misses = 0
+
+    def get_entry(self, url):
+        """Get the cached entry for a URL, loading it from the database on first use"""
+        with self.lock:
+            if url in self.entries:
+                return self.entries[url]
+
+        entry = get_http_cache_entry(url)
+        with self.lock:
+            self.entries.setdefault(url, entry)
+            return self.entries[url]
+
+    def is_loaded(self, url):
+        """Whether the URL's entry is in memory, so lookups need no database read"""
+        with self.lock:
+            return not self.enabled or url in self.entries
+
+    def request_headers(self, url):
+        """Build If-None-Match / If-Modified-Since headers for a URL"""
+        if not self.enabled:
+            return {}
+
+        entry = self.get_entry(url)
+        headers = {}
+        if entry and entry['page_text'] is not None:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def not_modified(self, url):
+        """Handle a 304 response; returns the cached page text or None"""
+        entry = self.get_entry(url)
+        if entry is None:
+            return None
+        with self.lock:
+            self.not_modified_hits += 1
+        return entry['page_text']
+
+    def known_body_hash(self, url):
+        """Get the body hash stored for a URL, if any"""
+        if not self.enabled:
+            return None
+
+        entry = self.get_entry(url)
+        return entry['body_hash'] if entry else None
+
+    def match_body(self, url, body_hash):
+        """Return cached page text if the raw body is unchanged, else None"""
+        if not self.enabled:
+            return None
+
+        entry = self.get_entry(url)
+        with self.lock:
+            if entry and entry['body_hash'] == body_hash:
+                self.body_hash_hits += 1
+                return entry['page_text']
+            self.misses += 1
+        return None
+
+    def store(self, url, etag, last_modified, body_hash, page_text):
+        """Remember validators for a URL, writing through only when something changed"""
+        if not self.enabled:
+            return
+
+        entry = {
+            'etag': etag,
+            'last_modified': last_modified,
+            'body_hash': body_hash,
+            'page_text': page_text
+        }
+        with self.lock:
+            if self.entries.get(url) == entry:
+                return
+            self.entries[url] = entry
+        save_http_cache_entry(url, etag, last_modified, body_hash, page_text)
+
+    def stats(self):
+        """Get hit/miss counters"""
+        with self.lock:
+            hits = self.not_modified_hits + self.body_hash_hits
+            total = hits + self.misses
+            return {
+                'not_modified_hits': self.not_modified_hits,
+                'body_hash_hits': self.body_hash_hits,
+                'misses': self.misses,
+                'hit_rate': round(hits / total * 100, 1) if total else 0.0
+            }
@@ -0,0 +1,192 @@
+"""
+SQLite-backed check job queue with leases, visibility timeouts and host sharding
+"""
+import json
+import logging
+import time
+import zlib
+from config import (
+    JOB_QUEUE_SHARDS, JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS, JOB_RETRY_DELAY
+)
+from circuit_breaker import get_host
+from database import get_connection, transaction
+
+logger = logging.getLogger(__name__)
+
+JOB_COLUMNS = 'id, platform, url, shard, attempts, worker_id, lease_token'
+
+def row_to_job(row):
+    return {
+        'id': row[0],
+        'platform': row[1],
+        'url': row[2],
+        'shard': row[3],
+        'attempts': row[4],
+        'worker_id': row[5],
+        'lease_token': row[6]
+    }
+
+class SQLiteJobQueue:
+    """Job queue stored in the bot's database
+
+    The coordinator enqueues targets and collects finished jobs; workers claim jobs from
+    their host shards. Workers must run on the same machine as the database file: SQLite's
+    WAL locking needs shared memory and does not work over a network filesystem. Any broker
+    exposing the same methods can replace this class.
+    """
+
+    def __init__(self, shard_count=JOB_QUEUE_SHARDS, lease_seconds=JOB_LEASE_SECONDS,
+                 max_attempts=JOB_MAX_ATTEMPTS, retry_delay=JOB_RETRY_DELAY):
+        self.shard_count = shard_count
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+    def get_shard(self, url):
+        """Targets on the same host always land on the same shard"""
+        return zlib.crc32(get_host(url).encode()) % self.shard_count
+
+    def enqueue(self, targets):
+        """Queue a check per (platform, url); targets with an active job are skipped"""
+        now = time.time()
+        rows = [(platform, url, self.get_shard(url), now, now) for platform, url in targets]
+        with transaction() as cursor:
+            cursor.executemany('''
+                INSERT INTO check_jobs (platform, url, shard, visible_at, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT DO NOTHING
+            ''', rows)
+            return cursor.rowcount
+
+    def expire_leases(self, cursor, now):
+        """Fail jobs whose lease expired on their last allowed attempt"""
+        cursor.execute('''
+            UPDATE check_jobs
+            SET status = 'failed', finished_at = ?,
+                error_message = 'Lease expired on worker ' || COALESCE(worker_id, '?')
+            WHERE status = 'leased' AND lease_expires_at <= ? AND attempts >= ?
+        ''', (now, now, self.max_attempts))
+
+    def claim(self, worker_id, shards=None, limit=1):
+        """Lease up to `limit` visible jobs (or jobs with an expired lease) from the given shards"""
+        shards = list(range(self.shard_count)) if shards is None else list(shards)
+        if not shards or limit <= 0:
+            return []
+
+        now = time.time()
+        placeholders = ','.join('?' * len(shards))
+        with transaction() as cursor:
+            self.expire_leases(cursor, now)
+            # A single UPDATE picks and leases the rows, so concurrent workers cannot claim the same job
+            cursor.execute(f'''
+                UPDATE check_jobs
+                SET status = 'leased', worker_id = ?, attempts = attempts + 1,
+                    lease_token = lower(hex(randomblob(8))), lease_expires_at = ?
+                WHERE id IN (
+                    SELECT id FROM check_jobs
+                    WHERE shard IN ({placeholders})
+                      AND ((status = 'queued' AND visible_at <= ?)
+                           OR (status = 'leased' AND lease_expires_at <= ?))
+                    ORDER BY visible_at
+                    LIMIT ?
+                )
+                RETURNING {JOB_COLUMNS}
+            ''', (worker_id, now + self.lease_seconds, *shards, now, now, limit))
+            return [row_to_job(row) for row in cursor.fetchall()]
+
+    def renew(self, jobs):
+        """Extend the leases of jobs still being worked on; returns the ids that were lost"""
+        expires_at = time.time() + self.lease_seconds
+        lost = []
+        with transaction() as cursor:
+            for job in jobs:
+                cursor.execute('''
+                    UPDATE check_jobs SET lease_expires_at = ?
+                    WHERE id = ? AND lease_token = ? AND status = 'leased'
+                ''', (expires_at, job['id'], job['lease_token']))
+                if cursor.rowcount == 0:
+                    lost.append(job['id'])
+        return lost
+
+    def complete(self, job, post_data, error_message=None):
+        """Store a check result; returns False if the lease was lost to another worker"""
+        result = json.dumps({'post': post_data, 'error': error_message})
+        with transaction() as cursor:
+            cursor.execute('''
+                UPDATE check_jobs
+                SET status = 'done', result = ?, finished_at = ?, lease_expires_at = NULL
+                WHERE id = ? AND lease_token = ? AND status = 'leased'
+            ''', (result, time.time(), job['id'], job['lease_token']))
+            completed = cursor.rowcount == 1
+        if not completed:
+            logger.warning(f"Dropped result for job {job['id']}: lease no longer held")
+        return completed
+
+    def fail(self, job, error_message):
+        """Hide a failed job for the retry delay, or fail it for good after the last attempt"""
+        now = time.time()
+        with transaction() as cursor:
+            if job['attempts'] >= self.max_attempts:
+                cursor.execute('''
+                    UPDATE check_jobs
+                    SET status = 'failed', error_message = ?, finished_at = ?, lease_expires_at = NULL
+                    WHERE id = ? AND lease_token = ? AND status = 'leased'
+                ''', (error_message, now, job['id'], job['lease_token']))
+            else:
+                cursor.execute('''
+                    UPDATE check_jobs
+                    SET status = 'queued', error_message = ?, visible_at = ?,
+                        worker_id = NULL, lease_token = NULL, lease_expires_at = NULL
+                    WHERE id = ? AND lease_token = ? AND status = 'leased'
+                ''', (error_message, now + self.retry_delay, job['id'], job['lease_token']))
+            return cursor.rowcount == 1
+
+    def collect_results(self, limit=100):
+        """Remove finished jobs from the queue and return their results, oldest first"""
+        with transaction() as cursor:
+            self.expire_leases(cursor, time.time())
+            cursor.execute('''
+                DELETE FROM check_jobs
+                WHERE id IN (
+                    SELECT id FROM check_jobs
+                    WHERE status IN ('done', 'failed')
+                    ORDER BY finished_at
+                    LIMIT ?
+                )
+                RETURNING id, platform, url, status, result, error_message, worker_id, attempts, finished_at
+            ''', (limit,))
+            rows = cursor.fetchall()
+
+        results = []
+        for row in sorted(rows, key=lambda r: r[8]):
+            result = json.loads(row[4]) if row[4] else {'post': None, 'error': None}
+            error_message = result['error']
+            if row[3] == 'failed' or (result['post'] is None and not error_message):
+                error_message = error_message or row[5] or "No posts found or scraping failed"
+            results.append({
+                'id': row[0],
+                'platform': row[1],
+                'url': row[2],
+                'post': result['post'],
+                'error': error_message,
+                'worker_id': row[6],
+                'attempts': row[7]
+            })
+        return results
+
+    def stats(self):
+        """Get job counts by status and the number of live workers"""
+        cursor = get_connection().cursor()
+        cursor.execute('SELECT status, COUNT(*) FROM check_jobs GROUP BY status')
+        counts = dict(cursor.fetchall())
+        cursor.execute('''
+            SELECT COUNT(DISTINCT worker_id) FROM check_jobs
+            WHERE status = 'leased' AND lease_expires_at > ?
+        ''', (time.time(),))
+        return {
+            'queued': counts.get('queued', 0),
+            'leased': counts.get('leased', 0),
+            'done': counts.get('done', 0),
+            'failed': counts.get('failed', 0),
+            'busy_workers': cursor.fetchone()[0]
+        }
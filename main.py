@@ -3,11 +3,13 @@ Main entry point for the Discord Bot with Social Media Scraper
 Runs both the Discord bot and the web dashboard concurrently
 """
 import asyncio
+import multiprocessing
 import threading
 import logging
+from config import DASHBOARD_MODE
 from bot import DiscordBot
-from dashboard import app as dashboard_app
-from database import init_database
+from dashboard import serve_dashboard, run_dashboard_process
+from database import init_database, flush_status_updates, close_connections
 
 # Set up logging
 logging.basicConfig(
@@ -24,24 +26,49 @@ logger = logging.getLogger(__name__)
 def run_dashboard():
     """Run the Flask dashboard in a separate thread"""
     try:
-        dashboard_app.run(host='0.0.0.0', port=5000, debug=False, use_reloader=False)
+        serve_dashboard()
     except Exception as e:
         logger.error(f"Dashboard failed to start: {e}")
 
-async def main():
-    """Main function to run both bot and dashboard"""
-    logger.info("Initializing database...")
-    init_database()
+def start_dashboard():
+    """Start the dashboard according to DASHBOARD_MODE; returns the child process in 'process' mode"""
+    if DASHBOARD_MODE == 'off':
+        logger.info("Dashboard disabled here (DASHBOARD_MODE = 'off'); run dashboard.py to serve it")
+        return None
     
     logger.info("Starting dashboard server...")
+    if DASHBOARD_MODE == 'process':
+        # Its own interpreter, so request handling never competes with the checker for the GIL
+        process = multiprocessing.get_context('spawn').Process(
+            target=run_dashboard_process, name='dashboard', daemon=True
+        )
+        process.start()
+        return process
+    
     # Start dashboard in a separate thread
     dashboard_thread = threading.Thread(target=run_dashboard, daemon=True)
     dashboard_thread.start()
+    return None
+
+async def main():
+    """Main function to run both bot and dashboard"""
+    logger.info("Initializing database...")
+    init_database()
+    
+    dashboard_process = start_dashboard()
     
     logger.info("Starting Discord bot...")
     # Start the Discord bot
     bot = DiscordBot()
-    await bot.start_bot()
+    try:
+        await bot.start_bot()
+    finally:
+        # Write any buffered status updates before the connections go away
+        flush_status_updates()
+        close_connections()
+        if dashboard_process:
+            dashboard_process.terminate()
+            dashboard_process.join(timeout=5)
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,183 @@
+"""
+Lightweight in-process metrics: latency histograms and counters, rendered in Prometheus text format
+
+Each process records into its own registry and periodically saves a snapshot to the database
+(see database.save_metrics), so /metrics can sum the bot, worker and dashboard processes.
+"""
+import asyncio
+import functools
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from config import METRICS_ENABLED, METRICS_PER_TARGET
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds: sub-millisecond DB calls up to slow page loads
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+METRIC_HELP = {
+    'check_stage_seconds': ('histogram', 'Time spent in each stage of a check (fetch tiers, DNS, connect, download, parse, browser steps)'),
+    'checks_total': ('counter', 'Checks recorded, by result'),
+    'new_posts_total': ('counter', 'New posts detected'),
+    'db_operation_seconds': ('histogram', 'Time spent in database operations'),
+    'discord_send_seconds': ('histogram', 'Time spent sending one notification message to Discord, by outcome'),
+    'notification_delivery_seconds': ('histogram', 'Time from post detection to its Discord notification being sent')
+}
+
+class MetricsRegistry:
+    """Counters and fixed-bucket histograms keyed by metric name and label set
+
+    Recording is two dict lookups, a lock and a bisect (a few microseconds), so timing every
+    stage of a check costs far less than 1% of a networked check. Disabled registries record nothing.
+    """
+
+    def __init__(self, enabled=METRICS_ENABLED, per_target=METRICS_PER_TARGET, buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.per_target = per_target
+        self.buckets = buckets
+        self.process = f'{socket.gethostname()}-{os.getpid()}'
+        self.series = {}  # (name, labels tuple) -> {'count': n, 'sum': s, 'buckets': [...]} or {'value': n}
+        self.keys = {}  # (name, labels as passed) -> series key, so labels are sorted once per call site
+        self.dirty = set()
+        self.lock = threading.Lock()
+
+    def series_key(self, name, labels):
+        raw = (name, tuple(labels.items()))
+        key = self.keys.get(raw)
+        if key is None:
+            if not self.per_target:
+                labels.pop('target', None)
+            labels = tuple(sorted((label, str(value)) for label, value in labels.items() if value is not None))
+            key = self.keys[raw] = (name, labels)
+        return key
+
+    def observe(self, name, seconds, **labels):
+        """Add a duration to a histogram"""
+        if not self.enabled:
+            return
+        key = self.series_key(name, labels)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = {'count': 0, 'sum': 0.0, 'buckets': [0] * len(self.buckets)}
+            series['count'] += 1
+            series['sum'] += seconds
+            index = bisect_left(self.buckets, seconds)
+            if index < len(self.buckets):
+                series['buckets'][index] += 1
+            self.dirty.add(key)
+
+    def inc(self, name, amount=1, **labels):
+        """Increase a counter"""
+        if not self.enabled:
+            return
+        key = self.series_key(name, labels)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = {'value': 0}
+            series['value'] += amount
+            self.dirty.add(key)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Time a block into a histogram, including blocks that raise"""
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def timed(self, name, **labels):
+        """Decorator timing every call of a sync or async function"""
+        def decorator(func):
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.timer(name, **labels):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def take_changes(self):
+        """Get (name, labels JSON, series JSON) rows changed since the last call"""
+        with self.lock:
+            rows = [
+                (name, json.dumps(dict(labels)), json.dumps(self.series[(name, labels)]))
+                for name, labels in self.dirty
+            ]
+            self.dirty = set()
+        return rows
+
+    def restore_changes(self, rows):
+        """Mark rows from a failed save as changed again"""
+        with self.lock:
+            for name, labels, _ in rows:
+                self.dirty.add((name, tuple(sorted(json.loads(labels).items()))))
+
+metrics = MetricsRegistry()
+
+def set_process_name(name):
+    """Name this process's snapshot rows (e.g. 'bot', 'worker-<id>'); a restart then replaces them"""
+    metrics.process = name
+
+def escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def format_labels(labels, extra=None):
+    items = list(labels.items()) + (list(extra.items()) if extra else [])
+    if not items:
+        return ''
+    return '{' + ','.join(f'{key}="{escape_label(str(value))}"' for key, value in items) + '}'
+
+def render_prometheus(samples, buckets=DEFAULT_BUCKETS):
+    """Render (name, labels JSON, series JSON) rows from all processes, summing equal series"""
+    merged = {}
+    for name, labels, series in samples:
+        series = json.loads(series)
+        key = (name, labels)
+        total = merged.get(key)
+        if total is None:
+            merged[key] = series
+        elif 'value' in series:
+            total['value'] += series['value']
+        else:
+            total['count'] += series['count']
+            total['sum'] += series['sum']
+            total['buckets'] = [a + b for a, b in zip(total['buckets'], series['buckets'])]
+
+    lines = []
+    for name in sorted({name for name, _ in merged}):
+        kind, help_text = METRIC_HELP.get(name, ('untyped', name))
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for (series_name, labels), series in sorted(merged.items()):
+            if series_name != name:
+                continue
+            labels = json.loads(labels)
+            if 'value' in series:
+                lines.append(f'{name}{format_labels(labels)} {series["value"]}')
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets, series['buckets']):
+                cumulative += count
+                lines.append(f'{name}_bucket{format_labels(labels, {"le": bound})} {cumulative}')
+            lines.append(f'{name}_bucket{format_labels(labels, {"le": "+Inf"})} {series["count"]}')
+            lines.append(f'{name}_sum{format_labels(labels)} {series["sum"]:.6f}')
+            lines.append(f'{name}_count{format_labels(labels)} {series["count"]}')
+    return '\n'.join(lines) + '\n'
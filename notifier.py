@@ -0,0 +1,314 @@
+"""
+Outbound Discord notification queue: persisted in SQLite, batched and paced per channel
+"""
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+import aiohttp
+import discord
+from config import (
+    NOTIFY_BATCH_SIZE, NOTIFY_RATE_PER_SECOND, NOTIFY_BURST, NOTIFY_MAX_ATTEMPTS,
+    NOTIFY_RETRY_BASE_DELAY, NOTIFY_RETRY_MAX_DELAY, NOTIFY_POLL_INTERVAL, NOTIFY_RETENTION_HOURS
+)
+from database import get_connection, transaction
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+MAX_EMBED_CHARS = 6000  # Discord's limit on the combined text of all embeds in one message
+
+NOTIFICATION_COLUMNS = 'id, platform, url, post_id, content, post_url, attempts, detected_at'
+
+def row_to_notification(row):
+    return {
+        'id': row[0],
+        'platform': row[1],
+        'url': row[2],
+        'post_id': row[3],
+        'content': row[4] or '',
+        'post_url': row[5] or '',
+        'attempts': row[6],
+        'detected_at': row[7]
+    }
+
+class NotificationQueue:
+    """Pending notifications in the bot's database
+
+    Rows are inserted by write_status_updates together with the new post they announce, and
+    stay after delivery (status 'sent' or 'failed') for NOTIFY_RETENTION_HOURS for metrics.
+    """
+
+    def __init__(self, max_attempts=NOTIFY_MAX_ATTEMPTS):
+        self.max_attempts = max_attempts
+
+    def due(self, limit):
+        """Get pending notifications whose next attempt is due, oldest first"""
+        cursor = get_connection().cursor()
+        cursor.execute(f'''
+            SELECT {NOTIFICATION_COLUMNS} FROM notifications
+            WHERE status = 'pending' AND next_attempt_at <= ?
+            ORDER BY next_attempt_at, id
+            LIMIT ?
+        ''', (time.time(), limit))
+        return [row_to_notification(row) for row in cursor.fetchall()]
+
+    def mark_sent(self, ids):
+        with transaction() as cursor:
+            cursor.executemany(
+                "UPDATE notifications SET status = 'sent', sent_at = ?, last_error = NULL WHERE id = ?",
+                [(time.time(), notification_id) for notification_id in ids]
+            )
+
+    def retry(self, ids, error_message, delay, count_attempt=True):
+        """Hide notifications for `delay` seconds; counted attempts past the limit fail them for good"""
+        increment = 1 if count_attempt else 0
+        with transaction() as cursor:
+            cursor.executemany('''
+                UPDATE notifications
+                SET attempts = attempts + ?, last_error = ?, next_attempt_at = ?,
+                    status = CASE WHEN attempts + ? >= ? THEN 'failed' ELSE 'pending' END
+                WHERE id = ?
+            ''', [(increment, error_message, time.time() + delay, increment, self.max_attempts, notification_id)
+                  for notification_id in ids])
+
+    def fail(self, ids, error_message):
+        with transaction() as cursor:
+            cursor.executemany(
+                "UPDATE notifications SET status = 'failed', attempts = attempts + 1, last_error = ? WHERE id = ?",
+                [(error_message, notification_id) for notification_id in ids]
+            )
+
+    def prune(self, retention_hours=NOTIFY_RETENTION_HOURS):
+        """Delete delivered and failed notifications older than the retention window"""
+        with transaction() as cursor:
+            cursor.execute(
+                "DELETE FROM notifications WHERE status != 'pending' AND detected_at < ?",
+                (time.time() - retention_hours * 3600,)
+            )
+            return cursor.rowcount
+
+    def stats(self):
+        """Get queue depth, failures and delivery latency (detection to send) over the last hour"""
+        now = time.time()
+        cursor = get_connection().cursor()
+        cursor.execute('''
+            SELECT COUNT(*), MIN(detected_at) FROM notifications WHERE status = 'pending'
+        ''')
+        pending, oldest = cursor.fetchone()
+        cursor.execute("SELECT COUNT(*) FROM notifications WHERE status = 'failed'")
+        failed = cursor.fetchone()[0]
+        cursor.execute('''
+            SELECT sent_at - detected_at FROM notifications
+            WHERE status = 'sent' AND sent_at >= ?
+            ORDER BY sent_at DESC LIMIT 1000
+        ''', (now - 3600,))
+        latencies = sorted(row[0] for row in cursor.fetchall())
+        return {
+            'pending': pending,
+            'failed': failed,
+            'oldest_pending_seconds': round(now - oldest, 1) if oldest else 0.0,
+            'sent_last_hour': len(latencies),
+            'latency_p50_seconds': round(latencies[len(latencies) // 2], 2) if latencies else None,
+            'latency_p95_seconds': round(latencies[int(len(latencies) * 0.95)], 2) if latencies else None
+        }
+
+class TokenBucket:
+    """Paces sends to one channel; a 429 empties the bucket for the time Discord asks"""
+
+    def __init__(self, rate=NOTIFY_RATE_PER_SECOND, capacity=NOTIFY_BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                await asyncio.sleep(self.blocked_until - now)
+                continue
+            self.refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds):
+        self.refill()
+        self.tokens = 0.0
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+class DiscordNotifier:
+    """Delivers queued notifications separately from the check pipeline
+
+    Up to NOTIFY_BATCH_SIZE embeds go out per message. Transient errors retry with exponential
+    backoff, and rate limits pause the channel's bucket. Delivery is at-least-once: a crash
+    between sending and marking a notification sent repeats it after restart.
+    """
+
+    def __init__(self, build_embed, queue=None):
+        self.build_embed = build_embed  # notification dict -> discord.Embed
+        self.queue = queue or NotificationQueue()
+        self.channel = None
+        self.buckets = {}  # channel id -> TokenBucket
+        self.task = None
+        self.last_prune = 0.0
+        self.sent = 0
+        self.messages = 0
+        self.retried = 0
+        self.failed = 0
+        self.rate_limited = 0
+        self.recent_latencies = deque(maxlen=500)
+
+    def start(self, channel):
+        """Deliver to `channel`; safe to call again on reconnect"""
+        self.channel = channel
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def bucket(self, channel_id):
+        if channel_id not in self.buckets:
+            self.buckets[channel_id] = TokenBucket()
+        return self.buckets[channel_id]
+
+    async def run(self):
+        """Drain due notifications until cancelled"""
+        loop = asyncio.get_running_loop()
+        logger.info(f"Notifier started for channel {self.channel}")
+        while True:
+            try:
+                if time.time() - self.last_prune > 3600:
+                    self.last_prune = time.time()
+                    await loop.run_in_executor(None, self.queue.prune)
+
+                items = await loop.run_in_executor(None, self.queue.due, NOTIFY_BATCH_SIZE * 5)
+                if not items:
+                    await asyncio.sleep(NOTIFY_POLL_INTERVAL)
+                    continue
+
+                for batch in self.pack(items):
+                    await self.deliver(batch)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Notifier loop error: {e}")
+                await asyncio.sleep(NOTIFY_POLL_INTERVAL)
+
+    def pack(self, items):
+        """Group (notification, embed) pairs into messages within Discord's embed count and size limits"""
+        batches = []
+        batch = []
+        size = 0
+        for item in items:
+            embed = self.build_embed(item)
+            if batch and (len(batch) >= NOTIFY_BATCH_SIZE or size + len(embed) > MAX_EMBED_CHARS):
+                batches.append(batch)
+                batch = []
+                size = 0
+            batch.append((item, embed))
+            size += len(embed)
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def backoff(self, attempts):
+        delay = min(NOTIFY_RETRY_MAX_DELAY, NOTIFY_RETRY_BASE_DELAY * 2 ** attempts)
+        return delay * random.uniform(0.5, 1.0)
+
+    async def send(self, embeds):
+        """Send one message, timing the request by outcome"""
+        outcome = 'sent'
+        started = time.perf_counter()
+        try:
+            await self.channel.send(embeds=embeds)
+        except discord.RateLimited:
+            outcome = 'rate_limited'
+            raise
+        except discord.HTTPException as e:
+            outcome = f'http_{e.status}'
+            raise
+        except Exception:
+            outcome = 'error'
+            raise
+        finally:
+            metrics.observe('discord_send_seconds', time.perf_counter() - started, outcome=outcome)
+
+    async def deliver(self, batch):
+        """Send one message and record the outcome of every notification in it"""
+        loop = asyncio.get_running_loop()
+        ids = [item['id'] for item, _ in batch]
+        bucket = self.bucket(self.channel.id)
+        await bucket.acquire()
+
+        try:
+            await self.send([embed for _, embed in batch])
+
+        except discord.RateLimited as e:
+            # Raised instead of waiting when Discord asks for a long pause; not the items' fault
+            self.rate_limited += 1
+            bucket.pause(e.retry_after)
+            logger.warning(f"Notifications rate limited for {e.retry_after:.1f}s; {len(ids)} requeued")
+            await loop.run_in_executor(None, self.queue.retry, ids, str(e), e.retry_after, False)
+
+        except discord.HTTPException as e:
+            if e.status == 429 or e.status >= 500:
+                self.retried += len(ids)
+                delay = self.backoff(max(item['attempts'] for item, _ in batch))
+                logger.warning(f"Discord returned {e.status} for {len(ids)} notifications; retrying in {delay:.0f}s")
+                await loop.run_in_executor(None, self.queue.retry, ids, str(e), delay)
+            elif len(batch) > 1:
+                # One rejected embed fails the whole message; find it by sending the rest one by one
+                for entry in batch:
+                    await self.deliver([entry])
+            else:
+                self.failed += 1
+                logger.error(f"Discord rejected notification {ids[0]}: {e}")
+                await loop.run_in_executor(None, self.queue.fail, ids, str(e))
+
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+            self.retried += len(ids)
+            delay = self.backoff(max(item['attempts'] for item, _ in batch))
+            logger.warning(f"Failed to send {len(ids)} notifications ({e}); retrying in {delay:.0f}s")
+            await loop.run_in_executor(None, self.queue.retry, ids, str(e) or type(e).__name__, delay)
+
+        else:
+            now = time.time()
+            self.sent += len(ids)
+            self.messages += 1
+            self.recent_latencies.extend(now - item['detected_at'] for item, _ in batch)
+            for item, _ in batch:
+                metrics.observe('notification_delivery_seconds', now - item['detected_at'],
+                                platform=item['platform'], target=item['url'])
+            await loop.run_in_executor(None, self.queue.mark_sent, ids)
+            logger.info(f"Sent {len(ids)} new post notifications in one message")
+
+    def stats(self):
+        """Get delivery counters and recent latency from this process"""
+        latencies = sorted(self.recent_latencies)
+        return {
+            'sent': self.sent,
+            'messages': self.messages,
+            'retried': self.retried,
+            'failed': self.failed,
+            'rate_limited': self.rate_limited,
+            'latency_p50_seconds': round(latencies[len(latencies) // 2], 2) if latencies else None,
+            'latency_max_seconds': round(latencies[-1], 2) if latencies else None
+        }
@@ -0,0 +1,134 @@
+"""
+Adaptive per-target polling scheduler driven by each account's posting history
+"""
+import logging
+import random
+import statistics
+import threading
+import time
+from datetime import datetime, timezone
+from config import (
+    SCRAPING_INTERVAL, POLL_MIN_INTERVAL, POLL_MAX_INTERVAL,
+    POLL_JITTER, POLL_RATE_DIVISOR, POLL_HISTORY_SIZE
+)
+from database import (
+    get_recent_post_times, get_recent_post_times_by_target, register_targets, claim_due_targets,
+    set_next_check_times, get_poll_interval_overrides
+)
+
+logger = logging.getLogger(__name__)
+
+def parse_timestamp(value):
+    """Parse a SQLite CURRENT_TIMESTAMP value (UTC)"""
+    try:
+        return datetime.fromisoformat(str(value))
+    except (TypeError, ValueError):
+        return None
+
+class AdaptivePollScheduler:
+    """Polls active accounts more often and backs off on dormant ones within min/max bounds"""
+
+    def __init__(self, min_interval=POLL_MIN_INTERVAL, max_interval=POLL_MAX_INTERVAL,
+                 default_interval=SCRAPING_INTERVAL, jitter=POLL_JITTER,
+                 rate_divisor=POLL_RATE_DIVISOR, history_size=POLL_HISTORY_SIZE):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.default_interval = default_interval
+        self.jitter = jitter
+        self.rate_divisor = rate_divisor
+        self.history_size = history_size
+        self.intervals = {}  # (platform, url) -> last computed base interval (seconds)
+        self.in_flight = set()
+        # Claims and reschedules run in executor threads, off the bot's event loop
+        self.lock = threading.Lock()
+
+    def clamp(self, interval):
+        """Keep an interval within the configured bounds"""
+        return max(self.min_interval, min(self.max_interval, interval))
+
+    def compute_interval(self, platform, url, override=None, history=None):
+        """Estimate how often a target should be polled from its post history
+
+        `history` is the target's recent post times if already fetched, newest first.
+        """
+        if override:
+            return override  # Per-target fixed interval from the registry
+
+        if history is None:
+            history = get_recent_post_times(platform, url, self.history_size)
+        created = [parse_timestamp(value) for value in history]
+        created = sorted(ts for ts in created if ts is not None)
+        if len(created) < 2:
+            return self.clamp(self.default_interval)
+
+        gaps = [(later - earlier).total_seconds() for earlier, later in zip(created, created[1:])]
+        expected_gap = statistics.median(gaps)
+
+        # An account that has been quiet for longer than usual is treated as slowing down
+        since_last = (datetime.now(timezone.utc).replace(tzinfo=None) - created[-1]).total_seconds()
+        expected_gap = max(expected_gap, since_last)
+
+        return self.clamp(expected_gap / self.rate_divisor)
+
+    def with_jitter(self, interval):
+        """Spread checks across the interval so targets do not fire together"""
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def register(self, targets):
+        """Add targets to the registry, staggering first checks over the minimum interval"""
+        return register_targets(targets, first_check_spread=self.min_interval)
+
+    def due_targets(self, limit=None):
+        """Claim targets whose next check time has passed (one indexed query)"""
+        now = time.time()
+        # Claimed targets are pushed out while they run; reschedule sets the real next check
+        due = claim_due_targets(now, now + self.max_interval, limit)
+        with self.lock:
+            due = [target for target in due if target not in self.in_flight]
+            self.in_flight.update(due)
+        return due
+
+    def claim(self, targets):
+        """Claim targets for an out-of-band check (e.g. !check), skipping in-flight ones"""
+        with self.lock:
+            targets = [target for target in targets if target not in self.in_flight]
+            self.in_flight.update(targets)
+        return targets
+
+    def reschedule(self, targets):
+        """Schedule the next check of targets that have just been checked"""
+        targets = list(targets)
+        overrides = get_poll_interval_overrides()
+        # Post history of every target without a fixed interval, in one query per batch
+        history = get_recent_post_times_by_target(
+            [target for target in targets if not overrides.get(target)], self.history_size
+        )
+        now = time.time()
+        schedule = []
+        intervals = {}
+        for platform, url in targets:
+            target = (platform, url)
+            try:
+                interval = self.compute_interval(platform, url, overrides.get(target), history.get(target, []))
+            except Exception as e:
+                logger.error(f"Failed to compute poll interval for {platform}: {e}")
+                interval = self.clamp(self.default_interval)
+
+            intervals[target] = interval
+            schedule.append((now + self.with_jitter(interval), platform, url))
+
+        set_next_check_times(schedule)
+        with self.lock:
+            self.intervals.update(intervals)
+            self.in_flight.difference_update(targets)
+
+    def stats(self):
+        """Get the current base interval per target and projected checks per day"""
+        with self.lock:
+            intervals = dict(self.intervals)
+        per_target = {f"{platform} {url}": round(interval) for (platform, url), interval in intervals.items()}
+        checks_per_day = sum(86400 / interval for interval in intervals.values())
+        return {
+            'intervals': per_target,
+            'checks_per_day': round(checks_per_day)
+        }
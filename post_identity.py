@@ -0,0 +1,187 @@
+"""
+Stable post identity: real platform post ids where the page exposes them, otherwise a
+timestamp-free fingerprint of the normalized post text
+"""
+import hashlib
+import logging
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from config import SEEN_POSTS_PER_TARGET, SEEN_CACHE_TARGETS
+from database import get_seen_post_ids
+
+logger = logging.getLogger(__name__)
+
+# Post ids in permalinks, URNs and data attributes, per platform (first match wins)
+POST_ID_PATTERNS = {
+    'X': [re.compile(r'/status(?:es)?/(\d+)')],
+    'TikTok': [re.compile(r'/(?:video|photo)/(\d+)')],
+    'LinkedIn': [
+        re.compile(r'urn:li:(?:activity|share|ugcPost):(\d+)'),
+        re.compile(r'/feed/update/urn:li:\w+:(\d+)'),
+        re.compile(r'-activity-(\d+)-')
+    ],
+    'Facebook': [
+        re.compile(r'story_fbid=(\w+)'),
+        re.compile(r'/posts/([\w.]+)'),
+        re.compile(r'/permalink/(\d+)'),
+        re.compile(r'/videos/(\d+)'),
+        re.compile(r'[?&]fbid=(\d+)')
+    ]
+}
+
+# Text that changes while the post stays the same: relative times ("3h", "2 days ago"), edit
+# markers and engagement counters ("1.2k likes"). Other numbers (dates, prices, versions) are
+# part of the post, so "5m" glued to a currency sign or a word ("$5m", "v5m") is not a time.
+VOLATILE_TEXT = re.compile(
+    r'(?<![\w$€£¥.,])\d+(?:mo|[smhdwy])\b(?:\s+ago)?'
+    r'|\b\d+\s*(?:secs?|mins?|hrs?|seconds?|minutes?|hours?|days?|weeks?|months?|years?)\b(?:\s+ago)?'
+    r'|\b(?:just now|edited|yesterday)\b'
+    r'|\b\d[\d,.]*\s*[kmb]?\s*(?:likes?|comments?|shares?|reposts?|retweets?|views?|reactions?|replies|reply'
+    r'|followers?|plays?|quotes?|bookmarks?)\b',
+    re.IGNORECASE
+)
+
+# Punctuation differs between renderings (curly quotes, bullets, emoji separators)
+PUNCTUATION = re.compile(r'[^\w\s]')
+
+LEGACY_POST_ID = re.compile(r'[0-9a-f]{10}')
+
+def extract_post_id(platform, *sources):
+    """Find a real post id for `platform` in URLs or attribute values, or None"""
+    for pattern in POST_ID_PATTERNS.get(platform, []):
+        for source in sources:
+            if source:
+                match = pattern.search(source)
+                if match:
+                    return match.group(1)
+    return None
+
+def normalize_text(text):
+    """Fold case, compatibility forms, punctuation and whitespace, and drop times and counters"""
+    text = unicodedata.normalize('NFKC', text or '').casefold()
+    text = VOLATILE_TEXT.sub(' ', text)
+    text = PUNCTUATION.sub(' ', text)
+    return ' '.join(text.split())
+
+def content_fingerprint(text):
+    """Fingerprint of normalized text; identical for the same post on any day or hour"""
+    digest = hashlib.blake2b(normalize_text(text).encode('utf-8'), digest_size=8).hexdigest()
+    return f'fp-{digest}'
+
+def post_identity(platform, content, *sources):
+    """Identity for a scraped post: its platform id if any source carries one, else a fingerprint"""
+    return extract_post_id(platform, *sources) or content_fingerprint(content)
+
+def build_posts_result(items):
+    """Scrape result for the top posts of a page, newest first
+
+    The first post's fields stay at the top level for callers that only need the latest post;
+    `posts` carries every distinct post found. None when the page showed no posts.
+    """
+    posts = []
+    ids = set()
+    for item in items:
+        if item['post_id'] not in ids:
+            ids.add(item['post_id'])
+            posts.append(item)
+    if not posts:
+        return None
+    return dict(posts[0], posts=posts)
+
+def is_legacy_post_id(post_id):
+    """Ids written before stable identities (date- or hour-salted md5 prefixes)"""
+    return bool(post_id) and LEGACY_POST_ID.fullmatch(post_id) is not None
+
+class SeenPostCache:
+    """Bounded LRU of recently seen post identities per target, backed by the seen_posts table
+
+    Keeps a post that drops off the top of a feed and comes back (pinned posts, reordering,
+    A/B layouts) from being announced twice. Targets are loaded from the database on first use.
+    """
+
+    def __init__(self, per_target=SEEN_POSTS_PER_TARGET, max_targets=SEEN_CACHE_TARGETS):
+        self.per_target = per_target
+        self.max_targets = max_targets
+        self.targets = OrderedDict()  # (platform, url) -> OrderedDict of identities
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, platform, url):
+        key = (platform, url)
+        with self.lock:
+            seen = self.targets.get(key)
+            if seen is not None:
+                self.targets.move_to_end(key)
+                return seen
+
+        # Newest first from the database; the cache keeps oldest-to-newest order
+        identities = get_seen_post_ids(platform, url, self.per_target)
+        seen = OrderedDict((identity, None) for identity in reversed(identities))
+        with self.lock:
+            seen = self.targets.setdefault(key, seen)
+            self.targets.move_to_end(key)
+            while len(self.targets) > self.max_targets:
+                self.targets.popitem(last=False)
+        return seen
+
+    def seen(self, platform, url, identity):
+        """True if the target has shown this post before"""
+        seen = self.load(platform, url)
+        with self.lock:
+            if identity in seen:
+                seen.move_to_end(identity)
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def add(self, platform, url, identity):
+        """Remember a post in memory; the status write persists it to seen_posts"""
+        seen = self.load(platform, url)
+        with self.lock:
+            seen[identity] = None
+            seen.move_to_end(identity)
+            while len(seen) > self.per_target:
+                seen.popitem(last=False)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'targets': len(self.targets),
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+seen_posts = SeenPostCache()
+
+def diff_new_posts(platform, url, post_data, last_post_id, rebaseline=False, cache=seen_posts):
+    """Posts on the page that the target has not shown before, oldest first
+
+    Every post that is neither the last stored post nor in the seen set is announced, wherever
+    it sits on the page (a pinned post may stay on top of newer ones). Without a stored post
+    (None, or the empty id older failed checks wrote), only the latest one is announced. A
+    target still on legacy ids, or one whose ids come from a different source than last time
+    (`rebaseline`), is re-baselined silently unless the page shows a post already seen. Every
+    post on the page is remembered as seen.
+    """
+    posts = (post_data.get('posts') or [post_data]) if post_data else []
+    seen = [post['post_id'] == last_post_id or cache.seen(platform, url, post['post_id']) for post in posts]
+
+    if not posts:
+        new_posts = []
+    elif not last_post_id:
+        new_posts = [posts[0]]
+    elif True in seen:
+        new_posts = [post for post, known in zip(posts, seen) if not known]
+    elif rebaseline or is_legacy_post_id(last_post_id):
+        # The stored id is not comparable with this page's ids, so a changed id says nothing new
+        new_posts = []
+    else:
+        new_posts = posts
+
+    for post in reversed(posts):
+        cache.add(platform, url, post['post_id'])
+    return new_posts[::-1]
@@ -0,0 +1,125 @@
+"""
+Request interception that blocks images, media, fonts and trackers in Playwright contexts
+"""
+import logging
+import threading
+from config import (
+    RESOURCE_BLOCKING_ENABLED, BLOCKED_RESOURCE_TYPES,
+    BLOCKED_URL_PATTERNS, RESOURCE_ALLOWLIST
+)
+
+logger = logging.getLogger(__name__)
+
+# Typical transfer sizes used to estimate bytes saved (aborted requests never report a size)
+ESTIMATED_BYTES = {
+    'image': 40 * 1024,
+    'media': 500 * 1024,
+    'font': 30 * 1024,
+    'stylesheet': 20 * 1024,
+    'script': 60 * 1024,
+    'xhr': 5 * 1024,
+    'fetch': 5 * 1024
+}
+DEFAULT_ESTIMATED_BYTES = 10 * 1024
+
+class ResourceBlocker:
+    """Aborts requests by resource type and URL pattern, honoring a per-platform allowlist"""
+
+    def __init__(self, enabled=RESOURCE_BLOCKING_ENABLED, blocked_types=BLOCKED_RESOURCE_TYPES,
+                 blocked_patterns=BLOCKED_URL_PATTERNS, allowlist=RESOURCE_ALLOWLIST):
+        self.enabled = enabled
+        self.blocked_types = set(blocked_types)
+        self.blocked_patterns = list(blocked_patterns)
+        self.allowlist = {platform.lower(): list(patterns) for platform, patterns in allowlist.items()}
+        self.lock = threading.Lock()
+        self.page_stats = {}  # id(page) -> counters for the current lease
+        self.totals = {}  # platform key -> cumulative counters
+
+    def get_allowlist(self, key):
+        """Allowed URL patterns for a pool key ('shared' allows every platform's list)"""
+        if key in self.allowlist:
+            return self.allowlist[key]
+        if key == 'shared':
+            return [pattern for patterns in self.allowlist.values() for pattern in patterns]
+        return []
+
+    def should_block(self, key, resource_type, url):
+        """Decide whether a request should be aborted"""
+        if resource_type in self.blocked_types:
+            return True
+        if any(pattern in url for pattern in self.get_allowlist(key)):
+            return False
+        return any(pattern in url for pattern in self.blocked_patterns)
+
+    def get_totals(self, key):
+        """Cumulative counters for a platform key (caller holds the lock)"""
+        return self.totals.setdefault(key, {
+            'pages': 0,
+            'blocked_requests': 0,
+            'allowed_requests': 0,
+            'estimated_bytes_saved': 0
+        })
+
+    def record(self, page, key, resource_type, blocked):
+        """Count a request against the page's current lease
+
+        Requests without a page (service workers) have no lease to end, so they go straight
+        into the context's platform totals.
+        """
+        with self.lock:
+            if page is None:
+                stats = self.get_totals(key)
+            else:
+                stats = self.page_stats.setdefault(id(page), {
+                    'blocked_requests': 0,
+                    'allowed_requests': 0,
+                    'estimated_bytes_saved': 0
+                })
+            if blocked:
+                stats['blocked_requests'] += 1
+                stats['estimated_bytes_saved'] += ESTIMATED_BYTES.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+            else:
+                stats['allowed_requests'] += 1
+
+    async def install(self, context, key):
+        """Route every request in a browser context through the blocker"""
+        if not self.enabled:
+            return
+
+        async def handle_route(route):
+            request = route.request
+            blocked = self.should_block(key, request.resource_type, request.url)
+            try:
+                page = request.frame.page
+            except Exception:
+                page = None  # Service worker requests have no page
+            self.record(page, key, request.resource_type, blocked)
+            if blocked:
+                await route.abort()
+            else:
+                await route.continue_()
+
+        await context.route('**/*', handle_route)
+
+    def finish_page(self, page, key):
+        """Report and reset a page's counters when its lease ends"""
+        with self.lock:
+            stats = self.page_stats.pop(id(page), None)
+            if not stats:
+                return None
+            totals = self.get_totals(key)
+            totals['pages'] += 1
+            for name, value in stats.items():
+                totals[name] += value
+
+        logger.info(
+            f"{key} page blocked {stats['blocked_requests']} of "
+            f"{stats['blocked_requests'] + stats['allowed_requests']} requests "
+            f"(~{stats['estimated_bytes_saved'] // 1024} KB saved)"
+        )
+        return stats
+
+    def stats(self):
+        """Get cumulative blocking counters per platform key"""
+        with self.lock:
+            return {key: dict(totals) for key, totals in self.totals.items()}
@@ -3,18 +3,51 @@ Social media scraper using Playwright for dynamic content
 """
 import asyncio
 import logging
-from datetime import datetime
-from playwright.async_api import async_playwright
-from config import USER_AGENT, REQUEST_TIMEOUT
-import hashlib
-import re
+import statistics
+import time
+from collections import deque
+from playwright.async_api import async_playwright, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+from config import USER_AGENT, REQUEST_TIMEOUT, SCRAPE_POSTS_PER_PAGE
+from browser_pool import BrowserContextPool
+from resource_blocking import ResourceBlocker
+from post_identity import post_identity, build_posts_result
+from metrics import metrics
+from circuit_breaker import breakers
 
 logger = logging.getLogger(__name__)
 
+# Post selectors per platform (tried in order) and the old fixed sleep, now the bound on waiting for them
+READINESS_STRATEGIES = {
+    'LinkedIn': {
+        'selectors': ['.feed-shared-update-v2', '[data-urn*="update"]'],
+        'max_wait': 3000
+    },
+    'TikTok': {
+        'selectors': ['[data-e2e="user-post-item"]', 'div[class*="video"]'],
+        'max_wait': 5000
+    },
+    'Facebook': {
+        'selectors': ['[role="article"]', 'div[data-pagelet*="FeedUnit"]'],
+        'max_wait': 4000
+    },
+    'X': {
+        'selectors': ['[data-testid="tweet"]'],
+        'max_wait': 4000
+    }
+}
+
+DOM_STABLE_POLL_MS = 250
+DOM_STABLE_POLLS = 4  # Element count unchanged for this many polls counts as settled
+READY_FALLBACK_WAIT_MS = 1000  # Part of max_wait kept for the fallbacks (network idle, then stable DOM)
+
 class SocialMediaScraper:
     def __init__(self):
         self.browser = None
-        self.context = None
+        self.pool = None
+        self.init_lock = asyncio.Lock()
+        self.blocker = ResourceBlocker()
+        self.ready_times = {}  # platform -> recent time-to-first-post samples (ms)
+        self.ready_outcomes = {}  # platform -> {'selector': n, 'network_idle': n, ...}
 
     async def init_browser(self):
         """Initialize Playwright browser"""
@@ -33,9 +66,16 @@ class SocialMediaScraper:
                     headless=True,
                     args=['--no-sandbox', '--disable-blink-features=AutomationControlled', '--disable-dev-shm-usage']
                 )
-            self.context = await self.browser.new_context(
-                user_agent=USER_AGENT,
-                viewport={'width': 1920, 'height': 1080}
+            # Contexts are opened lazily per platform and shared through the pool
+            # Every context blocks images, media, fonts and trackers before any page loads
+            self.pool = BrowserContextPool(
+                self.browser,
+                context_options={
+                    'user_agent': USER_AGENT,
+                    'viewport': {'width': 1920, 'height': 1080}
+                },
+                on_context_created=self.blocker.install,
+                on_page_released=self.blocker.finish_page
             )
             logger.info("Browser initialized successfully")
         except Exception as e:
@@ -45,8 +85,8 @@ class SocialMediaScraper:
     async def close_browser(self):
         """Close browser and cleanup"""
         try:
-            if self.context:
-                await self.context.close()
+            if self.pool:
+                await self.pool.close()
             if self.browser:
                 await self.browser.close()
             if hasattr(self, 'playwright'):
@@ -55,211 +95,296 @@ class SocialMediaScraper:
         except Exception as e:
             logger.error(f"Error closing browser: {e}")
 
+    async def wait_for_dom_stable(self, page):
+        """Wait until the page's element count stops changing"""
+        last_count = -1
+        stable_polls = 0
+        while stable_polls < DOM_STABLE_POLLS:
+            await asyncio.sleep(DOM_STABLE_POLL_MS / 1000)
+            count = await page.evaluate('document.getElementsByTagName("*").length')
+            stable_polls = stable_polls + 1 if count == last_count else 0
+            last_count = count
+
+    async def ready_step(self, waiter):
+        """Await one readiness wait; False when it timed out or failed"""
+        try:
+            await waiter
+            return True
+        except Exception:
+            return False
+
+    async def wait_until_ready(self, page, platform):
+        """Wait for the first post selector; only if it times out (or the platform has none),
+        fall back to network idle and then to a stable DOM
+
+        All steps share the platform's max_wait (the old fixed sleep): the selector may use all
+        but READY_FALLBACK_WAIT_MS of it, network idle half of what is left and the stable DOM
+        check the rest.
+        """
+        strategy = READINESS_STRATEGIES[platform]
+        selectors = strategy.get('selectors')
+        max_wait = strategy['max_wait']
+        started = time.perf_counter()
+
+        def remaining_ms():
+            return max_wait - (time.perf_counter() - started) * 1000
+
+        selector_wait = max_wait - min(READY_FALLBACK_WAIT_MS, max_wait / 2)
+        # Playwright treats a zero timeout as "no timeout", so a spent budget skips the step
+        if selectors and await self.ready_step(page.wait_for_selector(
+                ', '.join(selectors), state='attached', timeout=selector_wait)):
+            outcome = 'selector'
+        elif remaining_ms() > 0 and await self.ready_step(
+                page.wait_for_load_state('networkidle', timeout=remaining_ms() / 2)):
+            outcome = 'network_idle'
+        elif remaining_ms() > 0 and await self.ready_step(
+                asyncio.wait_for(self.wait_for_dom_stable(page), remaining_ms() / 1000)):
+            outcome = 'dom_stable'
+        else:
+            outcome = 'timeout'
+
+        self.record_ready_time(platform, (time.perf_counter() - started) * 1000, outcome)
+        return outcome
+
+    def record_ready_time(self, platform, elapsed_ms, outcome):
+        """Record time-to-first-post for a platform"""
+        self.ready_times.setdefault(platform, deque(maxlen=100)).append(elapsed_ms)
+        outcomes = self.ready_outcomes.setdefault(platform, {})
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        logger.info(f"{platform} ready after {elapsed_ms:.0f}ms ({outcome})")
+
+    def readiness_stats(self):
+        """Get median time-to-first-post and readiness outcomes per platform"""
+        return {
+            platform: {
+                'median_ms': round(statistics.median(samples), 1),
+                'samples': len(samples),
+                'outcomes': dict(self.ready_outcomes.get(platform, {}))
+            }
+            for platform, samples in self.ready_times.items() if samples
+        }
+
+    def stage_timer(self, platform, url, stage):
+        """Time one step of a browser scrape into the check stage histogram"""
+        return metrics.timer('check_stage_seconds', platform=platform, target=url, stage=stage)
+
+    async def navigate(self, page, platform, url):
+        """Open a target page, recording the host's answer (or silence) in its circuit breaker"""
+        with self.stage_timer(platform, url, 'navigate'):
+            try:
+                response = await page.goto(url, timeout=REQUEST_TIMEOUT)
+            except PlaywrightError as e:
+                # Timeouts and network errors (Chromium net::ERR_*, Firefox NS_ERROR_*) are the
+                # host's; anything else is ours
+                message = str(e).split('\n', 1)[0]
+                if isinstance(e, PlaywrightTimeoutError) or 'net::ERR_' in message or 'NS_ERROR_' in message:
+                    breakers.record_failure(url, message)
+                raise
+        if response is not None:
+            breakers.record_response(url, response.status)
+        return response
+
+    async def extract_linkedin_post(self, post, url):
+        """Read one LinkedIn feed item"""
+        # Extract post content
+        content_elem = await post.query_selector('.feed-shared-text')
+        content = ''
+        if content_elem:
+            content = await content_elem.text_content()
+
+        # The activity URN is the post's real id; the text fingerprint is the fallback
+        urn = await post.get_attribute('data-urn')
+        post_id = post_identity('LinkedIn', content, urn)
+
+        return {
+            'post_id': post_id,
+            'content': content.strip()[:200] if content else 'LinkedIn post found',
+            'url': url
+        }
+
     async def scrape_linkedin(self, url):
         """Scrape LinkedIn company page"""
-        page = None
         try:
-            if not self.context:
+            if not self.pool:
                 raise Exception("Browser context not initialized")
                 
-            page = await self.context.new_page()
-            await page.goto(url, timeout=REQUEST_TIMEOUT)
-            await page.wait_for_timeout(3000)  # Wait for content to load
-            
-            # Try to find recent posts
-            posts = await page.query_selector_all('.feed-shared-update-v2')
-            
-            if not posts:
-                # Alternative selectors for LinkedIn posts
-                posts = await page.query_selector_all('[data-urn*="update"]')
-            
-            if posts:
-                first_post = posts[0]
-                
-                # Extract post content
-                content_elem = await first_post.query_selector('.feed-shared-text')
-                content = ''
-                if content_elem:
-                    content = await content_elem.text_content()
-                
-                # Create a unique identifier
-                content_str = content or ""
-                post_id = hashlib.md5((content_str + str(datetime.now().date())).encode()).hexdigest()[:10]
-                
-                await page.close()
-                return {
-                    'post_id': post_id,
-                    'content': content.strip()[:200] if content else 'LinkedIn post found',
-                    'url': url
-                }
-            
-            await page.close()
-            return None
-            
+            async with self.pool.lease('LinkedIn') as page:
+                await self.navigate(page, 'LinkedIn', url)
+                with self.stage_timer('LinkedIn', url, 'ready'):
+                    await self.wait_until_ready(page, 'LinkedIn')
+
+                with self.stage_timer('LinkedIn', url, 'extract'):
+                    # Try to find recent posts
+                    posts = await page.query_selector_all('.feed-shared-update-v2')
+
+                    if not posts:
+                        # Alternative selectors for LinkedIn posts
+                        posts = await page.query_selector_all('[data-urn*="update"]')
+
+                    return build_posts_result(
+                        [await self.extract_linkedin_post(post, url) for post in posts[:SCRAPE_POSTS_PER_PAGE]]
+                    )
+
         except Exception as e:
             logger.error(f"LinkedIn scraping error: {e}")
-            if page:
-                await page.close()
             raise
 
+    async def extract_tiktok_post(self, video, url):
+        """Read one TikTok profile grid item"""
+        # Try to get video link
+        link_elem = await video.query_selector('a')
+        video_url = url
+        if link_elem:
+            href = await link_elem.get_attribute('href')
+            if href:
+                video_url = href if href.startswith('http') else f'https://www.tiktok.com{href}'
+
+        # The video id from the link, or a fingerprint of the link itself
+        post_id = post_identity('TikTok', video_url, video_url)
+
+        return {
+            'post_id': post_id,
+            'content': 'New TikTok video available',
+            'url': video_url
+        }
+
     async def scrape_tiktok(self, url):
         """Scrape TikTok profile page"""
-        page = None
         try:
-            if not self.context:
+            if not self.pool:
                 raise Exception("Browser context not initialized")
                 
-            page = await self.context.new_page()
-            await page.goto(url, timeout=REQUEST_TIMEOUT)
-            await page.wait_for_timeout(5000)  # TikTok needs more time to load
-            
-            # Look for video elements
-            videos = await page.query_selector_all('[data-e2e="user-post-item"]')
-            
-            if not videos:
-                # Alternative selector
-                videos = await page.query_selector_all('div[class*="video"]')
-            
-            if videos:
-                first_video = videos[0]
-                
-                # Try to get video link
-                link_elem = await first_video.query_selector('a')
-                video_url = url
-                if link_elem:
-                    href = await link_elem.get_attribute('href')
-                    if href:
-                        video_url = href if href.startswith('http') else f'https://www.tiktok.com{href}'
-                
-                # Create unique identifier based on video URL or current date
-                post_id = hashlib.md5((video_url + str(datetime.now().date())).encode()).hexdigest()[:10]
-                
-                await page.close()
-                return {
-                    'post_id': post_id,
-                    'content': 'New TikTok video available',
-                    'url': video_url
-                }
-            
-            await page.close()
-            return None
-            
+            async with self.pool.lease('TikTok') as page:
+                await self.navigate(page, 'TikTok', url)
+                with self.stage_timer('TikTok', url, 'ready'):
+                    await self.wait_until_ready(page, 'TikTok')
+
+                with self.stage_timer('TikTok', url, 'extract'):
+                    # Look for video elements
+                    videos = await page.query_selector_all('[data-e2e="user-post-item"]')
+
+                    if not videos:
+                        # Alternative selector
+                        videos = await page.query_selector_all('div[class*="video"]')
+
+                    return build_posts_result(
+                        [await self.extract_tiktok_post(video, url) for video in videos[:SCRAPE_POSTS_PER_PAGE]]
+                    )
+
         except Exception as e:
             logger.error(f"TikTok scraping error: {e}")
-            if page:
-                await page.close()
             raise
 
+    async def extract_facebook_post(self, post, url):
+        """Read one Facebook feed article"""
+        # Try to extract post text
+        text_elem = await post.query_selector('[data-ad-preview="message"]')
+        content = ''
+        if text_elem:
+            content = await text_elem.text_content()
+
+        if not content:
+            # Try alternative text selectors
+            text_elems = await post.query_selector_all('div[dir="auto"]')
+            if text_elems:
+                content = await text_elems[0].text_content()
+
+        # Permalinks carry the post id; the text fingerprint is the fallback
+        link_elem = await post.query_selector(
+            'a[href*="/posts/"], a[href*="story_fbid="], a[href*="/permalink/"], a[href*="/videos/"]'
+        )
+        post_url = await link_elem.get_attribute('href') if link_elem else None
+        post_id = post_identity('Facebook', content, post_url)
+
+        return {
+            'post_id': post_id,
+            'content': content.strip()[:200] if content else 'Facebook post found',
+            'url': url
+        }
+
     async def scrape_facebook(self, url):
         """Scrape Facebook profile page"""
-        page = None
         try:
-            if not self.context:
+            if not self.pool:
                 raise Exception("Browser context not initialized")
                 
-            page = await self.context.new_page()
-            await page.goto(url, timeout=REQUEST_TIMEOUT)
-            await page.wait_for_timeout(4000)
-            
-            # Look for posts - Facebook structure varies
-            posts = await page.query_selector_all('[role="article"]')
-            
-            if not posts:
-                # Alternative selectors
-                posts = await page.query_selector_all('div[data-pagelet*="FeedUnit"]')
-            
-            if posts:
-                first_post = posts[0]
-                
-                # Try to extract post text
-                text_elem = await first_post.query_selector('[data-ad-preview="message"]')
-                content = ''
-                if text_elem:
-                    content = await text_elem.text_content()
-                
-                if not content:
-                    # Try alternative text selectors
-                    text_elems = await first_post.query_selector_all('div[dir="auto"]')
-                    if text_elems:
-                        content = await text_elems[0].text_content()
-                
-                # Create unique identifier
-                content_str = content or ""
-                post_id = hashlib.md5((content_str + str(datetime.now().date())).encode()).hexdigest()[:10]
-                
-                await page.close()
-                return {
-                    'post_id': post_id,
-                    'content': content.strip()[:200] if content else 'Facebook post found',
-                    'url': url
-                }
-            
-            await page.close()  
-            return None
-            
+            async with self.pool.lease('Facebook') as page:
+                await self.navigate(page, 'Facebook', url)
+                with self.stage_timer('Facebook', url, 'ready'):
+                    await self.wait_until_ready(page, 'Facebook')
+
+                with self.stage_timer('Facebook', url, 'extract'):
+                    # Look for posts - Facebook structure varies
+                    posts = await page.query_selector_all('[role="article"]')
+
+                    if not posts:
+                        # Alternative selectors
+                        posts = await page.query_selector_all('div[data-pagelet*="FeedUnit"]')
+
+                    return build_posts_result(
+                        [await self.extract_facebook_post(post, url) for post in posts[:SCRAPE_POSTS_PER_PAGE]]
+                    )
+
         except Exception as e:
             logger.error(f"Facebook scraping error: {e}")
-            if page:
-                await page.close()
             raise
 
+    async def extract_tweet(self, tweet, url):
+        """Read one tweet from a profile timeline"""
+        # Extract tweet text
+        text_elem = await tweet.query_selector('[data-testid="tweetText"]')
+        content = ''
+        if text_elem:
+            content = await text_elem.text_content()
+
+        # Try to get tweet link
+        link_elem = await tweet.query_selector('a[href*="/status/"]')
+        tweet_url = url
+        if link_elem:
+            href = await link_elem.get_attribute('href')
+            if href:
+                tweet_url = f'https://x.com{href}' if href.startswith('/') else href
+
+        # Tweet ID from the status URL, or a fingerprint of the text
+        post_id = post_identity('X', content, tweet_url)
+
+        return {
+            'post_id': post_id,
+            'content': content.strip()[:200] if content else 'Tweet found',
+            'url': tweet_url
+        }
+
     async def scrape_twitter(self, url):
         """Scrape X (Twitter) profile page"""
-        page = None
         try:
-            if not self.context:
+            if not self.pool:
                 raise Exception("Browser context not initialized")
                 
-            page = await self.context.new_page()
-            await page.goto(url, timeout=REQUEST_TIMEOUT)
-            await page.wait_for_timeout(4000)
-            
-            # Look for tweets
-            tweets = await page.query_selector_all('[data-testid="tweet"]')
-            
-            if tweets:
-                first_tweet = tweets[0]
-                
-                # Extract tweet text
-                text_elem = await first_tweet.query_selector('[data-testid="tweetText"]')
-                content = ''
-                if text_elem:
-                    content = await text_elem.text_content()
-                
-                # Try to get tweet link
-                link_elem = await first_tweet.query_selector('a[href*="/status/"]')
-                tweet_url = url
-                if link_elem:
-                    href = await link_elem.get_attribute('href')
-                    if href:
-                        tweet_url = f'https://x.com{href}' if href.startswith('/') else href
-                
-                # Extract tweet ID from URL for unique identification
-                tweet_match = re.search(r'/status/(\d+)', tweet_url)
-                content_str = content or ""
-                post_id = tweet_match.group(1) if tweet_match else hashlib.md5((content_str + str(datetime.now().date())).encode()).hexdigest()[:10]
-                
-                await page.close()
-                return {
-                    'post_id': post_id,
-                    'content': content.strip()[:200] if content else 'Tweet found',
-                    'url': tweet_url
-                }
-            
-            await page.close()
-            return None
-            
+            async with self.pool.lease('X') as page:
+                await self.navigate(page, 'X', url)
+                with self.stage_timer('X', url, 'ready'):
+                    await self.wait_until_ready(page, 'X')
+
+                with self.stage_timer('X', url, 'extract'):
+                    # Look for tweets
+                    tweets = await page.query_selector_all('[data-testid="tweet"]')
+
+                    return build_posts_result(
+                        [await self.extract_tweet(tweet, url) for tweet in tweets[:SCRAPE_POSTS_PER_PAGE]]
+                    )
+
         except Exception as e:
             logger.error(f"Twitter scraping error: {e}")
-            if page:
-                await page.close()
             raise
 
     async def scrape_platform(self, platform, url):
         """Scrape a specific platform"""
         try:
             if not self.browser:
-                await self.init_browser()
+                # Concurrent callers share a single browser launch
+                async with self.init_lock:
+                    if not self.browser:
+                        await self.init_browser()
             
             if platform.lower() == 'linkedin':
                 return await self.scrape_linkedin(url)
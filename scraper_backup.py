@@ -1,81 +1,229 @@
 """
-Alternative web scraper using requests and BeautifulSoup
+Alternative web scraper over plain HTTP (aiohttp), with a blocking wrapper for synchronous callers
 More reliable than Playwright for basic content checking
 """
-import requests
+import asyncio
+import aiohttp
 import logging
-import hashlib
-from datetime import datetime
+import threading
 import time
-from bs4 import BeautifulSoup
+from config import HTTP_POOL_SIZE, HTTP_POOL_PER_HOST, HTTP_KEEPALIVE_TIMEOUT, HTTP_VALIDATOR_CACHE_ENABLED
+from http_cache import ValidatorCache, hash_body
+from text_extraction import extract_visible_text
+from post_identity import post_identity
+from metrics import metrics
+from circuit_breaker import breakers
 
 logger = logging.getLogger(__name__)
 
-class SimpleScraper:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.9,ar;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Cache-Control': 'max-age=0'
-        })
+REQUEST_TIMEOUT_SECONDS = 15
+LINKEDIN_DELAY_SECONDS = 2
 
-    def scrape_platform(self, platform, url):
-        """Simple scraper that just checks if page content changed"""
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9,ar;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Cache-Control': 'max-age=0'
+}
+
+def extract_page_text(html):
+    """Extract the first 1000 characters of visible page text"""
+    # Streams tokens and stops early; output is identical to the BeautifulSoup get_text() it replaced
+    return extract_visible_text(html, 1000)  # First 1000 chars
+
+def build_page_result(platform, url, text_content):
+    """Build the post record for a page's extracted text"""
+    # Only the page text is available here, so the identity is its timestamp-free fingerprint
+    return {
+        'post_id': post_identity(platform, text_content),
+        'content': f'Page content checked for {platform} - {len(text_content)} characters found',
+        'url': url
+    }
+
+def parse_body(body, encoding, known_hash=None):
+    """Hash a raw body and extract its text, skipping extraction when the hash is already known
+
+    Returns a compact (body_hash, text_content) record; text_content is None on a known hash.
+    Module-level and free of shared state so it can run in a worker process.
+    """
+    body_hash = hash_body(body)
+    if body_hash == known_hash:
+        return body_hash, None
+    return body_hash, extract_page_text(body.decode(encoding or 'utf-8', errors='replace'))
+
+def process_response(platform, url, status_code, headers, body, encoding, cache, parsed=None):
+    """Turn a fetched page into a post record (CPU-bound, safe to run in an executor)
+
+    `parsed` is a parse_body() record already computed elsewhere, e.g. by a worker process.
+    """
+    # Handle LinkedIn redirects or blocks; the scraper already counted the status against the
+    # host's circuit (see circuit_breaker.HOST_BLOCK_STATUSES)
+    if status_code in [999, 302, 403] and platform == 'LinkedIn':
+        logger.warning(f"LinkedIn blocked request (status {status_code})")
+        return None
+
+    if status_code == 304:
+        # Server confirmed our validators, reuse the text without downloading or parsing
+        text_content = cache.not_modified(url)
+        if text_content is None:
+            logger.warning(f"{platform} returned 304 without a cached copy")
+            return None
+        return build_page_result(platform, url, text_content)
+
+    if status_code == 200:
+        if parsed is None:
+            parsed = parse_body(body, encoding, cache.known_body_hash(url))
+        body_hash, text_content = parsed
+        # Servers that ignore validators still let us skip parsing an identical body
+        cached_text = cache.match_body(url, body_hash)
+        if text_content is None:
+            text_content = cached_text
+        if text_content is None:
+            # The cached entry changed after the hash was checked
+            text_content = extract_page_text(body.decode(encoding or 'utf-8', errors='replace'))
+        cache.store(url, headers.get('ETag'), headers.get('Last-Modified'), body_hash, text_content)
+        return build_page_result(platform, url, text_content)
+
+    logger.warning(f"{platform} returned status {status_code}")
+    return None
+
+def connection_trace_config():
+    """Record DNS lookups and new connections (DNS, TCP and TLS) of traced requests as check stages
+
+    Requests pass {'platform': ..., 'target': ...} as trace_request_ctx; reused keep-alive
+    connections record nothing.
+    """
+    trace_config = aiohttp.TraceConfig()
+
+    async def start(session, context, params):
+        context.started = time.perf_counter()
+
+    def end(stage):
+        async def record(session, context, params):
+            labels = context.trace_request_ctx or {}
+            metrics.observe('check_stage_seconds', time.perf_counter() - context.started, stage=stage, **labels)
+        return record
+
+    trace_config.on_dns_resolvehost_start.append(start)
+    trace_config.on_dns_resolvehost_end.append(end('dns'))
+    trace_config.on_connection_create_start.append(start)
+    trace_config.on_connection_create_end.append(end('connect'))
+    return trace_config
+
+class AsyncSimpleScraper:
+    """Event-loop friendly page scraper backed by a pooled keep-alive aiohttp session"""
+
+    def __init__(self, pool_size=HTTP_POOL_SIZE, pool_per_host=HTTP_POOL_PER_HOST,
+                 keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT, executor=None, validator_cache=None,
+                 worker_pool=None):
+        self.pool_size = pool_size
+        self.pool_per_host = pool_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.executor = executor  # None uses the loop's default thread pool
+        self.worker_pool = worker_pool  # ParseWorkerPool; None parses in the executor thread
+        self.session = None
+        self.validator_cache = validator_cache or ValidatorCache(enabled=HTTP_VALIDATOR_CACHE_ENABLED)
+
+    async def get_session(self):
+        """Create the shared HTTP session on first use"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_per_host,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            # aiohttp negotiates Accept-Encoding itself based on installed decoders
+            headers = {k: v for k, v in DEFAULT_HEADERS.items() if k != 'Accept-Encoding'}
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS),
+                trace_configs=[connection_trace_config()] if metrics.enabled else None
+            )
+        return self.session
+
+    async def scrape_platform(self, platform, url):
+        """Fetch on the event loop and parse in an executor or worker process"""
         try:
             logger.info(f"Checking {platform} at {url}")
-            
-            # Add delay and retry for LinkedIn
-            import time
+
             if platform == 'LinkedIn':
-                time.sleep(2)  # Small delay for LinkedIn
-            
-            response = self.session.get(url, timeout=15, allow_redirects=False)
-            logger.info(f"{platform} response status: {response.status_code}")
-            
-            # Handle LinkedIn redirects or blocks
-            if response.status_code in [999, 302, 403] and platform == 'LinkedIn':
-                logger.warning(f"LinkedIn blocked request (status {response.status_code}), trying alternative approach")
-                # Create a simple hash based on current time for LinkedIn when blocked
-                fallback_content = f"LinkedIn check at {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-                content_hash = hashlib.md5(fallback_content.encode()).hexdigest()[:10]
-                return {
-                    'post_id': content_hash,
-                    'content': 'LinkedIn monitoring active (access limited)',
-                    'url': url
-                }
-            
-            if response.status_code == 200:
-                # Get basic page content for comparison
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Remove script and style elements
-                for script in soup(["script", "style"]):
-                    script.decompose()
-                
-                # Get text content
-                text_content = soup.get_text()[:1000]  # First 1000 chars
-                
-                # Create unique ID based on content + timestamp for better change detection
-                timestamp = datetime.now().strftime('%Y-%m-%d-%H')  # Changes every hour
-                content_hash = hashlib.md5((text_content + timestamp).encode()).hexdigest()[:10]
-                
-                return {
-                    'post_id': content_hash,
-                    'content': f'Page content checked for {platform} - {len(text_content)} characters found',
-                    'url': url
-                }
+                await asyncio.sleep(LINKEDIN_DELAY_SECONDS)  # Small delay for LinkedIn
+
+            session = await self.get_session()
+            loop = asyncio.get_running_loop()
+            if self.validator_cache.is_loaded(url):
+                request_headers = self.validator_cache.request_headers(url)
             else:
-                logger.warning(f"{platform} returned status {response.status_code}")
-                return None
-                
+                # The first lookup of a URL reads the database; keep it off the event loop
+                request_headers = await loop.run_in_executor(self.executor, self.validator_cache.request_headers, url)
+            labels = {'platform': platform, 'target': url}
+            # Includes DNS and connect (also recorded on their own) when no idle connection is reused
+            with metrics.timer('check_stage_seconds', stage='download', **labels):
+                async with session.get(url, headers=request_headers, allow_redirects=False,
+                                       trace_request_ctx=labels) as response:
+                    body = await response.read()
+                    status_code = response.status
+                    headers = response.headers
+                    encoding = response.get_encoding() if body else None
+            logger.info(f"{platform} response status: {status_code}")
+            # Only transport and HTTP-level failures count against the host; a page without
+            # posts is the target's miss
+            breakers.record_response(url, status_code)
+
+            with metrics.timer('check_stage_seconds', stage='parse', **labels):
+                parsed = None
+                if self.worker_pool and status_code == 200:
+                    known_hash = self.validator_cache.known_body_hash(url)
+                    parsed = await self.worker_pool.run(parse_body, body, encoding, known_hash)
+
+                return await loop.run_in_executor(
+                    self.executor, process_response, platform, url, status_code,
+                    headers, body, encoding, self.validator_cache, parsed
+                )
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Error fetching {platform}: {e!r}")
+            breakers.record_failure(url, repr(e))
+            return None
         except Exception as e:
             logger.error(f"Error scraping {platform}: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    async def close(self):
+        """Close the pooled HTTP session"""
+        if self.session and not self.session.closed:
+            await self.session.close()
+
+class SimpleScraper:
+    """Blocking front end to AsyncSimpleScraper for callers without an event loop
+
+    Checks run on a private event loop in a background thread, so headers, LinkedIn handling,
+    validators and metrics are the async scraper's. Safe to call from several threads at once.
+    """
+
+    def __init__(self, validator_cache=None):
+        self.scraper = AsyncSimpleScraper(validator_cache=validator_cache)
+        self.validator_cache = self.scraper.validator_cache
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='simple-scraper', daemon=True)
+        self.thread.start()
+
+    def scrape_platform(self, platform, url):
+        """Check a page and wait for the result"""
+        return asyncio.run_coroutine_threadsafe(self.scraper.scrape_platform(platform, url), self.loop).result()
+
+    def close(self):
+        """Close the HTTP session and stop the background loop"""
+        if self.loop.is_closed():
+            return
+        asyncio.run_coroutine_threadsafe(self.scraper.close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
@@ -1,11 +1,14 @@
 // Dashboard JavaScript functionality
-let refreshInterval;
+let refreshInterval = null;
 let lastUpdateTime = null;
+let eventSource = null;
+let lastEventId = null;
+const targets = new Map();  // target_id -> latest status from /api/status or /api/stream
+const rows = new Map();     // target_id -> <tr> kept across updates
 
 // Initialize dashboard when page loads
 document.addEventListener('DOMContentLoaded', function() {
-    refreshData();
-    startAutoRefresh();
+    refreshData().then(startLiveUpdates);
     
     // Add refresh indicator
     const refreshIndicator = document.createElement('div');
@@ -14,15 +17,57 @@ document.addEventListener('DOMContentLoaded', function() {
     document.body.appendChild(refreshIndicator);
 });
 
-// Start automatic refresh every 10 seconds
+// Start automatic refresh every 10 seconds (fallback while the stream is unavailable)
 function startAutoRefresh() {
-    refreshInterval = setInterval(refreshData, 10000);
+    if (!refreshInterval) {
+        refreshInterval = setInterval(refreshData, 10000);
+    }
 }
 
 // Stop automatic refresh
 function stopAutoRefresh() {
     if (refreshInterval) {
         clearInterval(refreshInterval);
+        refreshInterval = null;
+    }
+}
+
+// Receive per-target changes from /api/stream, polling only when streaming is not possible
+function startLiveUpdates() {
+    if (!window.EventSource) {
+        startAutoRefresh();
+        return;
+    }
+    
+    stopLiveUpdates();
+    const url = lastEventId !== null ? `/api/stream?since=${lastEventId}` : '/api/stream';
+    eventSource = new EventSource(url);
+    
+    eventSource.addEventListener('open', stopAutoRefresh);
+    eventSource.addEventListener('status', event => {
+        const delta = JSON.parse(event.data);
+        lastEventId = Number(event.lastEventId);
+        delta.targets.forEach(target => patchRow(target, true));
+        delta.removed.forEach(removeRow);
+        afterUpdate();
+    });
+    eventSource.addEventListener('circuits', event => {
+        updateCircuits(JSON.parse(event.data));
+        afterUpdate();
+    });
+    // The server could not replay every change (bulk update or too far behind): reload everything
+    eventSource.addEventListener('reset', refreshData);
+    eventSource.addEventListener('error', () => {
+        // The browser reconnects with Last-Event-ID by itself; poll meanwhile so the page stays current
+        startAutoRefresh();
+    });
+}
+
+// Close the stream
+function stopLiveUpdates() {
+    if (eventSource) {
+        eventSource.close();
+        eventSource = null;
     }
 }
 
@@ -30,14 +75,13 @@ function stopAutoRefresh() {
 function refreshData() {
     showRefreshIndicator();
     
-    fetch('/api/status')
+    return fetch('/api/status')
         .then(response => response.json())
         .then(data => {
             if (data.status === 'success') {
+                lastEventId = data.last_event_id;
                 updateDashboard(data.data);
-                updateSummaryCards(data.data);
-                lastUpdateTime = new Date();
-                updateLastUpdatedTime();
+                afterUpdate();
             } else {
                 showError('Failed to load data: ' + data.message);
             }
@@ -51,11 +95,19 @@ function refreshData() {
         });
 }
 
-// Update the main status table
+// Refresh the summary cards and timestamp after any change
+function afterUpdate() {
+    updateSummaryCards(Array.from(targets.values()));
+    lastUpdateTime = new Date();
+    updateLastUpdatedTime();
+}
+
+// Bring the table in line with a full snapshot, reusing existing rows
 function updateDashboard(platforms) {
     const tableBody = document.getElementById('status-table-body');
     
     if (platforms.length === 0) {
+        clearRows();
         tableBody.innerHTML = `
             <tr>
                 <td colspan="6" class="text-center text-muted">
@@ -67,32 +119,123 @@ function updateDashboard(platforms) {
         return;
     }
     
-    tableBody.innerHTML = platforms.map(platform => {
-        const statusIcon = getStatusIcon(platform);
-        const newPostBadge = platform.has_new_post ? 
-            '<span class="badge bg-success new-post-indicator">✅ Yes</span>' : 
-            '<span class="badge bg-secondary">⭕ No</span>';
-        
-        const successRateColor = getSuccessRateColor(platform.success_rate);
-        const platformIcon = getPlatformIcon(platform.platform);
-        
-        return `
-            <tr>
-                <td>
+    const listed = new Set(platforms.map(platform => platform.target_id));
+    Array.from(targets.keys()).filter(id => !listed.has(id)).forEach(removeRow);
+    
+    // Drop placeholder rows (empty state, errors) that are not target rows
+    Array.from(tableBody.children).filter(tr => !tr.dataset.targetId).forEach(tr => tr.remove());
+    
+    platforms.forEach((platform, index) => {
+        const tr = patchRow(platform, false);
+        if (tableBody.children[index] !== tr) {
+            tableBody.insertBefore(tr, tableBody.children[index] || null);
+        }
+    });
+}
+
+// Create or update one target's row, rewriting only the cells whose content changed
+function patchRow(platform, placeNewRow) {
+    const tableBody = document.getElementById('status-table-body');
+    let tr = rows.get(platform.target_id);
+    
+    if (!tr) {
+        tr = document.createElement('tr');
+        tr.dataset.targetId = platform.target_id;
+        tr.cellHtml = [];
+        for (let i = 0; i < 6; i++) {
+            tr.appendChild(document.createElement('td'));
+        }
+        rows.set(platform.target_id, tr);
+        if (placeNewRow) {
+            Array.from(tableBody.children).filter(row => !row.dataset.targetId).forEach(row => row.remove());
+            tableBody.insertBefore(tr, findNextRow(platform));
+        }
+    }
+    
+    targets.set(platform.target_id, platform);
+    renderCells(platform).forEach((html, index) => {
+        if (tr.cellHtml[index] !== html) {
+            tr.cells[index].innerHTML = html;
+            tr.cellHtml[index] = html;
+        }
+    });
+    return tr;
+}
+
+// Rows are ordered by platform, then target id (the /api/status order)
+function findNextRow(platform) {
+    const tableBody = document.getElementById('status-table-body');
+    for (const tr of tableBody.children) {
+        const other = targets.get(Number(tr.dataset.targetId));
+        if (other && (other.platform > platform.platform ||
+            (other.platform === platform.platform && other.target_id > platform.target_id))) {
+            return tr;
+        }
+    }
+    return null;
+}
+
+// Remove a target that is no longer monitored
+function removeRow(targetId) {
+    const tr = rows.get(targetId);
+    if (tr) {
+        tr.remove();
+    }
+    rows.delete(targetId);
+    targets.delete(targetId);
+}
+
+// Forget every row (the table body is about to be replaced)
+function clearRows() {
+    rows.clear();
+    targets.clear();
+}
+
+// Apply a circuit breaker snapshot to every target on an affected host
+function updateCircuits(circuitList) {
+    const circuits = new Map(circuitList.map(circuit => [circuit.host, circuit]));
+    targets.forEach(target => {
+        target.circuit = circuits.get(getHost(target.url)) || null;
+        patchRow(target, false);
+    });
+}
+
+// Breakers are keyed by the URL's host, lowercased
+function getHost(url) {
+    try {
+        return new URL(url).host.toLowerCase();
+    } catch {
+        return '';
+    }
+}
+
+// Build the HTML for each of a row's cells
+function renderCells(platform) {
+    const statusIcon = getStatusIcon(platform);
+    const newPostBadge = platform.has_new_post ? 
+        '<span class="badge bg-success new-post-indicator">✅ Yes</span>' : 
+        '<span class="badge bg-secondary">⭕ No</span>';
+    
+    const successRateColor = getSuccessRateColor(platform.success_rate);
+    const platformIcon = getPlatformIcon(platform.platform);
+    
+    return [
+        `
                     ${platformIcon}
                     <strong>${platform.platform}</strong>
-                </td>
-                <td>
+                    <br><small class="text-muted">${escapeHtml(platform.url)}</small>
+        `,
+        `
                     <div class="last-post-preview" title="${escapeHtml(platform.last_post)}">
                         ${escapeHtml(platform.last_post)}
                     </div>
-                </td>
-                <td>
+        `,
+        `
                     <small class="text-muted">
                         ${formatDateTime(platform.last_checked)}
                     </small>
-                </td>
-                <td>
+        `,
+        `
                     <div class="d-flex align-items-center">
                         <div class="success-rate-bar me-2" style="width: 60px;">
                             <div class="success-rate-fill" style="width: ${platform.success_rate}%; background-color: ${successRateColor};"></div>
@@ -100,12 +243,10 @@ function updateDashboard(platforms) {
                         <small>${platform.success_rate}%</small>
                     </div>
                     <small class="text-muted">${platform.success_count}/${platform.check_count}</small>
-                </td>
-                <td>${newPostBadge}</td>
-                <td>${statusIcon}</td>
-            </tr>
-        `;
-    }).join('');
+        `,
+        newPostBadge,
+        statusIcon
+    ];
 }
 
 // Update summary cards at the top
@@ -114,6 +255,7 @@ function updateSummaryCards(platforms) {
     const newPosts = platforms.filter(p => p.has_new_post).length;
     const errors = platforms.filter(p => p.error_message).length;
     
+    document.getElementById('total-platforms').textContent = platforms.length;
     document.getElementById('active-monitoring').textContent = activeMonitoring;
     document.getElementById('new-posts').textContent = newPosts;
     document.getElementById('error-count').textContent = errors;
@@ -121,7 +263,11 @@ function updateSummaryCards(platforms) {
 
 // Get status icon based on platform status
 function getStatusIcon(platform) {
-    if (platform.error_message) {
+    if (platform.circuit && platform.circuit.state === 'open') {
+        return `<span class="status-error" title="Retrying at ${escapeHtml(platform.circuit.retry_at)}">
+                    <i class="fas fa-pause-circle"></i> Backing off
+                </span>`;
+    } else if (platform.error_message) {
         return `<span class="status-error" title="${escapeHtml(platform.error_message)}">
                     <i class="fas fa-exclamation-circle"></i> Error
                 </span>`;
@@ -199,6 +345,7 @@ function hideRefreshIndicator() {
 // Show error message
 function showError(message) {
     const tableBody = document.getElementById('status-table-body');
+    clearRows();
     tableBody.innerHTML = `
         <tr>
             <td colspan="6" class="text-center text-danger">
@@ -221,9 +368,9 @@ function escapeHtml(text) {
 document.addEventListener('visibilitychange', function() {
     if (document.hidden) {
         stopAutoRefresh();
+        stopLiveUpdates();
     } else {
-        refreshData();
-        startAutoRefresh();
+        refreshData().then(startLiveUpdates);
     }
 });
 
@@ -0,0 +1,239 @@
+"""
+Cheap structured post sources: hydration JSON embedded in profile pages and public timeline endpoints
+"""
+import asyncio
+import aiohttp
+import json
+import logging
+import re
+from urllib.parse import urlparse
+from config import SCRAPE_POSTS_PER_PAGE, STRUCTURED_MAX_BYTES
+from post_identity import post_identity, build_posts_result
+from metrics import metrics
+from circuit_breaker import breakers
+
+logger = logging.getLogger(__name__)
+
+LD_JSON = 'ld+json'
+
+# Where each platform's posts can be read without rendering: the page itself unless a
+# lighter `url` template is given, and the scripts holding the data (any one is enough,
+# except JSON-LD blocks, which are all collected)
+STRUCTURED_SOURCES = {
+    'TikTok': {
+        'scripts': ('__UNIVERSAL_DATA_FOR_REHYDRATION__', 'SIGI_STATE', '__NEXT_DATA__')
+    },
+    'X': {
+        'url': 'https://syndication.twitter.com/srv/timeline-profile/screen-name/{handle}',
+        'scripts': ('__NEXT_DATA__',)
+    },
+    'LinkedIn': {
+        'scripts': (LD_JSON,)
+    }
+}
+
+# Schema.org types that describe a single post
+POSTING_TYPES = {'SocialMediaPosting', 'DiscussionForumPosting', 'BlogPosting', 'NewsArticle', 'Article', 'VideoObject'}
+
+CHUNK_SIZE = 64 * 1024
+SCRIPT_START = re.compile(rb'<script\b([^>]*)>', re.IGNORECASE)
+SCRIPT_END = re.compile(rb'</script', re.IGNORECASE)
+SCRIPT_ID = re.compile(rb'\bid\s*=\s*["\']?([\w-]+)', re.IGNORECASE)
+SCRIPT_LD_JSON = re.compile(rb'\btype\s*=\s*["\']?application/ld\+json', re.IGNORECASE)
+TAG_TAIL = 1024  # Bytes kept between chunks so a <script> tag split across them is still found
+
+class EmbeddedJsonScanner:
+    """Finds wanted <script> bodies in an HTML byte stream without parsing the page
+
+    Chunks are fed as they arrive; `done` turns true once a wanted script with an id has been
+    read, so the caller can stop downloading. Nothing but the script bodies is kept.
+    """
+
+    def __init__(self, wanted):
+        self.wanted_ids = {name.encode() for name in wanted if name != LD_JSON}
+        self.want_ld_json = LD_JSON in wanted
+        self.buffer = b''
+        self.capturing = None
+        self.scripts = []  # (name, raw JSON bytes) in page order
+        self.done = False
+
+    def script_name(self, attributes):
+        match = SCRIPT_ID.search(attributes)
+        if match and match.group(1) in self.wanted_ids:
+            return match.group(1).decode()
+        if self.want_ld_json and SCRIPT_LD_JSON.search(attributes):
+            return LD_JSON
+        return None
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        while not self.done:
+            if self.capturing is None:
+                match = SCRIPT_START.search(self.buffer)
+                if match is None:
+                    self.buffer = self.buffer[-TAG_TAIL:]
+                    return
+                self.capturing = self.script_name(match.group(1))
+                self.buffer = self.buffer[match.end():]
+                continue
+
+            match = SCRIPT_END.search(self.buffer)
+            if match is None:
+                return
+            self.scripts.append((self.capturing, self.buffer[:match.start()]))
+            self.buffer = self.buffer[match.start():]
+            self.done = self.capturing != LD_JSON
+            self.capturing = None
+
+def iter_objects(data):
+    """Yield every dict in a JSON document in document order, without recursion"""
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            yield value
+            stack.extend(reversed(list(value.values())))
+        elif isinstance(value, list):
+            stack.extend(reversed(value))
+
+def tiktok_posts(documents, url):
+    """Video items ({id, desc, createTime}) from TikTok hydration state, newest first"""
+    items = {}
+    for document in documents:
+        for obj in iter_objects(document):
+            video_id = str(obj.get('id', ''))
+            if video_id.isdigit() and 'desc' in obj and 'createTime' in obj:
+                author = obj.get('author')
+                if isinstance(author, dict):
+                    author = author.get('uniqueId')
+                video_url = f'https://www.tiktok.com/@{author}/video/{video_id}' if author else url
+                items.setdefault(video_id, (int(obj.get('createTime') or 0), {
+                    'post_id': video_id,
+                    'content': (obj.get('desc') or '').strip()[:200] or 'New TikTok video available',
+                    'url': video_url
+                }))
+    return [item for _, item in sorted(items.values(), key=lambda entry: entry[0], reverse=True)]
+
+def x_posts(documents, url):
+    """Tweets from the syndication timeline's entries, newest first (ids are time-ordered)"""
+    items = {}
+    for document in documents:
+        for obj in iter_objects(document):
+            tweet = obj.get('tweet')
+            if isinstance(tweet, dict) and str(tweet.get('id_str', '')).isdigit():
+                tweet_id = tweet['id_str']
+                permalink = tweet.get('permalink')
+                items.setdefault(tweet_id, {
+                    'post_id': tweet_id,
+                    'content': (tweet.get('full_text') or tweet.get('text') or '').strip()[:200] or 'Tweet found',
+                    'url': f'https://x.com{permalink}' if permalink else f'https://x.com/i/status/{tweet_id}'
+                })
+    return [items[tweet_id] for tweet_id in sorted(items, key=int, reverse=True)]
+
+def ld_json_posts(platform, documents, url):
+    """Schema.org posting objects from JSON-LD blocks, newest first when dated"""
+    items = []
+    for document in documents:
+        for obj in iter_objects(document):
+            types = obj.get('@type')
+            types = set(types) if isinstance(types, list) else {types}
+            if not types & POSTING_TYPES:
+                continue
+            content = obj.get('articleBody') or obj.get('text') or obj.get('headline') or obj.get('description') or ''
+            post_url = obj.get('url') or obj.get('@id')
+            post_url = post_url if isinstance(post_url, str) else None
+            items.append((obj.get('datePublished') or '', {
+                'post_id': post_identity(platform, content, post_url),
+                'content': content.strip()[:200] or f'{platform} post found',
+                'url': post_url or url
+            }))
+    # Stable sort keeps page order among undated posts
+    return [item for _, item in sorted(items, key=lambda entry: entry[0], reverse=True)]
+
+def parse_structured(platform, url, scripts):
+    """Turn captured (name, JSON bytes) scripts into a posts result, or None
+
+    Module-level and free of shared state so it can run in a worker process.
+    """
+    documents = []
+    for name, raw in scripts:
+        try:
+            documents.append(json.loads(raw))
+        except ValueError as e:
+            logger.warning(f"Unreadable {name} JSON for {platform} ({url}): {e}")
+
+    if platform == 'TikTok':
+        items = tiktok_posts(documents, url)
+    elif platform == 'X':
+        items = x_posts(documents, url)
+    else:
+        items = ld_json_posts(platform, documents, url)
+    return build_posts_result(items[:SCRAPE_POSTS_PER_PAGE])
+
+def source_url(platform, url):
+    """URL of the platform's structured source for a target (the page itself by default)"""
+    template = STRUCTURED_SOURCES[platform].get('url')
+    if template is None:
+        return url
+    handle = urlparse(url).path.strip('/').split('/')[0]
+    return template.format(handle=handle) if handle else None
+
+class StructuredScraper:
+    """Reads posts from embedded JSON or a timeline endpoint over the HTTP scraper's session
+
+    The body is streamed and scanned for the wanted scripts only; downloading stops as soon as
+    they are complete. Returns None when the platform has no such source or nothing was found.
+    """
+
+    def __init__(self, http_scraper, max_bytes=STRUCTURED_MAX_BYTES):
+        self.http_scraper = http_scraper  # AsyncSimpleScraper providing the pooled session
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+
+    async def scrape_platform(self, platform, url):
+        """Fetch and parse the structured source for a target"""
+        if platform not in STRUCTURED_SOURCES:
+            return None
+        try:
+            fetch_url = source_url(platform, url)
+            if fetch_url is None:
+                return None
+
+            scanner = EmbeddedJsonScanner(STRUCTURED_SOURCES[platform]['scripts'])
+            received = 0
+            session = await self.http_scraper.get_session()
+            labels = {'platform': platform, 'target': url}
+            with metrics.timer('check_stage_seconds', stage='structured_download', **labels):
+                async with session.get(fetch_url, trace_request_ctx=labels) as response:
+                    # Counted against the host actually fetched (the timeline endpoint for X)
+                    breakers.record_response(fetch_url, response.status)
+                    if response.status != 200:
+                        logger.info(f"{platform} structured source returned status {response.status}")
+                        return None
+                    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                        received += len(chunk)
+                        scanner.feed(chunk)
+                        if scanner.done or received >= self.max_bytes:
+                            break
+            self.bytes_read += received
+
+            if not scanner.scripts:
+                logger.info(f"No embedded post data for {platform} ({url}) in {received} bytes")
+                return None
+
+            with metrics.timer('check_stage_seconds', stage='structured_parse', **labels):
+                worker_pool = self.http_scraper.worker_pool
+                if worker_pool:
+                    return await worker_pool.run(parse_structured, platform, url, scanner.scripts)
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    self.http_scraper.executor, parse_structured, platform, url, scanner.scripts
+                )
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Structured source unreachable for {platform}: {e!r}")
+            breakers.record_failure(fetch_url, repr(e))
+            return None
+        except Exception as e:
+            logger.error(f"Structured source failed for {platform}: {e}")
+            return None
@@ -0,0 +1,21 @@
+"""
+Shared fixtures: tests import the top-level modules and run against a temporary database
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A freshly initialized database file, with every connection closed afterwards"""
+    monkeypatch.setattr(database, 'DATABASE_PATH', str(tmp_path / 'test.db'))
+    database.close_connections()
+    database.init_database()
+    yield database
+    database.status_buffer.flush()
+    database.close_connections()
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from circuit_breaker import breakers
+from post_identity import seen_posts
+
+class StubFetcher:
+    """Fetch tiers replaced by canned results per URL"""
+
+    def __init__(self, posts):
+        self.posts = posts
+
+    async def scrape_platform(self, platform, url):
+        return self.posts.get(url)
+
+    def stats(self):
+        return {}
+
+    async def close(self):
+        pass
+
+@pytest.fixture
+def bot(db):
+    from bot import DiscordBot
+    breakers.breakers.clear()
+    seen_posts.targets.clear()
+    bot = DiscordBot()
+    bot.job_queue = None
+    yield bot
+    breakers.breakers.clear()
+
+def test_cycle_report_counts_checks_without_posts_as_failed(bot, db):
+    post = {'post_id': '1846100000000000003', 'content': 'Hello', 'url': 'https://x.com/a/status/1', 'tier': 'html'}
+    bot.fetcher = StubFetcher({'https://x.com/a': post})
+    bot.check_engine.host_delay = 0
+
+    report = asyncio.run(bot.check_all_platforms([('X', 'https://x.com/a'), ('X', 'https://x.com/b')]))
+
+    assert report['targets'] == 2
+    assert report['failed'] == 1
+
+def test_pages_without_posts_do_not_open_the_host_circuit(bot, db):
+    bot.fetcher = StubFetcher({})
+    bot.check_engine.host_delay = 0
+    url = 'https://x.com/quiet'
+    threshold = breakers.get(url).failure_threshold
+
+    for _ in range(threshold + 1):
+        report = asyncio.run(bot.check_all_platforms([('X', url)]))
+        assert report['failed'] == 1
+
+    assert breakers.get(url).state == 'closed'
+    assert breakers.get(url).consecutive_failures == 0
+
+def test_a_failed_check_does_not_reannounce_the_last_post(bot, db):
+    post = {'post_id': '1846100000000000003', 'content': 'Hello', 'url': 'https://x.com/a/status/1', 'tier': 'html'}
+    bot.check_engine.host_delay = 0
+    targets = [('X', 'https://x.com/a')]
+
+    for posts in ({'https://x.com/a': post}, {}, {'https://x.com/a': post}):
+        bot.fetcher = StubFetcher(posts)
+        asyncio.run(bot.check_all_platforms(targets))
+
+    announced = db.get_connection().execute('SELECT COUNT(*) FROM posts WHERE is_new').fetchone()[0]
+    assert announced == 1
+
+class SyndicationFetcher(StubFetcher):
+    """Serves X posts from the timeline endpoint, as the structured tier does"""
+
+    async def scrape_platform(self, platform, url):
+        breakers.record_response('https://syndication.twitter.com/srv/timeline-profile/a', 200)
+        post = self.posts.get(url)
+        return dict(post, tier='structured') if post else None
+
+def expire_open_circuit(url):
+    breaker = breakers.get(url)
+    for _ in range(breaker.failure_threshold):
+        breakers.record_failure(url, 'HTTP 503')
+    assert breaker.state == 'open'
+    breaker.open_until = 0
+    return breaker
+
+def test_a_probe_served_by_another_host_closes_the_circuit(bot, db):
+    url = 'https://x.com/a'
+    post = {'post_id': '1846100000000000003', 'content': 'Hello', 'url': 'https://x.com/a/status/1'}
+    bot.fetcher = SyndicationFetcher({url: post})
+    bot.check_engine.host_delay = 0
+    breaker = expire_open_circuit(url)
+
+    report = asyncio.run(bot.check_all_platforms([('X', url)]))
+
+    assert report['targets'] == 1
+    assert breaker.state == 'closed'
+    assert not breaker.probe_in_flight
+
+def test_a_probe_without_a_result_lets_the_next_check_probe_again(bot, db):
+    url = 'https://x.com/a'
+    bot.fetcher = SyndicationFetcher({})
+    bot.check_engine.host_delay = 0
+    breaker = expire_open_circuit(url)
+
+    for _ in range(2):
+        report = asyncio.run(bot.check_all_platforms([('X', url)]))
+        assert report['targets'] == 1
+    assert breaker.state == 'half_open'
@@ -0,0 +1,134 @@
+import asyncio
+
+from browser_pool import BrowserContextPool
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+        self.handlers = {}
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+class FakeContext:
+    def __init__(self):
+        self.pages = []
+        self.closed = False
+
+    async def new_page(self):
+        page = FakePage()
+        self.pages.append(page)
+        return page
+
+    async def close(self):
+        self.closed = True
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+
+    async def new_context(self, **options):
+        context = FakeContext()
+        self.contexts.append(context)
+        return context
+
+def make_pool(**options):
+    options = {'size': 1, 'pages_per_context': 1, 'max_navigations': 50, 'isolate_platforms': True, **options}
+    browser = FakeBrowser()
+    return browser, BrowserContextPool(browser, **options)
+
+async def lease_page(pool, platform):
+    async with pool.lease(platform) as page:
+        return page
+
+def test_pages_are_reused_across_leases():
+    browser, pool = make_pool()
+
+    async def run():
+        return [await lease_page(pool, 'X') for _ in range(3)]
+
+    first, second, third = asyncio.run(run())
+
+    assert first is second is third and not first.closed
+    assert len(browser.contexts) == 1
+    assert pool.stats()['x'] == {'contexts': 1, 'leased_pages': 0, 'idle_pages': 1, 'navigations': 3}
+
+def test_a_context_is_recycled_after_max_navigations():
+    browser, pool = make_pool(max_navigations=2)
+
+    async def run():
+        return [await lease_page(pool, 'X') for _ in range(3)]
+
+    pages = asyncio.run(run())
+
+    assert pages[0] is pages[1] and pages[2] is not pages[1]
+    assert pages[1].closed
+    assert [context.closed for context in browser.contexts] == [True, False]
+
+def test_a_crashed_page_retires_its_context():
+    browser, pool = make_pool()
+
+    async def run():
+        async with pool.lease('X') as page:
+            page.handlers['crash'](page)
+        return page, await lease_page(pool, 'X')
+
+    crashed, fresh = asyncio.run(run())
+
+    assert crashed.closed and fresh is not crashed
+    assert [context.closed for context in browser.contexts] == [True, False]
+
+def test_a_failed_scrape_does_not_return_its_page():
+    browser, pool = make_pool()
+
+    async def run():
+        try:
+            async with pool.lease('X') as page:
+                raise RuntimeError('navigation timed out')
+        except RuntimeError:
+            pass
+        return page, await lease_page(pool, 'X')
+
+    failed, fresh = asyncio.run(run())
+
+    assert failed.closed and fresh is not failed
+    assert len(browser.contexts) == 1
+
+def test_platforms_get_their_own_contexts():
+    browser, pool = make_pool()
+
+    async def run():
+        await lease_page(pool, 'X')
+        await lease_page(pool, 'TikTok')
+
+    asyncio.run(run())
+
+    assert sorted(pool.stats()) == ['tiktok', 'x']
+    assert len(browser.contexts) == 2
+
+def test_concurrent_leases_are_bounded_by_pool_capacity():
+    browser, pool = make_pool(size=1, pages_per_context=2)
+    active = 0
+    peak = 0
+
+    async def scrape():
+        nonlocal active, peak
+        async with pool.lease('X'):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    async def run():
+        await asyncio.gather(*(scrape() for _ in range(5)))
+
+    asyncio.run(run())
+
+    assert peak == 2
+    assert len(browser.contexts) == 1 and len(browser.contexts[0].pages) == 2
@@ -0,0 +1,33 @@
+import asyncio
+
+from check_engine import CheckEngine
+
+def run_cycle(check, targets):
+    engine = CheckEngine(max_concurrency=4, per_platform_limit=2, host_delay=0)
+    return asyncio.run(engine.run(targets, check))
+
+def test_report_counts_checks_that_return_false_or_raise():
+    async def check(platform, url):
+        if url.endswith('/missing'):
+            return False
+        if url.endswith('/broken'):
+            raise RuntimeError('boom')
+        return True
+
+    report = run_cycle(check, [
+        ('X', 'https://x.com/ok'),
+        ('X', 'https://x.com/missing'),
+        ('TikTok', 'https://www.tiktok.com/broken'),
+        ('TikTok', 'https://www.tiktok.com/ok')
+    ])
+
+    assert report['targets'] == 4
+    assert report['failed'] == 2
+
+def test_checks_without_a_result_count_as_successful():
+    async def check(platform, url):
+        return None
+
+    report = run_cycle(check, [('X', 'https://x.com/a'), ('X', 'https://x.com/b')])
+
+    assert report['failed'] == 0
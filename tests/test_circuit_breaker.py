@@ -0,0 +1,85 @@
+import time
+
+from circuit_breaker import CLOSED, OPEN, BreakerRegistry, breakers, is_host_failure
+
+URL = 'https://www.tiktok.com/@account'
+
+def trip(registry, url=URL):
+    breaker = registry.get(url)
+    for _ in range(breaker.failure_threshold):
+        registry.record_failure(url, 'HTTP 503')
+    return breaker
+
+def test_throttling_and_server_errors_are_host_failures():
+    assert all(is_host_failure(status) for status in (429, 999, 500, 502, 503))
+    assert not any(is_host_failure(status) for status in (200, 301, 304, 403, 404))
+
+def test_linkedin_login_walls_and_blocks_are_host_failures():
+    assert is_host_failure(403, 'www.linkedin.com')
+    assert is_host_failure(302, 'linkedin.com')
+    assert not is_host_failure(404, 'www.linkedin.com')
+    assert not is_host_failure(403, 'notlinkedin.com')
+
+    registry = BreakerRegistry()
+    url = 'https://www.linkedin.com/company/example/'
+    registry.record_response(url, 999)
+    registry.record_response(url, 403)
+    assert registry.get(url).consecutive_failures == 2
+
+def test_record_response_opens_and_closes_the_circuit():
+    registry = BreakerRegistry()
+    breaker = registry.get(URL)
+    for _ in range(breaker.failure_threshold):
+        registry.record_response(URL, 999)
+    assert breaker.state == OPEN
+    assert breaker.last_error == 'HTTP 999'
+
+    registry.record_response(URL, 404)
+    assert breaker.state == CLOSED
+    assert breaker.consecutive_failures == 0
+
+def test_saved_states_are_loaded_by_another_process(db):
+    worker = BreakerRegistry()
+    trip(worker)
+    assert db.save_breakers(worker) == 1
+    assert db.save_breakers(worker) == 0  # Nothing changed since
+
+    coordinator = BreakerRegistry()
+    db.load_breakers(coordinator)
+
+    breaker = coordinator.get(URL)
+    assert breaker.state == OPEN
+    assert breaker.last_error == 'HTTP 503'
+    assert not coordinator.allow_request(URL)
+    assert coordinator.snapshot()['www.tiktok.com']['retry_at'] is not None
+
+def test_newer_local_state_is_not_overwritten_by_an_older_save(db):
+    other = BreakerRegistry()
+    trip(other)
+    db.save_breakers(other)
+
+    local = BreakerRegistry()
+    time.sleep(0.01)
+    local.record_success(URL)
+    local.record_failure(URL, 'timeout')
+    db.load_breakers(local)
+
+    assert local.get(URL).state == CLOSED
+    assert local.get(URL).last_error == 'timeout'
+
+def test_status_api_shows_saved_breakers_outside_the_bot_process(db):
+    import dashboard
+    worker = BreakerRegistry()
+    trip(worker)
+    db.save_breakers(worker)
+    breakers.breakers.clear()
+
+    try:
+        payload = dashboard.build_status_payload()
+        version = dashboard.StatusSnapshotCache().current_version()
+    finally:
+        breakers.breakers.clear()
+
+    assert [circuit['host'] for circuit in payload['circuits']] == ['www.tiktok.com']
+    assert payload['circuits'][0]['state'] == OPEN
+    assert version[1] == db.get_circuits_version() == 1
@@ -0,0 +1,156 @@
+import gzip
+import re
+
+import pytest
+
+import dashboard
+
+@pytest.fixture
+def client(db):
+    dashboard.app.config['TESTING'] = True
+    return dashboard.app.test_client()
+
+@pytest.fixture
+def saves(monkeypatch):
+    calls = []
+    monkeypatch.setattr(dashboard, 'save_metrics', lambda: calls.append(1))
+    monkeypatch.setattr(dashboard, 'last_metrics_save', 0.0)
+    return calls
+
+def test_notification_stats_reuse_one_queue(client, monkeypatch):
+    def no_new_queues():
+        raise AssertionError('NotificationQueue created per request')
+    monkeypatch.setattr(dashboard, 'NotificationQueue', no_new_queues)
+
+    for _ in range(2):
+        response = client.get('/api/notifications')
+        assert response.status_code == 200
+
+def test_metrics_scrapes_do_not_save_outside_thread_mode(client, saves, monkeypatch):
+    monkeypatch.setattr(dashboard, 'DASHBOARD_MODE', 'process')
+
+    assert client.get('/metrics').status_code == 200
+    assert saves == []
+
+def test_metrics_scrapes_in_thread_mode_save_at_most_once_per_interval(client, saves, monkeypatch):
+    monkeypatch.setattr(dashboard, 'DASHBOARD_MODE', 'thread')
+
+    for _ in range(3):
+        assert client.get('/metrics').status_code == 200
+    assert saves == [1]
+
+    monkeypatch.setattr(dashboard, 'METRICS_SCRAPE_SAVE_INTERVAL', 0)
+    client.get('/metrics')
+    assert saves == [1, 1]
+
+@pytest.mark.parametrize('key', [[{'a': 1}, [2]], ['2026-01-01 00:00:00', '7'], [None, 7],
+                                 ['2026-01-01 00:00:00', True], ['2026-01-01 00:00:00'], 'abc'])
+def test_malformed_post_cursors_are_rejected(client, key):
+    response = client.get('/api/posts', query_string={'cursor': dashboard.encode_cursor(key)})
+
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'Invalid cursor'
+
+def test_a_valid_post_cursor_is_accepted(client):
+    cursor = dashboard.encode_cursor(['2026-01-01 00:00:00', 7])
+
+    response = client.get('/api/posts', query_string={'cursor': cursor})
+
+    assert response.status_code == 200
+
+def test_malformed_target_cursors_are_rejected(client):
+    for key in ('7', True, [7]):
+        response = client.get('/api/targets', query_string={'cursor': dashboard.encode_cursor(key)})
+        assert response.status_code == 400
+
+@pytest.fixture
+def fast_stream(monkeypatch):
+    monkeypatch.setattr(dashboard, 'DASHBOARD_STREAM_POLL_INTERVAL', 0.01)
+    monkeypatch.setattr(dashboard, 'DASHBOARD_STREAM_HEARTBEAT', 3600)
+
+def post_status(db, url, post_id):
+    db.queue_post_status('X', url, {'post_id': post_id, 'content': 'Hello', 'url': f'{url}/status/{post_id}'})
+    db.flush_status_updates()
+
+def next_event(stream):
+    """Next message of a server-sent event stream, skipping heartbeats"""
+    while True:
+        message = next(stream)
+        if not message.startswith(':'):
+            return message
+
+def test_the_stream_pushes_only_targets_changed_after_the_last_event_id(db, fast_stream):
+    db.register_targets([('X', 'https://x.com/a'), ('X', 'https://x.com/b')])
+    post_status(db, 'https://x.com/a', '1')
+    last_event_id = db.get_last_status_event_id()
+    post_status(db, 'https://x.com/b', '2')
+
+    stream = dashboard.status_event_stream(last_event_id)
+    assert next_event(stream).startswith('retry: ')
+    message = next_event(stream)
+    stream.close()
+
+    event_id, event, data = message.strip().split('\n')
+    assert event_id == f'id: {db.get_last_status_event_id()}'
+    assert event == 'event: status'
+    payload = dashboard.app.json.loads(data.removeprefix('data: '))
+    assert [target['url'] for target in payload['targets']] == ['https://x.com/b']
+    assert payload['removed'] == []
+
+def test_bulk_changes_make_the_client_reload(db, fast_stream):
+    last_event_id = db.get_last_status_event_id()
+    db.register_targets([('X', 'https://x.com/a')])
+
+    stream = dashboard.status_event_stream(last_event_id)
+    next(stream)
+    message = next_event(stream)
+    stream.close()
+
+    assert message.split('\n')[1] == 'event: reset'
+
+def test_an_idle_stream_sends_heartbeats(db, fast_stream, monkeypatch):
+    monkeypatch.setattr(dashboard, 'DASHBOARD_STREAM_HEARTBEAT', 0)
+
+    stream = dashboard.status_event_stream(db.get_last_status_event_id())
+    next(stream)
+    assert next(stream) == ': heartbeat\n\n'
+    stream.close()
+
+def test_streams_past_the_client_cap_are_refused(client, monkeypatch):
+    monkeypatch.setattr(dashboard, 'stream_slots', dashboard.threading.BoundedSemaphore(1))
+    dashboard.stream_slots.acquire()
+
+    response = client.get('/api/stream')
+
+    assert response.status_code == 503
+
+def test_status_is_gzipped_with_its_own_etag_per_coding(db, client):
+    db.register_targets([('X', f'https://x.com/account{n}') for n in range(20)])
+    plain = client.get('/api/status')
+
+    compressed = client.get('/api/status', headers={'Accept-Encoding': 'gzip'})
+
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.data) == plain.data
+    assert compressed.headers['ETag'] != plain.headers['ETag']
+    revalidated = client.get('/api/status', headers={
+        'Accept-Encoding': 'gzip', 'If-None-Match': compressed.headers['ETag']
+    })
+    assert revalidated.status_code == 304
+
+def test_small_responses_are_not_compressed(client):
+    response = client.get('/api/notifications', headers={'Accept-Encoding': 'gzip'})
+
+    assert len(response.data) < dashboard.DASHBOARD_COMPRESSION_MIN_SIZE
+    assert 'Content-Encoding' not in response.headers
+
+def test_versioned_static_files_are_cached_for_good(client):
+    page = client.get('/').get_data(as_text=True)
+    [script_url] = re.findall(r'src="(/static/script\.js\?v=\w+)"', page)
+
+    response = client.get(script_url, headers={'Accept-Encoding': 'gzip'})
+
+    assert response.status_code == 200
+    assert response.cache_control.immutable
+    assert response.cache_control.max_age == dashboard.DASHBOARD_STATIC_MAX_AGE
+    assert response.headers['Content-Encoding'] == 'gzip'
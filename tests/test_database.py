@@ -0,0 +1,212 @@
+import gc
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+
+import database
+
+def run_in_thread(func):
+    thread = threading.Thread(target=func)
+    thread.start()
+    thread.join()
+
+def test_connections_of_exited_threads_are_closed(db):
+    db.get_connection()
+    before = len(db._connections)
+    opened = []
+
+    for _ in range(5):
+        run_in_thread(lambda: opened.append(db.get_connection()))
+    gc.collect()
+
+    assert len(opened) == 5
+    assert len(db._connections) == before
+    conn = opened[0]
+    try:
+        conn.execute('SELECT 1')
+        closed = False
+    except Exception:
+        closed = True
+    assert closed
+
+def test_thread_keeps_its_connection_while_alive(db):
+    assert db.get_connection() is db.get_connection()
+
+def test_close_connections_gives_threads_a_new_connection(db):
+    first = db.get_connection()
+    db.close_connections()
+    second = db.get_connection()
+
+    assert second is not first
+    assert second.execute('SELECT 1').fetchone() == (1,)
+
+def wait_for(condition, timeout=5.0):
+    import time
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+def status_row(db, url):
+    return db.get_connection().execute(
+        'SELECT last_post_id, check_count FROM monitoring_status WHERE url = ?', (url,)
+    ).fetchone()
+
+def test_write_buffer_flushes_when_full(db):
+    buffer = db.StatusWriteBuffer(max_size=2, max_delay=60)
+    buffer.add('X', 'https://x.com/a', {'post_id': '1', 'content': 'a', 'url': 'https://x.com/a'})
+    assert status_row(db, 'https://x.com/a') is None
+
+    buffer.add('X', 'https://x.com/b', {'post_id': '2', 'content': 'b', 'url': 'https://x.com/b'})
+
+    assert status_row(db, 'https://x.com/a') == ('1', 1)
+    assert status_row(db, 'https://x.com/b') == ('2', 1)
+    assert buffer.stats()['flush_count'] == 1
+
+def test_write_buffer_flushes_by_age_on_one_writer_thread(db):
+    buffer = db.StatusWriteBuffer(max_size=100, max_delay=0.05)
+    db.get_connection()
+    connections = len(db._connections)
+
+    for n in range(3):
+        buffer.add('X', f'https://x.com/{n}', {'post_id': str(n), 'content': 'text', 'url': 'https://x.com'})
+        assert wait_for(lambda: buffer.stats()['flush_count'] == n + 1)
+
+    assert [status_row(db, f'https://x.com/{n}') for n in range(3)] == [(str(n), 1) for n in range(3)]
+    assert [thread.name for thread in threading.enumerate()].count('status-writer') >= 1
+    # The writer thread opened one connection and reused it for every flush
+    assert len(db._connections) == connections + 1
+
+def test_pending_updates_are_visible_before_the_flush(db):
+    buffer = db.StatusWriteBuffer(max_size=100, max_delay=60)
+    buffer.add('X', 'https://x.com/a', {'post_id': '7', 'content': 'a', 'url': 'https://x.com/a', 'tier': 'html'})
+
+    assert buffer.last_post('X', 'https://x.com/a')['post_id'] == '7'
+    assert buffer.flush() == 1
+    assert buffer.last_post('X', 'https://x.com/a') is None
+
+LEGACY_SCHEMA = '''
+    CREATE TABLE monitoring_status (
+        platform TEXT PRIMARY KEY,
+        url TEXT NOT NULL,
+        last_post_content TEXT,
+        last_post_id TEXT,
+        last_post_url TEXT,
+        last_checked TIMESTAMP,
+        has_new_post BOOLEAN DEFAULT 0,
+        error_message TEXT,
+        check_count INTEGER DEFAULT 0,
+        success_count INTEGER DEFAULT 0
+    )
+'''
+
+def test_legacy_status_is_migrated_and_only_configured_accounts_stay_enabled(tmp_path, monkeypatch):
+    path = str(tmp_path / 'legacy.db')
+    conn = sqlite3.connect(path)
+    conn.execute(LEGACY_SCHEMA)
+    conn.executemany(
+        'INSERT INTO monitoring_status (platform, url, last_post_id, check_count, success_count) VALUES (?, ?, ?, ?, ?)',
+        [('X', 'https://x.com/kept', '11', 5, 4), ('LinkedIn', 'https://www.linkedin.com/company/old/', '22', 3, 3)]
+    )
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(database, 'DATABASE_PATH', path)
+    monkeypatch.setattr(database, 'SOCIAL_MEDIA_URLS', {
+        'X': 'https://x.com/kept',
+        'LinkedIn': 'https://www.linkedin.com/company/new/'
+    })
+    database.close_connections()
+
+    try:
+        database.init_database()
+        database.init_database()  # Later starts find nothing left to migrate
+
+        cursor = database.get_connection().cursor()
+        targets = cursor.execute('SELECT platform, url, enabled FROM targets ORDER BY id').fetchall()
+        statuses = cursor.execute(
+            'SELECT platform, url, last_post_id, check_count FROM monitoring_status ORDER BY target_id'
+        ).fetchall()
+        legacy = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'monitoring_status_legacy'"
+        ).fetchone()
+        enabled = database.get_enabled_targets()
+    finally:
+        database.close_connections()
+
+    assert sorted(targets) == [
+        ('LinkedIn', 'https://www.linkedin.com/company/old/', 0),
+        ('X', 'https://x.com/kept', 1)
+    ]
+    assert sorted(statuses) == [
+        ('LinkedIn', 'https://www.linkedin.com/company/old/', '22', 3),
+        ('X', 'https://x.com/kept', '11', 5)
+    ]
+    assert legacy is None
+    assert enabled == [('X', 'https://x.com/kept')]
+
+def test_failed_checks_keep_the_last_post(db):
+    post = {'post_id': '7', 'content': 'Hello', 'url': 'https://x.com/a/status/7', 'tier': 'html'}
+    db.queue_post_status('X', 'https://x.com/a', post)
+    db.flush_status_updates()
+
+    db.queue_post_status('X', 'https://x.com/a', error_message='timeout')
+    assert db.get_last_post('X', 'https://x.com/a')['post_id'] == '7'
+    db.flush_status_updates()
+
+    last_post = db.get_last_post('X', 'https://x.com/a')
+    assert (last_post['post_id'], last_post['tier']) == ('7', 'html')
+    status = db.get_all_monitoring_status()[0]
+    assert status['error_message'] == 'timeout'
+    assert (status['check_count'], status['success_count']) == (2, 1)
+
+def insert_posts(db, platform, url, ages_days, content=''):
+    now = datetime.now(timezone.utc)
+    rows = [
+        (platform, url, str(n), content, (now - timedelta(days=age)).strftime('%Y-%m-%d %H:%M:%S'))
+        for n, age in enumerate(ages_days)
+    ]
+    with db.transaction() as cursor:
+        cursor.executemany(
+            'INSERT INTO posts (platform, url, post_id, post_content, created_at) VALUES (?, ?, ?, ?, ?)', rows
+        )
+
+def test_old_posts_are_rolled_up_per_day_keeping_the_newest_per_target(db):
+    # Two posts a day from 100 to 113 days ago, plus two recent posts
+    insert_posts(db, 'X', 'https://x.com/a', [1, 2] + [100 + n // 2 + 0.01 * (n % 2) for n in range(28)])
+    # Too few posts to lose any, however old
+    insert_posts(db, 'X', 'https://x.com/b', [200, 201, 202])
+
+    deleted = db.rollup_old_posts(retention_days=90, keep_per_target=5, batch_size=7)
+
+    conn = db.get_connection()
+    kept = conn.execute('SELECT url, COUNT(*) FROM posts GROUP BY url ORDER BY url').fetchall()
+    daily = conn.execute(
+        "SELECT COUNT(*), SUM(post_count), MAX(post_count) FROM posts_daily WHERE url = 'https://x.com/a'"
+    ).fetchone()
+    assert deleted == 25
+    assert kept == [('https://x.com/a', 5), ('https://x.com/b', 3)]
+    # The three newest old posts survive, so the day of the 101-day pair loses only one post
+    assert daily == (13, 25, 2)
+    assert conn.execute("SELECT COUNT(*) FROM posts_daily WHERE url = 'https://x.com/b'").fetchone()[0] == 0
+
+def test_rolling_up_again_adds_to_the_daily_counts(db):
+    insert_posts(db, 'X', 'https://x.com/a', [100, 100.01])
+    db.rollup_old_posts(retention_days=90, keep_per_target=0)
+    insert_posts(db, 'X', 'https://x.com/a', [100.02])
+
+    db.rollup_old_posts(retention_days=90, keep_per_target=0)
+
+    assert db.get_connection().execute('SELECT post_count FROM posts_daily').fetchall() == [(3,)]
+
+def test_maintenance_releases_the_pages_of_deleted_posts(db):
+    insert_posts(db, 'X', 'https://x.com/a', [100 + n for n in range(200)], content='x' * 4000)
+
+    first = db.run_posts_maintenance()
+    second = db.run_posts_maintenance()
+
+    assert first['deleted'] == 200 - database.POSTS_RETENTION_KEEP_PER_TARGET
+    assert first['released_pages'] > 0
+    assert second['deleted'] == 0
+    assert db.get_connection().execute('PRAGMA freelist_count').fetchone()[0] == 0
@@ -0,0 +1,149 @@
+import asyncio
+import types
+
+import pytest
+
+import job_queue
+import worker
+from job_queue import SQLiteJobQueue
+from worker import CheckWorker
+
+TARGETS = [('X', 'https://x.com/a'), ('X', 'https://x.com/b'), ('TikTok', 'https://www.tiktok.com/@c')]
+POST = {'post_id': '1', 'content': 'Hello', 'url': 'https://x.com/a/status/1'}
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(job_queue, 'time', types.SimpleNamespace(time=clock.time))
+    return clock
+
+@pytest.fixture
+def queue(db, clock):
+    return SQLiteJobQueue(shard_count=4, lease_seconds=60, max_attempts=2, retry_delay=30)
+
+def test_targets_with_an_active_job_are_not_queued_twice(queue):
+    assert queue.enqueue(TARGETS) == 3
+    assert queue.enqueue(TARGETS) == 0
+
+def test_a_leased_job_is_not_claimed_by_another_worker(queue):
+    queue.enqueue(TARGETS)
+
+    first = queue.claim('worker-1', limit=2)
+    second = queue.claim('worker-2', limit=10)
+
+    assert len(first) == 2 and len(second) == 1
+    assert not {job['id'] for job in first} & {job['id'] for job in second}
+    assert queue.claim('worker-3', limit=10) == []
+
+def test_workers_only_claim_their_shards(queue):
+    queue.enqueue(TARGETS)
+    x_shard = queue.get_shard('https://x.com/a')
+    assert queue.get_shard('https://x.com/b') == x_shard
+
+    jobs = queue.claim('worker-1', shards=[x_shard], limit=10)
+
+    assert {job['url'] for job in jobs} >= {'https://x.com/a', 'https://x.com/b'}
+    assert all(job['shard'] == x_shard for job in jobs)
+    other_shards = [shard for shard in range(queue.shard_count) if shard != x_shard]
+    assert len(jobs) + len(queue.claim('worker-2', shards=other_shards, limit=10)) == 3
+
+def test_an_expired_lease_is_claimed_again_and_the_late_result_is_dropped(queue, clock):
+    queue.enqueue(TARGETS[:1])
+    [stale] = queue.claim('worker-1')
+
+    clock.now += 61
+    [job] = queue.claim('worker-2')
+
+    assert job['id'] == stale['id'] and job['attempts'] == 2
+    assert queue.renew([stale]) == [stale['id']]
+    assert not queue.complete(stale, POST)
+    assert queue.complete(job, POST)
+
+    [result] = queue.collect_results()
+    assert result['worker_id'] == 'worker-2'
+    assert result['post'] == POST
+
+def test_renewed_leases_are_not_claimed(queue, clock):
+    queue.enqueue(TARGETS[:1])
+    [job] = queue.claim('worker-1')
+
+    clock.now += 50
+    assert queue.renew([job]) == []
+    clock.now += 50
+
+    assert queue.claim('worker-2') == []
+    assert queue.stats()['busy_workers'] == 1
+
+def test_an_expired_lease_on_the_last_attempt_fails_the_job(queue, clock):
+    queue.enqueue(TARGETS[:1])
+    queue.claim('worker-1')
+    clock.now += 61
+    queue.claim('worker-2')
+    clock.now += 61
+
+    [result] = queue.collect_results()
+
+    assert result['post'] is None
+    assert result['error'] == 'Lease expired on worker worker-2'
+
+def test_failed_jobs_are_retried_after_the_delay_then_reported(queue, clock):
+    queue.enqueue(TARGETS[:1])
+    [job] = queue.claim('worker-1')
+    assert queue.fail(job, 'boom')
+
+    assert queue.claim('worker-2') == []
+    clock.now += 31
+    [retry] = queue.claim('worker-2')
+    assert queue.fail(retry, 'boom again')
+
+    [result] = queue.collect_results()
+    assert result['error'] == 'boom again'
+    assert result['attempts'] == 2
+    assert queue.stats() == {'queued': 0, 'leased': 0, 'done': 0, 'failed': 0, 'busy_workers': 0}
+
+class HangingScraper:
+    """Never finishes a check, like a browser stuck on a page"""
+
+    def __init__(self):
+        self.cancelled = False
+
+    async def scrape_platform(self, platform, url):
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+def test_a_job_whose_lease_was_lost_is_cancelled_without_a_result(queue, clock, monkeypatch):
+    monkeypatch.setattr(worker, 'JOB_LEASE_SECONDS', 0.03)
+    check_worker = CheckWorker('worker-1', job_queue=queue)
+    check_worker.scraper = HangingScraper()
+    queue.enqueue(TARGETS[:1])
+    [job] = queue.claim('worker-1')
+    clock.now += 61
+    [retry] = queue.claim('worker-2')
+
+    async def run():
+        check_worker.start_job(job)
+        task = check_worker.tasks[job['id']]
+        renewer = asyncio.create_task(check_worker.renew_leases())
+        await asyncio.wait_for(asyncio.gather(task, return_exceptions=True), timeout=1)
+        renewer.cancel()
+        return task
+
+    task = asyncio.run(run())
+
+    assert task.cancelled() and check_worker.scraper.cancelled
+    assert check_worker.active == {} and check_worker.tasks == {}
+    assert check_worker.completed == 0 and check_worker.failed == 0
+    # The job is still worker-2's to finish
+    assert queue.complete(retry, POST)
+    [result] = queue.collect_results()
+    assert result['worker_id'] == 'worker-2'
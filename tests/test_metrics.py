@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from metrics import MetricsRegistry, render_prometheus
+
+BUCKETS = (0.1, 1, 10)
+
+def make_registry(**options):
+    return MetricsRegistry(**{'enabled': True, 'per_target': True, 'buckets': BUCKETS, **options})
+
+def series(registry, name, **labels):
+    return registry.series[registry.series_key(name, labels)]
+
+def test_observations_land_in_the_first_bucket_that_holds_them():
+    registry = make_registry()
+
+    for seconds in (0.05, 0.1, 0.5, 20):
+        registry.observe('db_operation_seconds', seconds, operation='flush')
+
+    recorded = series(registry, 'db_operation_seconds', operation='flush')
+    # Observations past the last bound only show in the count (the +Inf bucket)
+    assert recorded == {'count': 4, 'sum': pytest.approx(20.65), 'buckets': [2, 1, 0]}
+
+def test_timers_record_blocks_that_raise_and_async_calls():
+    registry = make_registry()
+
+    with pytest.raises(ValueError):
+        with registry.timer('check_stage_seconds', stage='parse', platform='X'):
+            raise ValueError('bad page')
+
+    @registry.timed('discord_send_seconds', outcome='sent')
+    async def send():
+        return 'ok'
+
+    assert asyncio.run(send()) == 'ok'
+    assert series(registry, 'check_stage_seconds', stage='parse', platform='X')['count'] == 1
+    assert series(registry, 'discord_send_seconds', outcome='sent')['count'] == 1
+
+def test_disabled_registries_record_nothing():
+    registry = make_registry(enabled=False)
+
+    registry.observe('db_operation_seconds', 0.5, operation='flush')
+    registry.inc('checks_total', result='success')
+    with registry.timer('check_stage_seconds', stage='parse'):
+        pass
+
+    assert registry.series == {} and registry.take_changes() == []
+
+def test_target_labels_are_dropped_unless_per_target():
+    registry = make_registry(per_target=False)
+
+    registry.inc('checks_total', platform='X', target='https://x.com/a')
+    registry.inc('checks_total', platform='X', target='https://x.com/b')
+
+    [(name, labels, value)] = registry.take_changes()
+    assert (name, labels, value) == ('checks_total', '{"platform": "X"}', '{"value": 2}')
+
+def test_snapshots_from_several_processes_are_summed():
+    bot, worker = make_registry(), make_registry()
+    bot.observe('check_stage_seconds', 0.05, stage='download')
+    worker.observe('check_stage_seconds', 5, stage='download')
+    worker.inc('checks_total', result='success')
+
+    text = render_prometheus(bot.take_changes() + worker.take_changes(), buckets=BUCKETS)
+
+    assert '# TYPE check_stage_seconds histogram' in text
+    assert 'check_stage_seconds_bucket{stage="download",le="0.1"} 1' in text
+    assert 'check_stage_seconds_bucket{stage="download",le="10"} 2' in text
+    assert 'check_stage_seconds_bucket{stage="download",le="+Inf"} 2' in text
+    assert 'check_stage_seconds_sum{stage="download"} 5.050000' in text
+    assert 'checks_total{result="success"} 1' in text
+
+def test_label_values_are_escaped():
+    registry = make_registry()
+    registry.inc('checks_total', target='https://x.com/"quoted"\\')
+
+    text = render_prometheus(registry.take_changes())
+
+    assert 'checks_total{target="https://x.com/\\"quoted\\"\\\\"} 1' in text
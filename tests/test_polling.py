@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import polling
+from polling import AdaptivePollScheduler
+
+def add_posts(db, platform, url, gaps_hours):
+    """Detected posts `gaps_hours` apart, the newest ten minutes ago"""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    created = now - timedelta(minutes=10)
+    rows = []
+    for gap in [0] + list(gaps_hours):
+        created -= timedelta(hours=gap)
+        rows.append((platform, url, created.strftime('%Y-%m-%d %H:%M:%S')))
+    with db.transaction() as cursor:
+        cursor.executemany(
+            'INSERT INTO posts (platform, url, post_id, is_new, created_at) VALUES (?, ?, NULL, 1, ?)', rows
+        )
+
+@pytest.fixture
+def targets(db):
+    targets = [('X', f'https://x.com/account{n}') for n in range(5)]
+    db.register_targets(targets)
+    for n, (platform, url) in enumerate(targets[:4]):
+        add_posts(db, platform, url, [n + 1] * (3 + n * 4))
+    return targets
+
+def test_batched_post_history_matches_the_per_target_query(db, targets, monkeypatch):
+    monkeypatch.setattr(db, 'RECENT_POST_TIMES_BATCH', 2)
+
+    history = db.get_recent_post_times_by_target(targets, limit=5)
+
+    for platform, url in targets[:4]:
+        assert history[(platform, url)] == db.get_recent_post_times(platform, url, limit=5)
+    assert targets[4] not in history
+
+def test_reschedule_reads_post_history_in_one_batch(db, targets, monkeypatch):
+    def per_target_query(*args):
+        raise AssertionError('one history query per target')
+    monkeypatch.setattr(polling, 'get_recent_post_times', per_target_query)
+    scheduler = AdaptivePollScheduler(min_interval=60, max_interval=86400, jitter=0, rate_divisor=1)
+
+    scheduler.reschedule(targets)
+
+    # Posts every 1h, 2h, 3h, 4h; no history falls back to the default interval
+    assert [round(scheduler.intervals[target]) for target in targets] == [
+        3600, 7200, 10800, 14400, scheduler.clamp(scheduler.default_interval)
+    ]
+
+def history(gaps_hours, since_last_hours=0.1):
+    """Post times newest first, `gaps_hours` apart"""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    created = now - timedelta(hours=since_last_hours)
+    times = [created]
+    for gap in gaps_hours:
+        created -= timedelta(hours=gap)
+        times.append(created)
+    return [ts.strftime('%Y-%m-%d %H:%M:%S') for ts in times]
+
+def make_scheduler(**options):
+    options = {'min_interval': 600, 'max_interval': 86400, 'default_interval': 300, 'jitter': 0.1,
+               'rate_divisor': 2, **options}
+    return AdaptivePollScheduler(**options)
+
+def test_active_accounts_are_polled_at_their_posting_rate():
+    scheduler = make_scheduler()
+
+    interval = scheduler.compute_interval('X', 'https://x.com/a', history=history([4, 4, 5, 3]))
+
+    assert interval == pytest.approx(4 * 3600 / 2)
+
+def test_intervals_stay_within_the_bounds():
+    scheduler = make_scheduler()
+
+    busy = scheduler.compute_interval('X', 'https://x.com/a', history=history([0.01] * 5, since_last_hours=0.01))
+    dormant = scheduler.compute_interval('X', 'https://x.com/b', history=history([24 * 60] * 5))
+    unknown = scheduler.compute_interval('X', 'https://x.com/c', history=history([]))
+
+    assert busy == 600
+    assert dormant == 86400
+    # Fewer than two posts falls back to the default interval, raised to the minimum
+    assert unknown == 600
+
+def test_a_quiet_spell_longer_than_usual_backs_off():
+    scheduler = make_scheduler()
+
+    interval = scheduler.compute_interval('X', 'https://x.com/a', history=history([1, 1, 1], since_last_hours=10))
+
+    assert interval == pytest.approx(10 * 3600 / 2, rel=0.01)
+
+def test_fixed_intervals_override_the_history():
+    scheduler = make_scheduler()
+
+    assert scheduler.compute_interval('X', 'https://x.com/a', override=120, history=history([1, 1])) == 120
+
+def test_jitter_spreads_checks_around_the_interval():
+    scheduler = make_scheduler(jitter=0.1)
+
+    samples = [scheduler.with_jitter(1000) for _ in range(200)]
+
+    assert all(900 <= sample <= 1100 for sample in samples)
+    assert len(set(samples)) > 1
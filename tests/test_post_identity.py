@@ -0,0 +1,64 @@
+import pytest
+
+from post_identity import SeenPostCache, content_fingerprint, diff_new_posts, normalize_text
+
+@pytest.mark.parametrize('first, second', [
+    ('Episode 3 is out now', 'Episode 4 is out now'),
+    ('We raised $5M', 'We raised $10M'),
+    ('Join us on March 12', 'Join us on March 19'),
+    ('Top 5 tips', 'Top 10 tips'),
+    ('v2.0', 'v3.1')
+])
+def test_numbers_in_the_post_text_keep_posts_apart(first, second):
+    assert content_fingerprint(first) != content_fingerprint(second)
+
+@pytest.mark.parametrize('first, second', [
+    ('Big launch today 3h', 'Big launch today 5h'),
+    ('Big launch today · 2 days ago', 'Big launch today · 3 days ago'),
+    ('Big launch today 45 mins', 'Big launch today 1 hr'),
+    ('Big launch today 1.2k likes 5 comments', 'Big launch today 1.3K likes 17 comments'),
+    ('Big launch today 2w Edited', 'Big launch today 3w'),
+    ('“Big launch” today — just now', '"Big launch" today - yesterday')
+])
+def test_times_counters_and_markers_do_not_change_the_fingerprint(first, second):
+    assert content_fingerprint(first) == content_fingerprint(second)
+
+def test_normalized_text_keeps_amounts_and_dates():
+    assert normalize_text('We raised $5M on March 12 · 4h') == 'we raised 5m on march 12'
+
+def make_post(post_id):
+    return {'post_id': post_id, 'content': f'post {post_id}', 'url': f'https://x.com/a/status/{post_id}'}
+
+def page(*post_ids):
+    posts = [make_post(post_id) for post_id in post_ids]
+    return dict(posts[0], posts=posts)
+
+def new_ids(cache, post_data, last_post_id, rebaseline=False):
+    posts = diff_new_posts('X', 'https://x.com/a', post_data, last_post_id, rebaseline, cache=cache)
+    return [post['post_id'] for post in posts]
+
+@pytest.fixture
+def cache(db):
+    return SeenPostCache()
+
+def test_new_posts_below_a_pinned_known_post_are_announced(cache):
+    new_ids(cache, page('100', '90', '80'), None)
+
+    assert new_ids(cache, page('100', '120', '110', '90'), '100') == ['110', '120']
+
+def test_posts_already_seen_are_not_announced_again(cache):
+    new_ids(cache, page('100', '90'), None)
+
+    assert new_ids(cache, page('90', '100'), '100') == []
+
+def test_without_a_baseline_only_the_latest_post_is_announced(cache):
+    assert new_ids(cache, page('100', '90'), None) == ['100']
+    # Failed checks used to store an empty id
+    assert new_ids(SeenPostCache(), page('100', '90'), '') == ['100']
+
+def test_ids_that_do_not_compare_rebaseline_silently(cache):
+    assert new_ids(cache, page('100', '90'), '3f2a9c81d0') == []
+    assert new_ids(cache, page('200', '190'), 'fp-0123456789abcdef', rebaseline=True) == []
+
+def test_every_post_is_new_when_none_is_known(cache):
+    assert new_ids(cache, page('300', '290'), '100') == ['290', '300']
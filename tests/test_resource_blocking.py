@@ -0,0 +1,60 @@
+import asyncio
+import types
+
+from resource_blocking import ResourceBlocker, ESTIMATED_BYTES
+
+class Route:
+    def __init__(self, url, resource_type, page):
+        frame = types.SimpleNamespace(page=page) if page is not None else object()
+        self.request = types.SimpleNamespace(url=url, resource_type=resource_type, frame=frame)
+        self.outcome = None
+
+    async def abort(self):
+        self.outcome = 'aborted'
+
+    async def continue_(self):
+        self.outcome = 'continued'
+
+class Context:
+    async def route(self, pattern, handler):
+        self.handler = handler
+
+def route_requests(blocker, requests):
+    context = Context()
+
+    async def run():
+        await blocker.install(context, 'x')
+        for route in requests:
+            await context.handler(route)
+
+    asyncio.run(run())
+
+def make_blocker():
+    return ResourceBlocker(enabled=True, blocked_types=['image'], blocked_patterns=[], allowlist={})
+
+def test_page_requests_are_counted_when_the_lease_ends():
+    blocker = make_blocker()
+    page = object()
+    image = Route('https://x.com/a.png', 'image', page)
+    document = Route('https://x.com/a', 'document', page)
+
+    route_requests(blocker, [image, document])
+
+    assert (image.outcome, document.outcome) == ('aborted', 'continued')
+    assert blocker.finish_page(page, 'x') == {
+        'blocked_requests': 1, 'allowed_requests': 1, 'estimated_bytes_saved': ESTIMATED_BYTES['image']
+    }
+    assert blocker.stats()['x']['pages'] == 1
+    assert blocker.page_stats == {}
+
+def test_requests_without_a_page_go_straight_into_the_context_totals():
+    blocker = make_blocker()
+
+    route_requests(blocker, [Route('https://x.com/sw.png', 'image', None),
+                             Route('https://x.com/sw.js', 'script', None)])
+
+    assert blocker.page_stats == {}
+    assert blocker.stats() == {'x': {
+        'pages': 0, 'blocked_requests': 1, 'allowed_requests': 1,
+        'estimated_bytes_saved': ESTIMATED_BYTES['image']
+    }}
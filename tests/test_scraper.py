@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+import pytest
+
+import scraper
+from scraper import SocialMediaScraper
+
+class FakePage:
+    """Page whose readiness signals arrive after fixed delays (None never arrives)"""
+
+    def __init__(self, selector_after=None, idle_after=None, element_counts=None):
+        self.selector_after = selector_after
+        self.idle_after = idle_after
+        self.element_counts = list(element_counts or [10])
+        self.calls = []
+
+    async def signal(self, name, after, timeout):
+        self.calls.append(name)
+        if after is None or after > timeout / 1000:
+            await asyncio.sleep(timeout / 1000)
+            raise TimeoutError(f'{name} timed out')
+        await asyncio.sleep(after)
+
+    async def wait_for_selector(self, selector, state, timeout):
+        await self.signal('selector', self.selector_after, timeout)
+
+    async def wait_for_load_state(self, state, timeout):
+        await self.signal('network_idle', self.idle_after, timeout)
+
+    async def evaluate(self, expression):
+        self.calls.append('evaluate')
+        return self.element_counts.pop(0) if len(self.element_counts) > 1 else self.element_counts[0]
+
+@pytest.fixture(autouse=True)
+def short_waits(monkeypatch):
+    monkeypatch.setattr(scraper, 'DOM_STABLE_POLL_MS', 1)
+    monkeypatch.setattr(scraper, 'READY_FALLBACK_WAIT_MS', 100)
+    monkeypatch.setitem(scraper.READINESS_STRATEGIES, 'X', {'selectors': ['[data-testid="tweet"]'], 'max_wait': 100})
+
+def wait_until_ready(page, platform='X'):
+    return asyncio.run(SocialMediaScraper().wait_until_ready(page, platform))
+
+def test_selector_is_waited_for_even_when_the_page_settles_first():
+    page = FakePage(selector_after=0.05, idle_after=0)
+
+    assert wait_until_ready(page) == 'selector'
+    assert page.calls == ['selector']
+
+def test_network_idle_is_the_first_fallback_when_the_selector_times_out():
+    page = FakePage(selector_after=None, idle_after=0.01)
+
+    assert wait_until_ready(page) == 'network_idle'
+    assert page.calls == ['selector', 'network_idle']
+
+def test_stable_dom_is_the_last_fallback():
+    page = FakePage(selector_after=None, idle_after=None)
+
+    assert wait_until_ready(page) == 'dom_stable'
+    assert page.calls[:2] == ['selector', 'network_idle']
+    assert 'evaluate' in page.calls
+
+def test_platforms_without_selectors_go_straight_to_the_fallbacks(monkeypatch):
+    monkeypatch.setitem(scraper.READINESS_STRATEGIES, 'X', {'selectors': [], 'max_wait': 100})
+    page = FakePage(selector_after=0, idle_after=0)
+
+    assert wait_until_ready(page) == 'network_idle'
+    assert page.calls == ['network_idle']
+
+def test_timeout_when_nothing_settles():
+    page = FakePage(selector_after=None, idle_after=None, element_counts=range(1000))
+
+    assert wait_until_ready(page) == 'timeout'
+
+def test_a_page_that_never_becomes_ready_waits_no_longer_than_max_wait(monkeypatch):
+    monkeypatch.setitem(scraper.READINESS_STRATEGIES, 'X', {'selectors': ['[data-testid="tweet"]'], 'max_wait': 300})
+    page = FakePage(selector_after=None, idle_after=None, element_counts=range(100000))
+
+    started = time.perf_counter()
+    assert wait_until_ready(page) == 'timeout'
+
+    assert time.perf_counter() - started < 0.3 + 0.05
+    assert page.calls[:2] == ['selector', 'network_idle']
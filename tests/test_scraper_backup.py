@@ -0,0 +1,114 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from circuit_breaker import CLOSED, BreakerRegistry
+from http_cache import ValidatorCache
+from scraper_backup import AsyncSimpleScraper, SimpleScraper
+
+PAGE = b'<html><head><title>Profile</title><script>var x = 1;</script></head><body><p>Latest post text</p></body></html>'
+
+class PageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith('/status/'):
+            self.send_response(int(self.path.rsplit('/', 1)[-1]))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def page_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), PageHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}/account'
+    server.shutdown()
+    server.server_close()
+
+def test_simple_scraper_returns_what_the_async_scraper_returns(db, page_url):
+    scraper = SimpleScraper(validator_cache=ValidatorCache(enabled=False))
+    try:
+        post = scraper.scrape_platform('X', page_url)
+    finally:
+        scraper.close()
+
+    async def scrape_async():
+        async_scraper = AsyncSimpleScraper(validator_cache=ValidatorCache(enabled=False))
+        try:
+            return await async_scraper.scrape_platform('X', page_url)
+        finally:
+            await async_scraper.close()
+
+    assert post is not None
+    assert post == asyncio.run(scrape_async())
+
+def test_simple_scraper_can_be_called_from_several_threads(db, page_url):
+    scraper = SimpleScraper(validator_cache=ValidatorCache(enabled=False))
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(scraper.scrape_platform('X', page_url)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    scraper.close()
+
+    assert len(results) == 4
+    assert all(result and result['post_id'] == results[0]['post_id'] for result in results)
+
+def test_first_validator_lookup_reads_the_database_off_the_event_loop(db, page_url, monkeypatch):
+    import http_cache
+    lookups = []
+    get_entry = http_cache.get_http_cache_entry
+
+    def recording_get_entry(url):
+        lookups.append(threading.get_ident())
+        return get_entry(url)
+
+    monkeypatch.setattr(http_cache, 'get_http_cache_entry', recording_get_entry)
+
+    async def scrape_twice():
+        scraper = AsyncSimpleScraper()
+        try:
+            first = await scraper.scrape_platform('X', page_url)
+            second = await scraper.scrape_platform('X', page_url)
+            return threading.get_ident(), first, second
+        finally:
+            await scraper.close()
+
+    loop_thread, first, second = asyncio.run(scrape_twice())
+
+    assert first and second
+    assert len(lookups) == 1
+    assert lookups[0] != loop_thread
+
+def test_only_host_level_failures_count_against_the_breaker(db, page_url, monkeypatch):
+    import scraper_backup
+    registry = BreakerRegistry()
+    monkeypatch.setattr(scraper_backup, 'breakers', registry)
+    base = page_url.rsplit('/', 1)[0]
+
+    async def scrape(*paths):
+        scraper = AsyncSimpleScraper(validator_cache=ValidatorCache(enabled=False))
+        try:
+            return [await scraper.scrape_platform('X', base + path) for path in paths]
+        finally:
+            await scraper.close()
+
+    asyncio.run(scrape('/status/503', '/status/429'))
+    assert registry.get(page_url).consecutive_failures == 2
+
+    # A missing profile or a page without posts shows the host is answering
+    asyncio.run(scrape('/status/404'))
+    assert registry.get(page_url).consecutive_failures == 0
+    assert registry.get(page_url).state == CLOSED
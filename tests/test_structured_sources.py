@@ -0,0 +1,147 @@
+import asyncio
+import json
+
+import pytest
+
+from benchmarks import fixture_server
+from circuit_breaker import breakers
+from structured_sources import (
+    EmbeddedJsonScanner, StructuredScraper, STRUCTURED_SOURCES, LD_JSON, parse_structured
+)
+
+FIXTURES = fixture_server.load_fixtures()
+
+def page(name, handle='acme'):
+    return fixture_server.render(FIXTURES[name], handle)
+
+def scan(body, wanted, chunk_size):
+    scanner = EmbeddedJsonScanner(wanted)
+    for start in range(0, len(body), chunk_size):
+        scanner.feed(body[start:start + chunk_size])
+        if scanner.done:
+            break
+    return scanner
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 4096, 1 << 20])
+def test_scripts_split_across_chunks_are_read_whole(chunk_size):
+    body = page('tiktok')
+
+    scanner = scan(body, STRUCTURED_SOURCES['TikTok']['scripts'], chunk_size)
+
+    [(name, raw)] = scanner.scripts
+    assert name == '__UNIVERSAL_DATA_FOR_REHYDRATION__'
+    assert json.loads(raw)['__DEFAULT_SCOPE__']['webapp.user-detail']['userInfo']['user']['uniqueId'] == 'acme'
+    assert scanner.done
+
+def test_scanning_stops_at_the_first_wanted_script_with_an_id():
+    body = page('x_syndication')
+    # Anything after the timeline data is never needed
+    body += b'<script id="__NEXT_DATA__">{"late": true}</script>' + fixture_server.padding(200_000).encode()
+
+    scanner = scan(body, STRUCTURED_SOURCES['X']['scripts'], 4096)
+
+    assert len(scanner.scripts) == 1
+    assert b'"late"' not in scanner.scripts[0][1]
+
+def test_every_ld_json_block_is_collected():
+    scanner = scan(page('linkedin'), (LD_JSON,), 100)
+
+    assert [name for name, _ in scanner.scripts] == [LD_JSON] * 4
+    assert not scanner.done
+
+def test_pages_without_the_wanted_scripts_yield_nothing():
+    scanner = scan(page('facebook'), ('__NEXT_DATA__', LD_JSON), 4096)
+
+    assert scanner.scripts == [] and not scanner.done
+
+def parse_fixture(platform, name, url):
+    scanner = scan(page(name), STRUCTURED_SOURCES[platform]['scripts'], 4096)
+    return parse_structured(platform, url, scanner.scripts)
+
+def test_tiktok_videos_are_read_newest_first():
+    result = parse_fixture('TikTok', 'tiktok', 'https://www.tiktok.com/@acme')
+
+    assert [post['post_id'] for post in result['posts']] == [
+        '7425100000000000003', '7424300000000000002', '7423000000000000001'
+    ]
+    assert result['url'] == 'https://www.tiktok.com/@acme/video/7425100000000000003'
+    assert result['content'] == 'Behind the scenes of our new studio #setup'
+
+def test_x_timeline_tweets_are_read_newest_first():
+    result = parse_fixture('X', 'x_syndication', 'https://x.com/acme')
+
+    assert [post['post_id'] for post in result['posts']] == [
+        '1846100000000000003', '1845700000000000002', '1845200000000000001'
+    ]
+    assert result['url'] == 'https://x.com/acme/status/1846100000000000003'
+
+def test_linkedin_postings_skip_the_organization_block():
+    result = parse_fixture('LinkedIn', 'linkedin', 'https://www.linkedin.com/company/acme')
+
+    assert len(result['posts']) == 3
+    assert result['url'] == 'https://www.linkedin.com/posts/acme_launch-activity-7251840000000000003-Ab1c'
+    assert result['content'].startswith('We just shipped our autumn release')
+
+def test_unreadable_json_is_skipped():
+    assert parse_structured('X', 'https://x.com/acme', [('__NEXT_DATA__', b'{"props": ')]) is None
+
+class Content:
+    def __init__(self, body):
+        self.body = body
+
+    async def iter_chunked(self, size):
+        for start in range(0, len(self.body), size):
+            yield self.body[start:start + size]
+
+class Response:
+    status = 200
+
+    def __init__(self, body):
+        self.content = Content(body)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+class Session:
+    def __init__(self, body):
+        self.body = body
+
+    def get(self, url, **kwargs):
+        return Response(self.body)
+
+@pytest.fixture
+def clean_breakers():
+    breakers.breakers.clear()
+    yield
+    breakers.breakers.clear()
+
+class HttpScraper:
+    worker_pool = None
+    executor = None
+
+    def __init__(self, body):
+        self.session = Session(body)
+
+    async def get_session(self):
+        return self.session
+
+def test_the_download_stops_once_the_data_is_read(clean_breakers):
+    body = page('tiktok') + fixture_server.padding(1_000_000).encode()
+    scraper = StructuredScraper(HttpScraper(body))
+
+    result = asyncio.run(scraper.scrape_platform('TikTok', 'https://www.tiktok.com/@acme'))
+
+    assert result['post_id'] == '7425100000000000003'
+    assert scraper.bytes_read < len(body) - 900_000
+
+def test_the_download_stops_at_max_bytes_without_the_data(clean_breakers):
+    body = fixture_server.padding(1_000_000).encode() + page('tiktok')
+    scraper = StructuredScraper(HttpScraper(body), max_bytes=200_000)
+
+    result = asyncio.run(scraper.scrape_platform('TikTok', 'https://www.tiktok.com/@acme'))
+
+    assert result is None
+    assert 200_000 <= scraper.bytes_read < 200_000 + 64 * 1024
@@ -0,0 +1,33 @@
+import pytest
+from bs4.dammit import UnicodeDammit
+
+from text_extraction import WINDOWS_1252_REFERENCES, extract_text_soup, extract_visible_text
+
+CHARACTER_REFERENCES = [
+    '&#65;', '&#x41;', '&#X41;', '&#x2603;', '&#128512;',
+    '&#150;', '&#x80;', '&#x9F;', '&#129;', '&#x8d;',
+    '&#0;', '&#xD800;', '&#1114112;', '&#xFFFE;', '&#7;', '&#13;',
+    '&#65abc', '&#x41g', '&#x4Fzz', '&#xZ;',
+    '&amp;', '&nbsp;', '&copy', '&notanentity;'
+]
+
+@pytest.mark.parametrize('reference', CHARACTER_REFERENCES)
+def test_character_references_match_get_text(reference):
+    html = f'<html><body><p>before {reference} after</p><p>{reference}</p></body></html>'
+    assert extract_visible_text(html) == extract_text_soup(html)
+
+def test_windows_1252_table_matches_beautifulsoup():
+    expected = {code: char.decode('utf8') for code, char in UnicodeDammit.WINDOWS_1252_TO_UTF8.items()
+                if 0x80 <= code <= 0x9f}
+    assert WINDOWS_1252_REFERENCES == expected
+
+def test_scripts_and_styles_are_not_page_text():
+    html = ('<html><head><style>p { color: red }</style><script>var a = "&#65;";</script></head>'
+            '<body><pre>  keep   spacing </pre>\n\n<p>Latest&nbsp;post &#8212; today</p></body></html>')
+    assert extract_visible_text(html) == extract_text_soup(html)
+    assert 'color' not in extract_visible_text(html)
+
+def test_text_stops_at_the_limit():
+    html = '<p>' + 'word ' * 500 + '</p>'
+    assert extract_visible_text(html, limit=100) == extract_text_soup(html, limit=100)
+    assert len(extract_visible_text(html, limit=100)) == 100
@@ -0,0 +1,43 @@
+import asyncio
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from worker_pool import ParseWorkerPool, _ping
+
+@pytest.fixture
+def pool():
+    pool = ParseWorkerPool(processes=1, max_pending=1)
+    yield pool
+    pool.shutdown()
+
+def test_jobs_run_in_worker_processes(pool):
+    pid = asyncio.run(pool.run(_ping))
+
+    assert pid != os.getpid()
+    assert pool.stats()['completed'] == 1
+
+def test_a_full_pool_makes_callers_wait(pool):
+    async def run():
+        return await asyncio.gather(pool.run(time.sleep, 0.2), pool.run(time.sleep, 0.2))
+
+    asyncio.run(run())
+
+    stats = pool.stats()
+    assert (stats['submitted'], stats['completed'], stats['pending']) == (2, 2, 0)
+    assert stats['backpressure_waits'] == 1
+
+def test_the_pool_restarts_after_a_worker_crash(pool):
+    async def run():
+        with pytest.raises(BrokenProcessPool):
+            await pool.run(os._exit, 1)
+        return await pool.run(_ping)
+
+    pid = asyncio.run(run())
+
+    assert pid != os.getpid()
+    stats = pool.stats()
+    # The crashing job is retried once on a fresh pool before it fails
+    assert (stats['restarts'], stats['failed'], stats['completed']) == (2, 1, 1)
@@ -0,0 +1,208 @@
+"""
+Streaming visible-text extraction that matches BeautifulSoup's get_text() without building a tree
+"""
+import re
+from html.parser import HTMLParser
+from bs4 import BeautifulSoup
+from bs4.builder import HTMLParserTreeBuilder
+from bs4.dammit import EntitySubstitution
+
+# Use BeautifulSoup's own tables so the output stays byte-for-byte identical
+_BUILDER = HTMLParserTreeBuilder()
+EMPTY_ELEMENT_TAGS = frozenset(_BUILDER.empty_element_tags or ())
+PRESERVE_WHITESPACE_TAGS = frozenset(_BUILDER.preserve_whitespace_tags)
+STRING_CONTAINER_TAGS = frozenset(_BUILDER.string_containers) | {'script', 'style'}
+ASCII_SPACES = BeautifulSoup.ASCII_SPACES
+
+DEFAULT_TEXT_LIMIT = 1000
+
+# Numeric references html.parser leaves unterminated ("&#65abc"): the number, then plain text
+DECIMAL_REFERENCE = re.compile('^([0-9]+)(.*)')
+HEX_REFERENCE = re.compile('^([0-9a-f]+)(.*)')
+# C1 control references that pages meant as windows-1252 characters (the HTML spec's table)
+WINDOWS_1252_REFERENCES = {
+    code: char
+    for code, char in zip(range(0x80, 0xa0), bytes(range(0x80, 0xa0)).decode('cp1252', 'replace'))
+    if char != '\ufffd'
+}
+
+def dereference_numeric(name):
+    """Resolve a numeric character reference the way BeautifulSoup's html.parser builder does
+
+    Returns (character, trailing data that was not part of the reference).
+    """
+    base, pattern = 10, DECIMAL_REFERENCE
+    if name[:1] in ('x', 'X'):
+        name, base, pattern = name[1:], 16, HEX_REFERENCE
+    try:
+        number, extra = int(name, base), ''
+    except ValueError:
+        match = pattern.search(name)
+        if match is None:
+            return '', name
+        number, extra = int(match.group(1), base), match.group(2)
+
+    if number == 0 or number > 0x10ffff or 0xd800 <= number <= 0xdfff:
+        return '\ufffd', extra
+    return WINDOWS_1252_REFERENCES.get(number, chr(number)), extra
+
+class StopExtraction(Exception):
+    """Raised internally once enough text has been collected"""
+
+class VisibleTextExtractor(HTMLParser):
+    """Collects the text soup.get_text() would return after removing <script>/<style>, stopping at a limit
+
+    Mirrors the html.parser tree builder: text runs are split at every markup event,
+    whitespace-only runs collapse to a single space or newline outside <pre>/<textarea>,
+    and strings inside script, style, template, rt and rp are not page text.
+    """
+
+    def __init__(self, limit=DEFAULT_TEXT_LIMIT):
+        super().__init__(convert_charrefs=False)
+        self.limit = limit
+        self.open_tags = []
+        self.open_counts = {}
+        self.preserve_depth = 0
+        self.container_depth = 0
+        self.closed_empty_elements = []
+        self.current_data = []
+        self.pending_length = 0
+        self.pending_is_text = False
+        self.parts = []
+        self.length = 0
+
+    def text(self):
+        """Get the collected text, truncated to the limit"""
+        return ''.join(self.parts + self.current_data)[:self.limit]
+
+    def end_data(self, is_cdata=False, is_other=False):
+        """Close the current text run (BeautifulSoup.endData)"""
+        if not self.current_data:
+            return
+        data = ''.join(self.current_data)
+        self.current_data = []
+        self.pending_length = 0
+        self.pending_is_text = False
+
+        if not self.preserve_depth and all(char in ASCII_SPACES for char in data):
+            data = '\n' if '\n' in data else ' '
+
+        if is_other or (not is_cdata and self.container_depth):
+            return
+        self.parts.append(data)
+        self.length += len(data)
+        if self.length >= self.limit:
+            raise StopExtraction()
+
+    def push_tag(self, tag):
+        self.open_tags.append(tag)
+        self.open_counts[tag] = self.open_counts.get(tag, 0) + 1
+        if tag in PRESERVE_WHITESPACE_TAGS:
+            self.preserve_depth += 1
+        if tag in STRING_CONTAINER_TAGS:
+            self.container_depth += 1
+
+    def pop_tag(self):
+        tag = self.open_tags.pop()
+        self.open_counts[tag] -= 1
+        if tag in PRESERVE_WHITESPACE_TAGS:
+            self.preserve_depth -= 1
+        if tag in STRING_CONTAINER_TAGS:
+            self.container_depth -= 1
+
+    def pop_to_tag(self, tag):
+        """Pop up to and including the most recent open tag with this name"""
+        if not self.open_counts.get(tag):
+            return
+        while self.open_tags:
+            name = self.open_tags[-1]
+            self.pop_tag()
+            if name == tag:
+                return
+
+    def handle_starttag(self, tag, attrs, handle_empty_element=True):
+        self.end_data()
+        self.push_tag(tag)
+        if tag in EMPTY_ELEMENT_TAGS and handle_empty_element:
+            self.handle_endtag(tag, check_already_closed=False)
+            self.closed_empty_elements.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs, handle_empty_element=False)
+        self.handle_endtag(tag, check_already_closed=False)
+
+    def handle_endtag(self, tag, check_already_closed=True):
+        if check_already_closed and tag in self.closed_empty_elements:
+            self.closed_empty_elements.remove(tag)
+            return
+        self.end_data()
+        self.pop_to_tag(tag)
+
+    def handle_data(self, data):
+        self.current_data.append(data)
+        self.pending_length += len(data)
+        if not self.pending_is_text and not self.container_depth:
+            self.pending_is_text = any(char not in ASCII_SPACES for char in data)
+        # A run with real text is kept verbatim, so its prefix is final already
+        if self.pending_is_text and self.length + self.pending_length >= self.limit:
+            raise StopExtraction()
+
+    def handle_charref(self, name):
+        dereferenced, extra_data = dereference_numeric(name)
+        self.handle_data(dereferenced)
+        self.handle_data(extra_data)
+
+    def handle_entityref(self, name):
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self.handle_data(character if character is not None else '&%s' % name)
+
+    def handle_comment(self, data):
+        self.end_data()
+        self.current_data.append(data)
+        self.end_data(is_other=True)
+
+    def handle_decl(self, decl):
+        self.end_data()
+        self.current_data.append(decl[len('DOCTYPE '):])
+        self.end_data(is_other=True)
+
+    def unknown_decl(self, data):
+        is_cdata = data.upper().startswith('CDATA[')
+        if is_cdata:
+            data = data[len('CDATA['):]
+        self.end_data()
+        self.current_data.append(data)
+        self.end_data(is_cdata=is_cdata, is_other=not is_cdata)
+
+    def handle_pi(self, data):
+        self.end_data()
+        self.current_data.append(data)
+        self.end_data(is_other=True)
+
+    def finish(self):
+        """Flush the parser and the final text run"""
+        self.close()
+        self.end_data()
+
+def extract_text_soup(html, limit=DEFAULT_TEXT_LIMIT):
+    """Reference implementation: full BeautifulSoup parse"""
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Remove script and style elements
+    for script in soup(["script", "style"]):
+        script.decompose()
+
+    return soup.get_text()[:limit]
+
+def extract_visible_text(html, limit=DEFAULT_TEXT_LIMIT):
+    """Get the first `limit` characters of visible page text without building a tree"""
+    extractor = VisibleTextExtractor(limit)
+    try:
+        extractor.feed(html)
+        extractor.finish()
+    except StopExtraction:
+        pass
+    except AssertionError:
+        # html.parser rejected the markup; let BeautifulSoup report it the same way as before
+        return extract_text_soup(html, limit)
+    return extractor.text()
@@ -0,0 +1,84 @@
+"""
+Tiered fetching: serve each check from the cheapest source that works for the target
+"""
+import logging
+import time
+from config import FETCH_TIERS, FETCH_TIER_RECHECK
+from structured_sources import StructuredScraper
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIERS = ['html', 'browser']
+
+class TieredScraper:
+    """Tries a platform's tiers in order and tags the result with the tier that served it
+
+    Tiers, cheapest first: 'structured' (embedded JSON or a timeline endpoint), 'html' (page
+    text over plain HTTP) and 'browser' (Playwright). A tier that finds nothing for a target is
+    skipped for that target for FETCH_TIER_RECHECK checks, so a page without embedded data does
+    not pay for the miss every time; the last tier is always tried.
+    """
+
+    def __init__(self, http_scraper, browser_scraper=None, platform_tiers=FETCH_TIERS,
+                 recheck=FETCH_TIER_RECHECK):
+        self.tiers = {
+            'structured': StructuredScraper(http_scraper),
+            'html': http_scraper,
+            'browser': browser_scraper
+        }
+        self.platform_tiers = platform_tiers
+        self.recheck = recheck
+        self.skips = {}  # (tier, url) -> checks left before the tier is tried again
+        self.counters = {}  # (platform, tier) -> {'served': n, 'missed': n, 'skipped': n, 'ms': total}
+
+    def count(self, platform, tier, outcome, elapsed_ms=0.0):
+        counters = self.counters.setdefault((platform, tier), {'served': 0, 'missed': 0, 'skipped': 0, 'ms': 0.0})
+        counters[outcome] += 1
+        counters['ms'] += elapsed_ms
+
+    async def scrape_platform(self, platform, url):
+        """Scrape a target through its tiers; the post's 'tier' names the one that answered"""
+        tiers = [tier for tier in self.platform_tiers.get(platform, DEFAULT_TIERS) if self.tiers.get(tier)]
+        for position, tier in enumerate(tiers):
+            last = position == len(tiers) - 1
+            if not last and self.skips.get((tier, url)):
+                self.skips[(tier, url)] -= 1
+                self.count(platform, tier, 'skipped')
+                continue
+
+            started = time.perf_counter()
+            post = await self.tiers[tier].scrape_platform(platform, url)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            metrics.observe('check_stage_seconds', elapsed_ms / 1000, platform=platform, target=url, stage=tier)
+            if post:
+                self.skips.pop((tier, url), None)
+                self.count(platform, tier, 'served', elapsed_ms)
+                logger.info(f"{platform} served by {tier} tier in {elapsed_ms:.0f}ms")
+                post['tier'] = tier
+                return post
+
+            self.count(platform, tier, 'missed', elapsed_ms)
+            if not last:
+                self.skips[(tier, url)] = self.recheck
+                logger.info(f"{platform} {tier} tier found nothing for {url}; escalating")
+        return None
+
+    def stats(self):
+        """Get served/missed/skipped counts and average time per platform and tier"""
+        stats = {}
+        for (platform, tier), counters in self.counters.items():
+            attempts = counters['served'] + counters['missed']
+            stats.setdefault(platform, {})[tier] = {
+                'served': counters['served'],
+                'missed': counters['missed'],
+                'skipped': counters['skipped'],
+                'avg_ms': round(counters['ms'] / attempts, 1) if attempts else 0.0
+            }
+        return stats
+
+    async def close(self):
+        """Close the HTTP session and the browser, if one was launched"""
+        await self.tiers['html'].close()
+        if self.tiers['browser']:
+            await self.tiers['browser'].close_browser()
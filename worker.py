@@ -0,0 +1,188 @@
+"""
+Check worker: claims check jobs from the shared queue and runs them (CHECK_MODE = 'coordinator')
+
+Workers open the bot's SQLite database directly, so they run on the same machine as the bot.
+
+Usage: python worker.py [--worker-id ID] [--shards 0,1,2] [--concurrency N]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import socket
+from config import (
+    JOB_QUEUE_SHARDS, JOB_LEASE_SECONDS, JOB_POLL_INTERVAL,
+    WORKER_CONCURRENCY, SCRAPE_WORKER_PROCESSES, METRICS_SAVE_INTERVAL
+)
+from check_engine import CheckEngine
+from database import init_database, close_connections, save_metrics, save_breakers
+from job_queue import SQLiteJobQueue
+from scraper import SocialMediaScraper
+from scraper_backup import AsyncSimpleScraper
+from tiered_scraper import TieredScraper
+from worker_pool import ParseWorkerPool
+from metrics import set_process_name
+
+logger = logging.getLogger(__name__)
+
+class CheckWorker:
+    """Runs claimed jobs through the fetch tiers and reports results back through the queue"""
+
+    def __init__(self, worker_id, shards=None, concurrency=WORKER_CONCURRENCY, job_queue=None):
+        self.worker_id = worker_id
+        self.shards = shards
+        self.concurrency = concurrency
+        self.job_queue = job_queue or SQLiteJobQueue()
+        self.parse_pool = ParseWorkerPool() if SCRAPE_WORKER_PROCESSES > 0 else None
+        # The browser tier launches Playwright in this worker only if a check escalates to it
+        self.scraper = TieredScraper(AsyncSimpleScraper(worker_pool=self.parse_pool), SocialMediaScraper())
+        self.check_engine = CheckEngine(max_concurrency=concurrency)
+        self.active = {}  # job id -> job
+        self.tasks = {}  # job id -> task running it
+        self.completed = 0
+        self.failed = 0
+        set_process_name(f'worker-{worker_id}')
+
+    async def run_job(self, job):
+        """Scrape one target and store the outcome on its job"""
+        loop = asyncio.get_running_loop()
+        try:
+            post = None
+
+            async def check(platform, url):
+                nonlocal post
+                post = await self.scraper.scrape_platform(platform, url)
+
+            # The engine keeps per-host politeness within this worker; a None post is a
+            # failed check that the coordinator records, not a job to retry
+            await self.check_engine.run_target(job['platform'], job['url'], check)
+            # Host failures seen here reach the coordinator's breakers before the result does
+            await loop.run_in_executor(None, save_breakers)
+            await loop.run_in_executor(None, self.job_queue.complete, job, post)
+            self.completed += 1
+        except Exception as e:
+            logger.error(f"Job {job['id']} for {job['platform']} failed: {e}")
+            self.failed += 1
+            try:
+                await loop.run_in_executor(None, self.job_queue.fail, job, str(e))
+            except Exception as fail_error:
+                logger.error(f"Failed to release job {job['id']}: {fail_error}")
+        finally:
+            # An abandoned job may already have been claimed again under the same id
+            if self.tasks.get(job['id']) is asyncio.current_task():
+                self.active.pop(job['id'], None)
+                self.tasks.pop(job['id'], None)
+
+    def start_job(self, job):
+        """Run a claimed job in the background"""
+        self.active[job['id']] = job
+        self.tasks[job['id']] = asyncio.create_task(self.run_job(job))
+
+    def abandon_job(self, job_id):
+        """Stop a job whose lease went to another worker; that worker now owns its result"""
+        self.active.pop(job_id, None)
+        task = self.tasks.pop(job_id, None)
+        if task:
+            task.cancel()
+
+    async def renew_leases(self):
+        """Keep leases alive while jobs run so no other worker picks them up"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+            if not self.active:
+                continue
+            try:
+                lost = await loop.run_in_executor(None, self.job_queue.renew, list(self.active.values()))
+                for job_id in lost:
+                    logger.warning(f"Lost lease on job {job_id}; cancelling it")
+                    self.abandon_job(job_id)
+            except Exception as e:
+                logger.error(f"Failed to renew job leases: {e}")
+
+    async def save_metrics_periodically(self):
+        """Save this worker's check stage metrics and breaker states for the dashboard"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(METRICS_SAVE_INTERVAL)
+            await loop.run_in_executor(None, save_metrics)
+            await loop.run_in_executor(None, save_breakers)
+
+    async def run(self):
+        """Claim and run jobs until cancelled"""
+        loop = asyncio.get_running_loop()
+        if self.parse_pool:
+            await self.parse_pool.warm_up()
+        renewer = asyncio.create_task(self.renew_leases())
+        metrics_saver = asyncio.create_task(self.save_metrics_periodically())
+        logger.info(
+            f"Worker {self.worker_id} started on shards "
+            f"{self.shards if self.shards is not None else 'all'} with concurrency {self.concurrency}"
+        )
+        try:
+            while True:
+                jobs = []
+                free = self.concurrency - len(self.active)
+                if free > 0:
+                    try:
+                        jobs = await loop.run_in_executor(
+                            None, self.job_queue.claim, self.worker_id, self.shards, free
+                        )
+                    except Exception as e:
+                        logger.error(f"Failed to claim jobs: {e}")
+
+                for job in jobs:
+                    self.start_job(job)
+
+                if not jobs or len(self.active) >= self.concurrency:
+                    # Idle or saturated: wait for a free slot or the next poll
+                    if self.tasks:
+                        await asyncio.wait(list(self.tasks.values()), timeout=JOB_POLL_INTERVAL,
+                                           return_when=asyncio.FIRST_COMPLETED)
+                    else:
+                        await asyncio.sleep(JOB_POLL_INTERVAL)
+        finally:
+            renewer.cancel()
+            metrics_saver.cancel()
+            # Unfinished jobs are not failed here; their leases expire and another worker retries them
+            for task in list(self.tasks.values()):
+                task.cancel()
+            await self.scraper.close()
+            if self.parse_pool:
+                self.parse_pool.shutdown()
+            save_metrics()
+            save_breakers()
+            logger.info(f"Worker {self.worker_id} stopped: {self.completed} completed, {self.failed} failed")
+
+def parse_shards(value):
+    """Parse a comma-separated shard list such as '0,2,5'"""
+    shards = [int(part) for part in value.split(',') if part.strip()]
+    for shard in shards:
+        if not 0 <= shard < JOB_QUEUE_SHARDS:
+            raise argparse.ArgumentTypeError(f"Shard {shard} is outside 0..{JOB_QUEUE_SHARDS - 1}")
+    return shards
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a social media check worker")
+    parser.add_argument('--worker-id', default=f"{socket.gethostname()}-{os.getpid()}")
+    parser.add_argument('--shards', type=parse_shards, default=None,
+                        help=f"Comma-separated host shards to claim (0..{JOB_QUEUE_SHARDS - 1}, default all)")
+    parser.add_argument('--concurrency', type=int, default=WORKER_CONCURRENCY)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    init_database()
+    worker = CheckWorker(args.worker_id, args.shards, args.concurrency)
+    try:
+        asyncio.run(worker.run())
+    except KeyboardInterrupt:
+        logger.info("Worker stopped by user")
+    finally:
+        close_connections()
+
+if __name__ == "__main__":
+    main()
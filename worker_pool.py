@@ -0,0 +1,110 @@
+"""
+Process pool for CPU-bound parsing so it does not compete with the bot's event loop for the GIL
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from config import SCRAPE_WORKER_PROCESSES, SCRAPE_WORKER_MAX_PENDING
+
+logger = logging.getLogger(__name__)
+
+def _ping():
+    """No-op job used to start worker processes ahead of the first check"""
+    return os.getpid()
+
+class ParseWorkerPool:
+    """Runs picklable jobs in worker processes with backpressure and automatic restart after a crash"""
+
+    def __init__(self, processes=SCRAPE_WORKER_PROCESSES, max_pending=SCRAPE_WORKER_MAX_PENDING):
+        self.processes = processes or os.cpu_count() or 1
+        self.max_pending = max(max_pending, self.processes)
+        # Spawned workers do not inherit the bot's threads, sockets or held locks
+        self.mp_context = multiprocessing.get_context('spawn')
+        self.executor = None
+        self.semaphore = None
+        self.restart_lock = None
+        self.pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.restarts = 0
+        self.backpressure_waits = 0
+
+    def start(self):
+        """Create the process pool"""
+        self.executor = ProcessPoolExecutor(max_workers=self.processes, mp_context=self.mp_context)
+        logger.info(f"Started parse worker pool with {self.processes} processes")
+
+    async def warm_up(self):
+        """Start every worker process now instead of on the first check"""
+        if self.executor is None:
+            self.start()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(self.executor, _ping) for _ in range(self.processes)
+        ))
+
+    async def restart(self, broken_executor):
+        """Replace a broken pool once, even if several jobs noticed the crash"""
+        async with self.restart_lock:
+            if self.executor is not broken_executor:
+                return
+            logger.warning("Parse worker crashed, restarting the worker pool")
+            broken_executor.shutdown(wait=False, cancel_futures=True)
+            self.restarts += 1
+            self.start()
+
+    async def run(self, func, *args):
+        """Run func(*args) in a worker process, waiting while the pool is saturated"""
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_pending)
+            self.restart_lock = asyncio.Lock()
+        if self.executor is None:
+            self.start()
+
+        if self.semaphore.locked():
+            self.backpressure_waits += 1
+        async with self.semaphore:
+            self.pending += 1
+            self.submitted += 1
+            loop = asyncio.get_running_loop()
+            try:
+                # A job that crashes its worker is retried once on a fresh pool
+                for attempt in range(2):
+                    executor = self.executor
+                    try:
+                        result = await loop.run_in_executor(executor, func, *args)
+                        self.completed += 1
+                        return result
+                    except BrokenProcessPool:
+                        await self.restart(executor)
+                        if attempt:
+                            raise
+            except Exception:
+                self.failed += 1
+                raise
+            finally:
+                self.pending -= 1
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+            logger.info("Parse worker pool stopped")
+
+    def stats(self):
+        """Get pool size, queue depth and job counters"""
+        return {
+            'processes': self.processes,
+            'pending': self.pending,
+            'max_pending': self.max_pending,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'restarts': self.restarts,
+            'backpressure_waits': self.backpressure_waits
+        }